@@ -0,0 +1,289 @@
+import threading
+import time
+
+from othello_game import PASS, OthelloGame, notation_to_move
+
+# Depth of the search that guesses the player's reply when the AI's principal
+# variation does not include one
+PONDER_GUESS_DEPTH = 4
+
+
+class AIWorker:
+    def __init__(self, time_limit_ms=None, max_depth=8):
+        """
+        Runs the AI search in a background thread so the GUI event loop keeps running while the AI thinks.
+
+        The GUI starts a search with `start`, polls `done` once per frame, shows `depth` and `nodes` while it
+        waits, and takes the move with `result`. `cancel` stops a running search at its next progress check.
+        Two searches never run at once, since they share the module-level transposition table: a search started
+        while a cancelled one is still stopping is started by a later poll of `done`, once the cancelled one has
+        exited, so the GUI thread never waits for it.
+
+        After the AI has moved, `ponder` searches on the player's time: it plays the reply the AI expects (the
+        second move of its principal variation, or the result of a quick search) and searches the AI's answer
+        to it with no time limit. If the player then makes the expected move, `start` keeps that search going
+        and gives it the usual time budget from that moment, so it is usually finished at once. Otherwise the
+        ponder search is stopped and a new search starts, which still finds the positions searched so far in the
+        shared transposition table.
+
+        The AI module is imported by the first search, in the background thread, so that the menu and
+        multi-player games do not wait for it.
+
+        Args:
+            time_limit_ms (float): The time budget for each AI move in milliseconds, or None for no limit.
+            max_depth (int): The maximum search depth.
+
+        Attributes:
+            ponder_hits (int): The number of moves for which the player made the expected reply.
+            ponder_misses (int): The number of moves for which the player made another move.
+        """
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.depth = 0
+        self.nodes = 0
+        self._move = None
+        self._principal_variation = []
+        self._thread = None
+        self._stopping = (
+            None  # A cancelled search thread that had not exited when cancel returned
+        )
+        self._cancelled = threading.Event()
+        self._deadline = None  # Set when a ponder search becomes the real search
+        self._pondering = False
+        self._ponder_position = None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    @property
+    def thinking(self):
+        """
+        Whether a search has been started and its move has not been taken yet.
+        """
+        return self._thread is not None and not self._pondering
+
+    @property
+    def pondering(self):
+        """
+        Whether a ponder search is running on the player's time.
+        """
+        return self._thread is not None and self._pondering
+
+    @property
+    def done(self):
+        """
+        Whether the started search has finished and its move can be taken with `result`.
+        """
+        return (
+            self.thinking
+            and self._start_when_stopped()
+            and not self._thread.is_alive()
+        )
+
+    def start(self, game):
+        """
+        Start searching for the best move of the current player in a background thread.
+
+        The search runs on a copy of the position, so the game can still be drawn while it runs.
+
+        If a ponder search is running on this very position, it becomes the search instead.
+
+        Args:
+            game (OthelloGame): The current game state.
+        """
+        if self._pondering:
+            if self._take_ponder_search(game):
+                return
+            self.cancel()
+        self._launch(
+            threading.Thread(
+                target=self._search,
+                args=(self._copy(game), self.time_limit_ms),
+                daemon=True,
+            )
+        )
+
+    def ponder(self, game):
+        """
+        Start searching the AI's answer to the player's expected reply in a background thread.
+
+        Args:
+            game (OthelloGame): The current game state, with the player to move.
+        """
+        self.cancel()
+        expected = None
+        if len(self._principal_variation) > 1:
+            expected = notation_to_move(self._principal_variation[1])
+        self._launch(
+            threading.Thread(
+                target=self._ponder, args=(self._copy(game), expected), daemon=True
+            ),
+            pondering=True,
+        )
+
+    def _launch(self, thread, pondering=False):
+        """
+        Make a search thread the current one, and start it unless a cancelled search is still stopping.
+        """
+        self._thread = thread
+        self._pondering = pondering
+        self._ponder_position = None
+        self._start_when_stopped()
+
+    def _start_when_stopped(self):
+        """
+        Start the current search thread if it has not started yet and no cancelled search is still running.
+
+        Returns:
+            bool: Whether the thread has been started.
+        """
+        if self._thread.ident is not None:
+            return True
+        if self._stopping is not None:
+            # The cancelled search stops at its next progress check, which can take a while, e.g. inside the
+            # endgame solver; `done` calls this again on the next frame
+            if self._stopping.is_alive():
+                return False
+            self._stopping = None
+        self._reset()
+        self._thread.start()
+        return True
+
+    def _take_ponder_search(self, game):
+        """
+        Turn the ponder search into the search of the current position if it searches that position.
+
+        Returns:
+            bool: Whether the ponder search was taken over.
+        """
+        position = (game.black, game.white, game.current_player)
+        if self._thread.ident is None:
+            # The ponder search never started, so there is nothing to take over
+            return False
+        if position != self._ponder_position:
+            self.ponder_misses += 1
+            return False
+        self.ponder_hits += 1
+        if self._thread.is_alive():
+            from bitboard import FULL, popcount
+            from endgame_solver import DEFAULT_ENDGAME_EMPTIES
+
+            # An unfinished exact endgame solve cannot be cut short without losing its result, so search again
+            # with the usual split between the solver and the heuristic search
+            if popcount(~(game.black | game.white) & FULL) <= DEFAULT_ENDGAME_EMPTIES:
+                return False
+            if self.time_limit_ms is not None:
+                self._deadline = time.perf_counter() + self.time_limit_ms / 1000
+        self._pondering = False
+        return True
+
+    def _copy(self, game):
+        """
+        Copy the position of a game, so the game can still be drawn and played while it is searched.
+        """
+        position = OthelloGame(player_mode=game.player_mode)
+        position.set_position(game.black, game.white, game.current_player)
+        return position
+
+    def _reset(self):
+        """
+        Clear the state of the previous search, once no earlier search thread is running.
+        """
+        self.depth = 0
+        self.nodes = 0
+        self._move = None
+        self._deadline = None
+        self._ponder_position = None
+        self._principal_variation = []
+        self._cancelled.clear()
+
+    def _search(self, game, time_limit_ms):
+        """
+        Run the search in the background thread.
+        """
+        from ai_agent import get_best_move
+
+        stats = {}
+        self._move = get_best_move(
+            game,
+            self.max_depth,
+            time_limit_ms=time_limit_ms,
+            stats=stats,
+            callback=self._on_progress,
+        )
+        # A cancelled search stopped early, and its line may be of another position
+        if not self._cancelled.is_set():
+            self._principal_variation = stats["pv"]
+
+    def _ponder(self, game, expected):
+        """
+        Play the player's expected reply and search the AI's answer in the background thread.
+        """
+        from ai_agent import get_best_move
+
+        if expected is None and game.get_valid_moves_mask():
+            expected = get_best_move(
+                game, PONDER_GUESS_DEPTH, callback=self._on_progress
+            )
+        if self._cancelled.is_set():
+            return
+        if expected is PASS:
+            if game.pass_turn() is None:
+                return
+        elif game.make_move(*expected) is None:
+            return
+        if game.is_game_over():
+            return
+        self._ponder_position = (game.black, game.white, game.current_player)
+        # No time limit until the player makes the expected move (see start)
+        self._search(game, None)
+
+    def _on_progress(self, event, info):
+        """
+        Record the progress of the search and stop it once it has been cancelled.
+        """
+        if event == "progress":
+            # The search treats this like a deadline and returns its best move so far
+            if self._cancelled.is_set() or (
+                self._deadline is not None and time.perf_counter() >= self._deadline
+            ):
+                from ai_agent import SearchTimeout
+
+                raise SearchTimeout
+            self.depth = info["depth"]
+            self.nodes = info["nodes"]
+        else:
+            self.nodes = info["nodes"]
+
+    def result(self):
+        """
+        Take the move of the finished search.
+
+        Returns:
+            tuple: The best move (row, col), or None if the player has to pass.
+        """
+        self._thread.join()
+        self._thread = None
+        return self._move
+
+    def cancel(self, timeout=1.0):
+        """
+        Stop a running search and discard its move.
+
+        Args:
+            timeout (float): The longest time in seconds to wait for the search thread to stop. If it is still
+                running after that, the next search waits for it before starting.
+        """
+        if self._thread is None:
+            return
+        if self._thread.ident is None:
+            # Never started, so there is nothing to stop
+            self._thread = None
+            self._pondering = False
+            return
+        self._cancelled.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # The next search starts once it has exited (see _start_when_stopped)
+            self._stopping = self._thread
+        self._thread = None
+        self._pondering = False
@@ -0,0 +1,65 @@
+import pygame
+
+# Constants
+WIDTH, HEIGHT = 480, 560
+BACKGROUND_IMAGE_PATH = "./utils/pictures/othello_blurred.jpg"
+SOUND_PATHS = {
+    "disk_flip": "./utils/sounds/disk_flip.mp3",
+    "end_game": "./utils/sounds/end_game.mp3",
+    "invalid_play": "./utils/sounds/invalid_play.mp3",
+}
+
+
+class Assets:
+    def __init__(self):
+        """
+        The images, sounds and fonts of the GUI, shared by every screen.
+
+        Every asset is loaded the first time it is used and then kept, so the menu does not wait for the game's
+        sounds and a new game does not load anything again. Images are converted to the display's pixel format
+        when they are loaded, which needs the window to exist already.
+        """
+        self._background_image = None
+        self._sounds = {}
+        self._fonts = {}
+
+    @property
+    def background_image(self):
+        """
+        The menu background, scaled to the window.
+
+        Returns:
+            pygame.Surface: The background image.
+        """
+        if self._background_image is None:
+            image = pygame.image.load(BACKGROUND_IMAGE_PATH).convert()
+            self._background_image = pygame.transform.scale(image, (WIDTH, HEIGHT))
+        return self._background_image
+
+    def sound(self, name):
+        """
+        Get a sound effect, loading it on first use.
+
+        Parameters:
+            name (str): The name of the sound (see SOUND_PATHS).
+
+        Returns:
+            pygame.mixer.Sound: The sound.
+        """
+        if name not in self._sounds:
+            self._sounds[name] = pygame.mixer.Sound(SOUND_PATHS[name])
+        return self._sounds[name]
+
+    def font(self, size):
+        """
+        Get the default system font at a size, creating it on first use.
+
+        Parameters:
+            size (int): The font size.
+
+        Returns:
+            pygame.font.Font: The font.
+        """
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.SysFont(None, size)
+        return self._fonts[size]
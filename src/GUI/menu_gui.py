@@ -1,7 +1,6 @@
 import pygame
-import sys
-from GUI.othello_gui import OthelloGUI, run_game
 from GUI.button_gui import Button
+from GUI.screen_manager import Screen, ScreenManager
 
 # Constants and colors
 WIDTH, HEIGHT = 480, 560
@@ -9,117 +8,160 @@ WHITE_COLOR = (255, 255, 255)
 BLACK_COLOR = (0, 0, 0)
 GREEN_COLOR = (0, 128, 0)
 SUBMENU_SPACING = 75  # Increase the vertical spacing between submenu buttons
-BACKGROUND_IMAGE_PATH = "./utils/pictures/othello_blurred.jpg"
 
 
-class Menu:
-    def __init__(self):
+class MenuScreen(Screen):
+    def __init__(self, manager):
         """
-        A class representing the main menu of the Othello game.
+        A base class for the menu screens: a background image with buttons that are clicked to navigate.
+
+        Menus are static, so they are only drawn when they are entered or the window is uncovered.
+
+        Parameters:
+            manager (ScreenManager): The screen manager that owns the window and the shared assets.
 
         Attributes:
             win (pygame.Surface): The Pygame window.
-            menu_font (pygame.font.Font): The font used for rendering the menu items.
-            menu_items (list): The list of menu items displayed on the main menu.
-            submenu_items (list): The list of submenu items displayed after selecting "Start Game".
-            return_button (Button): The button to return to the main menu from the credit screen.
-        """
-        self.win = self.initialize_pygame()
-        self.menu_font = pygame.font.SysFont(None, 36)
-        self.menu_items = ["Start Game", "Credit", "Exit"]
-        self.submenu_items = [
-            "Multi-player\n(Play with Friend)",
-            "Single-player\n(Play with AI)",
-            "Return to Main Menu",  # Add "Return to Main Menu" option
-        ]
-        self.return_button = None
-        self.background_image = pygame.image.load(BACKGROUND_IMAGE_PATH)
-        self.background_image = pygame.transform.scale(
-            self.background_image, (WIDTH, HEIGHT)
-        )
-
-    def initialize_pygame(self):
+            buttons (list): The buttons of the screen; each button's action is called when it is clicked.
         """
-        Initialize Pygame and create a window for the main menu.
+        super().__init__(manager)
+        self.win = manager.win
+        self.buttons = []
+        self.needs_redraw = True
 
-        Returns:
-            pygame.Surface: The Pygame window.
+    def enter(self):
+        """
+        Set the window caption and draw the menu when it is shown.
         """
-        pygame.init()
-        win = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Othello - Main Menu")
-        return win
+        self.needs_redraw = True
 
-    def draw_menu(self):
+    def handle_event(self, event):
         """
-        Draw the main menu on the Pygame window.
+        Handle input events for the menu.
+
+        Parameters:
+            event (pygame.event.Event): The event.
         """
-        self.win.blit(self.background_image, (0, 0))  # Draw the background image
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.needs_redraw = True
 
-        buttons = []
-        for i, item in enumerate(self.menu_items):
-            button = Button(
-                WIDTH // 2, 200 + i * 50, 200, 40, item, self.menu_font
-            )  # Adjust vertical position to accommodate the picture
-            buttons.append(button)
-            button.draw(self.win)
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            for button in self.buttons:
+                if button.check_collision(event.pos):
+                    button.action()
+                    break
 
+    def draw(self):
+        """
+        Draw the menu on the Pygame window if it needs to be redrawn.
+        """
+        if not self.needs_redraw:
+            return
+        self.needs_redraw = False
+        self.win.blit(
+            self.manager.assets.background_image, (0, 0)
+        )  # Draw the background image
+        self.draw_contents()
+        for button in self.buttons:
+            button.draw(self.win)
         pygame.display.update()
-        self.handle_input_menu(buttons)
 
-    def draw_submenu(self):
+    def draw_contents(self):
+        """
+        Draw anything other than the buttons on top of the background.
+        """
+
+
+class MainMenuScreen(MenuScreen):
+    def __init__(self, manager):
         """
-        Draw the submenu on the Pygame window.
+        The main menu of the Othello game, with options to start the game, view credits, or exit.
+
+        Parameters:
+            manager (ScreenManager): The screen manager that owns the window and the shared assets.
+        """
+        super().__init__(manager)
+        menu_font = manager.assets.font(36)
+        menu_items = [
+            ("Start Game", lambda: manager.switch_to("submenu")),
+            ("Credit", lambda: manager.switch_to("credit")),
+            ("Exit", manager.quit),
+        ]
+        for i, (item, action) in enumerate(menu_items):
+            self.buttons.append(
+                Button(WIDTH // 2, 200 + i * 50, 200, 40, item, menu_font, action)
+            )  # Adjust vertical position to accommodate the picture
+
+
+class SubmenuScreen(MenuScreen):
+    def __init__(self, manager):
         """
-        self.win.blit(self.background_image, (0, 0))  # Draw the background image
+        The submenu to choose the game mode: multi-player or single-player with AI.
 
-        buttons = []
-        num_submenu_items = len(self.submenu_items)
-        submenu_height = num_submenu_items * SUBMENU_SPACING
+        Parameters:
+            manager (ScreenManager): The screen manager that owns the window and the shared assets.
+        """
+        super().__init__(manager)
+        menu_font = manager.assets.font(36)
+        submenu_items = [
+            (
+                "Multi-player\n(Play with Friend)",
+                lambda: manager.switch_to("game", player_mode="friend"),
+            ),
+            (
+                "Single-player\n(Play with AI)",
+                lambda: manager.switch_to("game", player_mode="ai"),
+            ),
+            (
+                "Return to Main Menu",
+                lambda: manager.switch_to("main_menu"),
+            ),
+        ]
+        submenu_height = len(submenu_items) * SUBMENU_SPACING
         submenu_top_margin = (HEIGHT - submenu_height) // 2
 
-        for i, item in enumerate(self.submenu_items):
+        for i, (item, action) in enumerate(submenu_items):
             button_y = submenu_top_margin + i * SUBMENU_SPACING
-            button = Button(
-                WIDTH // 2, button_y, 200, 30, item, self.menu_font
+            self.buttons.append(
+                Button(WIDTH // 2, button_y, 200, 30, item, menu_font, action)
             )  # Adjust height to 30
-            buttons.append(button)
-            button.draw(self.win)
 
-        pygame.display.update()
-        self.handle_input_submenu(buttons)
 
-    def draw_credit(self):
-        """
-        Draw the credit screen on the Pygame window.
+class CreditScreen(MenuScreen):
+    def __init__(self, manager):
         """
-        self.win.blit(self.background_image, (0, 0))  # Draw the background image
+        The credit screen, with the developer's name and a button to return to the main menu.
+
+        Parameters:
+            manager (ScreenManager): The screen manager that owns the window and the shared assets.
+        """
+        super().__init__(manager)
+        self.buttons.append(
+            Button(
+                WIDTH // 2,
+                HEIGHT // 2 + 40,
+                200,
+                40,
+                "Return to Main Menu",
+                manager.assets.font(30),
+                lambda: manager.switch_to("main_menu"),
+            )
+        )
 
+    def draw_contents(self):
+        """
+        Draw the credit text and GitHub link.
+        """
         credit_text = "Written and Developed by AmirHossein Roodaki"
         github_link = "GitHub: /Roodaki"
-        return_button_text = "Return to Main Menu"
 
-        credit_font = pygame.font.SysFont(None, 24)
-        github_font = pygame.font.SysFont(None, 20)
-        return_button_font = pygame.font.SysFont(None, 30)
+        credit_font = self.manager.assets.font(24)
+        github_font = self.manager.assets.font(20)
 
-        credit_surface = credit_font.render(credit_text, True, BLACK_COLOR)
         github_surface = github_font.render(github_link, True, BLACK_COLOR)
-
-        credit_rect = credit_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 40))
         github_rect = github_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
 
-        self.return_button = Button(
-            WIDTH // 2,
-            HEIGHT // 2 + 40,
-            200,
-            40,
-            return_button_text,
-            return_button_font,
-            self.draw_menu,
-        )
-        self.return_button.draw(self.win)
-
         # Wrap and render the credit text if it exceeds the window width
         credit_lines = []
         words = credit_text.split()
@@ -144,108 +186,35 @@ class Menu:
 
         self.win.blit(github_surface, github_rect)
 
-        pygame.display.update()
-        self.handle_input_credit()
-
-    def handle_input_menu(self, buttons):
-        """
-        Handle input events for the main menu.
-
-        Parameters:
-            buttons (list): The list of buttons in the main menu.
-        """
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    x, y = event.pos
-                    for button in buttons:
-                        if button.check_collision((x, y)):
-                            if button.text == "Start Game":
-                                self.draw_submenu()
-                            elif button.text == "Credit":
-                                self.draw_credit()
-                            elif button.text == "Exit":
-                                pygame.quit()
-                                sys.exit()
-
-    def handle_input_submenu(self, buttons):
-        """
-        Handle input events for the submenu.
-
-        Parameters:
-            buttons (list): The list of buttons in the submenu.
-        """
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    x, y = event.pos
-                    for button in buttons:
-                        if button.check_collision((x, y)):
-                            if button.text == "Multi-player\n(Play with Friend)":
-                                othello_gui = OthelloGUI()
-                                # Pass the draw_menu function as a callback to return to the main menu
-                                othello_gui.run_game(
-                                    return_to_menu_callback=self.draw_menu
-                                )
-
-                            elif button.text == "Single-player\n(Play with AI)":
-                                othello_gui = OthelloGUI(player_mode="ai")
-                                # Pass the draw_menu function as a callback to return to the main menu
-                                othello_gui.run_game(
-                                    return_to_menu_callback=self.draw_menu
-                                )
-
-                            elif button.text == "Return to Main Menu":
-                                self.draw_menu()  # Go back to the main menu
 
-    def run_single_player_game(self):
-        """
-        Start a single-player game with AI.
-        """
-        # Pass "ai" as the player_mode to indicate the single-player mode with AI
-        othello_gui = OthelloGUI(player_mode="ai")
-        othello_gui.run_game()
-
-    def handle_input_credit(self):
-        """
-        Handle input events for the credit screen.
-        """
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+def create_game_screen(manager, player_mode="friend"):
+    """
+    Create the game screen, importing the game GUI only when the first game starts so the menu appears sooner.
 
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    x, y = event.pos
-                    if self.return_button.check_collision((x, y)):
-                        self.perform_action(self.return_button.action)
+    Parameters:
+        manager (ScreenManager): The screen manager.
+        player_mode (str): The mode of the game, either "friend" or "ai".
 
-    def perform_action(self, action):
-        """
-        Perform the specified action.
+    Returns:
+        OthelloGUI: The game screen.
+    """
+    from GUI.othello_gui import OthelloGUI
 
-        Parameters:
-            action (callable): The function to be called as the action.
-        """
-        if action is None:
-            pygame.quit()
-            sys.exit()
-        else:
-            action()
+    return OthelloGUI(player_mode=player_mode, manager=manager)
 
 
-def run_menu():
+def run_menu(start_time=None, report_timing=False):
     """
-    Start the main menu of the Othello game.
+    Start the main menu of the Othello game and run it until the window is closed.
+
+    Parameters:
+        start_time (float): The time.perf_counter() value when the program started, to measure the cold start.
+        report_timing (bool): Whether to print how long each screen took to appear (see ScreenManager).
     """
-    menu = Menu()
-    menu.draw_menu()
+    manager = ScreenManager(start_time, report_timing)
+    manager.register("main_menu", MainMenuScreen)
+    manager.register("submenu", SubmenuScreen)
+    manager.register("credit", CreditScreen)
+    manager.register("game", create_game_screen)
+    manager.run("main_menu")
+    pygame.quit()
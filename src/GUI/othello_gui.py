@@ -1,7 +1,8 @@
 import pygame
-import sys
+from bitboard import bit_to_square, iter_bits
 from othello_game import OthelloGame
-from ai_agent import get_best_move
+from GUI.ai_worker import AIWorker
+from GUI.screen_manager import Screen, ScreenManager
 
 # Constants and colors
 WIDTH, HEIGHT = 480, 560
@@ -10,157 +11,275 @@ SQUARE_SIZE = (HEIGHT - 80) // BOARD_SIZE
 BLACK_COLOR = (0, 0, 0)
 WHITE_COLOR = (255, 255, 255)
 GREEN_COLOR = (0, 128, 0)
+AI_TIME_LIMIT_MS = 3000  # Time budget for each AI move
+AI_PONDERING = True  # Search the AI's next move while the player thinks
+RESULT_DISPLAY_MS = 3000  # How long the result is shown before returning to the menu
 
 
-class OthelloGUI:
-    def __init__(self, player_mode="friend"):
+class OthelloGUI(Screen):
+    def __init__(self, player_mode="friend", manager=None):
         """
         A graphical user interface (GUI) for playing the Othello game.
 
+        The game is a screen of a ScreenManager: the manager's event loop passes it events and calls `update`
+        and `draw` every frame. Once the game is over and the result has been shown, it switches to the
+        "main_menu" screen, which stops the manager if there is no menu.
+
         Args:
             player_mode (str): The mode of the game, either "friend" or "ai" (default is "friend").
+            manager (ScreenManager): The screen manager to run in. Defaults to a new one with its own window.
         """
-        self.win = self.initialize_pygame()
+        super().__init__(manager if manager is not None else ScreenManager())
+        self.win = self.manager.win
         self.game = OthelloGame(player_mode=player_mode)
-        self.message_font = pygame.font.SysFont(None, 24)
+        self.message_font = self.manager.assets.font(24)
         self.message = ""
         self.invalid_move_message = ""
-        self.flip_sound = pygame.mixer.Sound("./utils/sounds/disk_flip.mp3")
-        self.end_game_sound = pygame.mixer.Sound("./utils/sounds/end_game.mp3")
-        self.invalid_play_sound = pygame.mixer.Sound("./utils/sounds/invalid_play.mp3")
+        self.flip_sound = self.manager.assets.sound("disk_flip")
+        self.end_game_sound = self.manager.assets.sound("end_game")
+        self.invalid_play_sound = self.manager.assets.sound("invalid_play")
+        self.ai_worker = AIWorker(time_limit_ms=AI_TIME_LIMIT_MS)
+        self.board_background = self.build_board_background()
+        self.full_redraw = True  # Redraw the whole window on the next frame
+        self.drawn_black = self.drawn_white = 0  # The disks on the window
+        self.drawn_texts = None  # The messages on the window
+        self.game_over_time = (
+            None  # The pygame.time.get_ticks() value when the game ended
+        )
 
-    def initialize_pygame(self):
+    def enter(self):
         """
-        Initialize the Pygame library and create the game window.
-
-        Returns:
-            pygame.Surface: The Pygame surface representing the game window.
+        Set the window caption and redraw the whole window when the game screen is shown.
         """
-        pygame.init()
-        win = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Othello")
-        return win
+        self.full_redraw = True
 
-    def draw_board(self):
+    def exit(self):
         """
-        Draw the Othello game board and messaging area on the window.
+        Stop a running AI search when the game screen is left or the window is closed.
+        """
+        self.ai_worker.cancel()
+
+    def build_board_background(self):
         """
-        self.win.fill(GREEN_COLOR)
+        Pre-render the empty board (green squares with their grid lines) to a surface.
 
-        # Draw board grid and disks
+        Returns:
+            pygame.Surface: The empty board, BOARD_SIZE squares wide and high.
+        """
+        background = pygame.Surface(
+            (BOARD_SIZE * SQUARE_SIZE, BOARD_SIZE * SQUARE_SIZE)
+        ).convert()
+        background.fill(GREEN_COLOR)
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
                 pygame.draw.rect(
-                    self.win,
+                    background,
                     BLACK_COLOR,
                     (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE),
                     1,
                 )
-                if self.game.board[row][col] == 1:
-                    pygame.draw.circle(
-                        self.win,
-                        BLACK_COLOR,
-                        ((col + 0.5) * SQUARE_SIZE, (row + 0.5) * SQUARE_SIZE),
-                        SQUARE_SIZE // 2 - 4,
-                    )
-                elif self.game.board[row][col] == -1:
-                    pygame.draw.circle(
-                        self.win,
-                        WHITE_COLOR,
-                        ((col + 0.5) * SQUARE_SIZE, (row + 0.5) * SQUARE_SIZE),
-                        SQUARE_SIZE // 2 - 4,
-                    )
-
-        # Draw messaging area
+        return background
+
+    def draw_board(self):
+        """
+        Draw the Othello game board and messaging area on the window.
+
+        Only the squares whose disks changed since the last call and, if any of its texts changed, the messaging
+        area are redrawn and updated on the display. The whole window is redrawn on the first call and after
+        it has been uncovered.
+        """
+        dirty_rects = []
+        black, white = self.game.black, self.game.white
+        if self.full_redraw:
+            self.win.blit(self.board_background, (0, 0))
+            changed = black | white
+            self.drawn_texts = None
+            dirty_rects.append(self.win.get_rect())
+            self.full_redraw = False
+        else:
+            changed = (black ^ self.drawn_black) | (white ^ self.drawn_white)
+
+        # Redraw the squares whose disks were placed or flipped
+        for bit in iter_bits(changed):
+            row, col = bit_to_square(bit)
+            square_rect = pygame.Rect(
+                col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE
+            )
+            self.win.blit(self.board_background, square_rect, square_rect)
+            if black & bit:
+                disk_color = BLACK_COLOR
+            elif white & bit:
+                disk_color = WHITE_COLOR
+            else:
+                disk_color = None
+            if disk_color is not None:
+                pygame.draw.circle(
+                    self.win,
+                    disk_color,
+                    square_rect.center,
+                    SQUARE_SIZE // 2 - 4,
+                )
+            dirty_rects.append(square_rect)
+        self.drawn_black, self.drawn_white = black, white
+
+        # Redraw the messaging area if any of its texts changed
+        player_turn = "Black's" if self.game.current_player == 1 else "White's"
+        texts = (f"{player_turn} turn", self.message, self.invalid_move_message)
+        if texts != self.drawn_texts:
+            dirty_rects.append(self.draw_messages(*texts))
+            self.drawn_texts = texts
+
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    def draw_messages(self, turn_message, message, invalid_move_message):
+        """
+        Draw the messaging area below the board.
+
+        Args:
+            turn_message (str): The player's turn message.
+            message (str): The game message (AI progress or result), or an empty string.
+            invalid_move_message (str): The invalid move or pass message, or an empty string.
+
+        Returns:
+            pygame.Rect: The area that was drawn.
+        """
         message_area_rect = pygame.Rect(
             0, BOARD_SIZE * SQUARE_SIZE, WIDTH, HEIGHT - (BOARD_SIZE * SQUARE_SIZE)
         )
         pygame.draw.rect(self.win, WHITE_COLOR, message_area_rect)
 
         # Draw player's turn message
-        player_turn = "Black's" if self.game.current_player == 1 else "White's"
-        turn_message = f"{player_turn} turn"
         message_surface = self.message_font.render(turn_message, True, BLACK_COLOR)
         message_rect = message_surface.get_rect(
             center=(WIDTH // 2, (HEIGHT + BOARD_SIZE * SQUARE_SIZE) // 2 - 20)
         )
         self.win.blit(message_surface, message_rect)
 
-        # Draw invalid move message
-        if self.message:
-            invalid_move_message = self.message
-            message_surface = self.message_font.render(
-                invalid_move_message, True, BLACK_COLOR
-            )
-            message_rect = message_surface.get_rect(
-                center=(WIDTH // 2, (HEIGHT + BOARD_SIZE * SQUARE_SIZE) // 2 + 20)
-            )
-            self.win.blit(message_surface, message_rect)
-
-        # Draw invalid move message
-        if self.invalid_move_message:
-            message_surface = self.message_font.render(
-                self.invalid_move_message, True, BLACK_COLOR
-            )
-            message_rect = message_surface.get_rect(
-                center=(WIDTH // 2, (HEIGHT + BOARD_SIZE * SQUARE_SIZE) // 2 + 20)
-            )
-            self.win.blit(message_surface, message_rect)
+        # Draw the game message and the invalid move message
+        for text in (message, invalid_move_message):
+            if text:
+                message_surface = self.message_font.render(text, True, BLACK_COLOR)
+                message_rect = message_surface.get_rect(
+                    center=(WIDTH // 2, (HEIGHT + BOARD_SIZE * SQUARE_SIZE) // 2 + 20)
+                )
+                self.win.blit(message_surface, message_rect)
 
-        pygame.display.update()
+        return message_area_rect
 
-    def handle_input(self):
+    def handle_event(self, event):
         """
-        Handle user input events such as mouse clicks and game quitting.
+        Handle user input events such as mouse clicks.
+
+        Args:
+            event (pygame.event.Event): The event.
         """
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        # The window contents may be lost while it is covered or minimized
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.full_redraw = True
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = event.pos
-                col = x // SQUARE_SIZE
-                row = y // SQUARE_SIZE
-                if self.game.is_valid_move(row, col):
-                    self.game.make_move(row, col)
-                    self.invalid_move_message = (
-                        ""  # Clear any previous invalid move message
-                    )
-                    self.flip_sound.play()  # Play flip sound effect
-                else:
-                    self.invalid_move_message = "Invalid move! Try again."
-                    self.invalid_play_sound.play()  # Play invalid play sound effect
+        if (
+            event.type == pygame.MOUSEBUTTONDOWN
+            and not self.is_ai_turn()
+            and not self.game.is_game_over()
+        ):
+            x, y = event.pos
+            col = x // SQUARE_SIZE
+            row = y // SQUARE_SIZE
+            if self.game.is_valid_move(row, col):
+                self.game.make_move(row, col)
+                self.invalid_move_message = (
+                    ""  # Clear any previous invalid move message
+                )
+                self.flip_sound.play()  # Play flip sound effect
+            else:
+                self.invalid_move_message = "Invalid move! Try again."
+                self.invalid_play_sound.play()  # Play invalid play sound effect
 
-    def run_game(self, return_to_menu_callback=None):
+    def is_ai_turn(self):
+        """
+        Check if it's the AI player's turn to move.
+
+        Returns:
+            bool: True in single-player mode while White (the AI) is to move and the game is not over.
         """
-        Run the main game loop until the game is over and display the result.
+        return (
+            self.game.player_mode == "ai"
+            and self.game.current_player == -1
+            and not self.game.is_game_over()
+        )
+
+    def update_ai(self):
         """
-        while not self.game.is_game_over():
-            self.handle_input()
+        Start the AI search on the AI's turn, show its progress while it runs, and play its move once it is done.
 
-            # If it's the AI player's turn
-            if self.game.player_mode == "ai" and self.game.current_player == -1:
-                self.message = "AI is thinking..."
-                self.draw_board()  # Display the thinking message
-                ai_move = get_best_move(self.game)
-                pygame.time.delay(500)  # Wait for a short time to show the message
+        The search runs in a background thread, so this returns immediately and is called once per frame. With
+        AI_PONDERING, the AI goes on searching on the player's turn after its move (see AIWorker.ponder).
+        """
+        if not self.is_ai_turn():
+            return
+        if not self.ai_worker.thinking:
+            self.ai_worker.start(self.game)
+        if self.ai_worker.done:
+            ai_move = self.ai_worker.result()
+            if ai_move is not None:
                 self.game.make_move(*ai_move)
+            self.message = ""
+            if AI_PONDERING and not self.game.is_game_over():
+                self.ai_worker.ponder(self.game)
+        else:
+            self.message = (
+                f"AI is thinking... depth {self.ai_worker.depth}, "
+                f"{self.ai_worker.nodes} nodes"
+            )
+
+    def update(self):
+        """
+        Advance the game by one frame: make forced passes, run the AI, and end the game once neither player can
+        move.
+        """
+        if self.game_over_time is not None:
+            # Display the result for a while before returning to the menu
+            if pygame.time.get_ticks() - self.game_over_time >= RESULT_DISPLAY_MS:
+                self.manager.switch_to("main_menu")
+            return
 
-            self.message = ""  # Clear any previous messages
-            self.draw_board()
+        # A player without a valid move passes the turn to the opponent
+        if self.game.must_pass():
+            player = "Black" if self.game.current_player == 1 else "White"
+            self.game.pass_turn()
+            self.invalid_move_message = f"{player} has no valid moves and passes."
 
-        winner = self.game.get_winner()
-        if winner == 1:
-            self.message = "Black wins!"
-        elif winner == -1:
-            self.message = "White wins!"
-        else:
-            self.message = "It's a tie!"
+        # If it's the AI player's turn, search in the background while the
+        # window keeps handling events and redrawing
+        self.update_ai()
+
+        if self.game.is_game_over():
+            winner = self.game.get_winner()
+            if winner == 1:
+                self.message = "Black wins!"
+            elif winner == -1:
+                self.message = "White wins!"
+            else:
+                self.message = "It's a tie!"
+            self.end_game_sound.play()  # Play end game sound effect
+            self.game_over_time = pygame.time.get_ticks()
 
+    def draw(self):
+        """
+        Draw the changed parts of the game screen.
+        """
         self.draw_board()
-        self.end_game_sound.play()  # Play end game sound effect
-        pygame.time.delay(3000)  # Display the result for 2 seconds before returning
+
+    def run_game(self, return_to_menu_callback=None):
+        """
+        Run the game in its screen manager until the game is over and the result has been displayed.
+
+        Args:
+            return_to_menu_callback (callable): Called once the game screen has finished, if given.
+        """
+        self.manager.run(self)
 
         # Call the return_to_menu_callback if provided
         if return_to_menu_callback:
@@ -173,3 +292,4 @@ def run_game():
     """
     othello_gui = OthelloGUI()
     othello_gui.run_game()
+    pygame.quit()
@@ -0,0 +1,173 @@
+import sys
+import time
+
+import pygame
+
+from GUI.assets import HEIGHT, WIDTH, Assets
+
+FRAME_RATE = 30  # Frames per second of the event loop
+
+
+class Screen:
+    def __init__(self, manager):
+        """
+        A base class for the screens of the GUI (menus, credits and the game itself).
+
+        A screen does not run its own loop: the ScreenManager passes it every event, then calls `update` and
+        `draw` once per frame. To move to another screen it calls `manager.switch_to`.
+
+        Parameters:
+            manager (ScreenManager): The screen manager that owns the window and the shared assets.
+        """
+        self.manager = manager
+
+    def enter(self):
+        """
+        Called when the screen becomes the current screen.
+        """
+
+    def exit(self):
+        """
+        Called when the screen stops being the current screen, or the window closes.
+        """
+
+    def handle_event(self, event):
+        """
+        Handle one Pygame event. QUIT is handled by the screen manager.
+
+        Parameters:
+            event (pygame.event.Event): The event.
+        """
+
+    def update(self):
+        """
+        Advance the state of the screen by one frame.
+        """
+
+    def draw(self):
+        """
+        Draw the screen on the window and update the display.
+        """
+
+
+class ScreenManager:
+    def __init__(self, start_time=None, report_timing=False):
+        """
+        A flat state machine over the screens of the GUI, with a single event loop.
+
+        The manager creates the window and the shared assets once. Screens are registered by name with a
+        factory, and `switch_to` replaces the current screen with a new one at the end of the frame, so
+        navigating never nests loops or keeps old screens alive.
+
+        The time each screen takes to appear, from the switch (or from start_time for the first screen) to the
+        end of its first frame, is recorded in `timings`.
+
+        Parameters:
+            start_time (float): The time.perf_counter() value when the program started. Defaults to now.
+            report_timing (bool): Whether to print each timing to standard error as it is recorded.
+
+        Attributes:
+            win (pygame.Surface): The Pygame window.
+            assets (Assets): The images, sounds and fonts shared by every screen.
+            current (Screen): The current screen, or None once the manager has stopped.
+            timings (list): One (screen name, milliseconds) pair per screen shown.
+        """
+        self._switch_time = (
+            start_time if start_time is not None else time.perf_counter()
+        )
+        pygame.init()
+        self.win = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.assets = Assets()
+        self.clock = pygame.time.Clock()
+        self.current = None
+        self.timings = []
+        self.report_timing = report_timing
+        self._factories = {}
+        self._pending = None
+        self._running = False
+
+    def register(self, name, factory):
+        """
+        Register a screen.
+
+        Parameters:
+            name (str): The name used to switch to the screen.
+            factory (callable): Called as factory(manager=..., **kwargs) to create the screen.
+        """
+        self._factories[name] = factory
+
+    def switch_to(self, name, **kwargs):
+        """
+        Switch to a new screen at the end of the current frame. Switching to an unregistered name stops the
+        manager.
+
+        Parameters:
+            name (str): The name of the screen.
+            **kwargs: Passed to the screen's factory.
+        """
+        self._pending = (name, kwargs)
+        self._switch_time = time.perf_counter()
+
+    def quit(self):
+        """
+        Stop the event loop at the end of the current frame.
+        """
+        self._running = False
+
+    def run(self, screen, **kwargs):
+        """
+        Run the event loop until the window is closed or `quit` is called.
+
+        Parameters:
+            screen (str or Screen): The name of the first screen, or a screen object.
+            **kwargs: Passed to the first screen's factory.
+        """
+        if isinstance(screen, str):
+            self._pending = (screen, kwargs)
+            shown = None
+        else:
+            self._set_current(screen)
+            shown = type(screen).__name__
+        self._running = True
+        while self._running:
+            if self._pending is not None:
+                name, kwargs = self._pending
+                self._pending = None
+                factory = self._factories.get(name)
+                if factory is None:
+                    break
+                self._set_current(factory(manager=self, **kwargs))
+                shown = name
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+                else:
+                    self.current.handle_event(event)
+            self.current.update()
+            self.current.draw()
+            if shown is not None:
+                self._record_timing(shown)
+                shown = None
+            self.clock.tick(FRAME_RATE)
+
+        self._set_current(None)
+
+    def _record_timing(self, name):
+        """
+        Record how long a screen took to appear since it was switched to.
+        """
+        milliseconds = (time.perf_counter() - self._switch_time) * 1000
+        self.timings.append((name, milliseconds))
+        if self.report_timing:
+            print(f"{name} ready in {milliseconds:.1f} ms", file=sys.stderr)
+
+    def _set_current(self, screen):
+        """
+        Replace the current screen, calling `exit` on the old one and `enter` on the new one.
+        """
+        if self.current is not None:
+            self.current.exit()
+        self.current = screen
+        if screen is not None:
+            screen.enter()
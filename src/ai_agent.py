@@ -1,96 +1,811 @@
-from othello_game import OthelloGame
+import importlib.util
+import os
+import time
+import warnings
+
+from bitboard import (
+    CORNERS,
+    EDGES,
+    FULL,
+    flips,
+    iter_bits,
+    legal_moves,
+    neighbours,
+    popcount,
+    square_to_bit,
+)
+from endgame_solver import DEFAULT_ENDGAME_EMPTIES, final_score, solve_game
+from move_ordering import SQUARE_PRIORITY, MoveOrderer
+from othello_game import PASS, OthelloGame, move_to_notation
+from pattern_evaluation import get_default_weights, pattern_score
+from stability import stable_bitboards
+from transposition_table import EXACT, LOWER, UPPER, TranspositionTable
+
+INFINITY = float("inf")
+
+# Finished games are scored as the final disk differential times this factor,
+# so that any won ending outranks every heuristic evaluation
+GAME_OVER_SCALE = 1000
+
+# Width of the zero windows used by principal variation search. Any score
+# strictly inside (alpha, beta) after a zero-window search triggers a full
+# re-search, so this only needs to be positive.
+NULL_WINDOW = 1.0
+
+# Half-width of the first aspiration window around the previous iteration's
+# score; it doubles after every fail-high or fail-low until it exceeds the maximum.
+ASPIRATION_WINDOW = 8.0
+MAX_ASPIRATION_WINDOW = 256.0
+
+# The clock is read once every this many nodes (must be a power of two)
+TIME_CHECK_INTERVAL = 256
+
+# Weights of evaluate_weighted (and of the batched evaluation in batch_evaluation.py)
+# besides the square weights, which are the SQUARE_PRIORITY table of move ordering
+MOBILITY_WEIGHT = 5
+FRONTIER_WEIGHT = 3
+
+# (weight, bitboard of the squares with that weight) pairs of SQUARE_PRIORITY
+SQUARE_WEIGHT_MASKS = tuple(
+    (
+        weight,
+        sum(
+            square_to_bit(row, col)
+            for row in range(8)
+            for col in range(8)
+            if SQUARE_PRIORITY[row][col] == weight
+        ),
+    )
+    for weight in sorted({weight for row in SQUARE_PRIORITY for weight in row})
+)
+
+# Setting this environment variable to a profiler name ("cprofile" or
+# "pyinstrument") profiles every get_best_move call (see profiling.py)
+PROFILE_ENVIRONMENT_VARIABLE = "OTHELLO_PROFILE"
+
+# The profiler named by the environment variable: None until it has been read,
+# then the name, or "" for no profiling
+_environment_profiler = None
+
+# Shared by successive get_best_move calls so later moves reuse earlier subtrees
+transposition_table = TranspositionTable()
 
+# The module-level tables of the other evaluators, created on first use (see default_table)
+_evaluator_tables = {}
 
-def get_best_move(game, max_depth=8):
+
+def default_table(evaluator=None):
     """
-    Given the current game state, this function returns the best move for the AI player using the Alpha-Beta Pruning
-    algorithm with a specified maximum search depth.
+    Get the module-level transposition table of an evaluation function.
+
+    Scores stored while searching with one evaluator are wrong under another, so each evaluator has its own
+    table. The default evaluator uses transposition_table.
 
     Parameters:
-        game (OthelloGame): The current game state.
-        max_depth (int): The maximum search depth for the Alpha-Beta algorithm.
+        evaluator (callable): The leaf evaluation function, or None for the default.
 
     Returns:
-        tuple: A tuple containing the evaluation value of the best move and the corresponding move (row, col).
+        TranspositionTable: The table, which persists across calls.
+    """
+    if evaluator is None or evaluator is evaluate_game_state:
+        return transposition_table
+    if evaluator not in _evaluator_tables:
+        _evaluator_tables[evaluator] = TranspositionTable()
+    return _evaluator_tables[evaluator]
+
+
+class SearchTimeout(Exception):
     """
-    _, best_move = alphabeta(game, max_depth)
-    return best_move
+    Raised inside the search when the time budget of the current move runs out.
+    """
+
 
+class SearchContext:
+    def __init__(
+        self,
+        table=None,
+        deadline=None,
+        orderer=None,
+        evaluator=None,
+        callback=None,
+        time_phases=False,
+        batch_plies=0,
+    ):
+        """
+        State shared by every node of one search.
+
+        Besides the node count, the context counts leaf evaluations, transposition table hits and cutoffs, and
+        beta cutoffs. With time_phases, it also times move generation and leaf evaluation, at the cost of two clock
+        reads per call.
+
+        Parameters:
+            table (TranspositionTable): The transposition table to probe and update, or None.
+            deadline (float): The time.perf_counter() value at which to stop searching, or None for no limit.
+            orderer (MoveOrderer): The move orderer of the search. Defaults to a new MoveOrderer.
+            evaluator (callable): The leaf evaluation function. Defaults to evaluate_game_state.
+            callback (callable): Called as callback("progress", {"depth": ..., "nodes": ...}) every
+                TIME_CHECK_INTERVAL nodes, or None.
+            time_phases (bool): Whether to time move generation and leaf evaluation (see phase_seconds).
+            batch_plies (int): The number of plies above the horizon that are searched in full, with their leaves
+                scored by one batched call of batch_evaluation.evaluate_bitboards (see batch_search). Needs NumPy.
+                Defaults to 0 (score every leaf on its own with the evaluator).
+        """
+        self.table = table
+        self.orderer = orderer if orderer is not None else MoveOrderer()
+        self.evaluate = evaluator if evaluator is not None else evaluate_game_state
+        self.generate_moves = OthelloGame.get_valid_moves
+        self.deadline = deadline
+        self.callback = callback
+        self.depth = 0
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.phase_seconds = None
+        self.batch_plies = batch_plies
+        self.batch_evaluate = None
+        if batch_plies:
+            from batch_evaluation import evaluate_bitboards, require_numpy
+
+            require_numpy()
+            self.batch_evaluate = evaluate_bitboards
+        if time_phases:
+            self.phase_seconds = {"movegen": 0.0, "eval": 0.0}
+            self.generate_moves = self._timed(self.generate_moves, "movegen")
+            self.evaluate = self._timed(self.evaluate, "eval")
+
+    def _timed(self, function, phase):
+        """
+        Wrap a function so that the time spent in it is added to phase_seconds[phase].
+        """
+        phase_seconds = self.phase_seconds
+        clock = time.perf_counter
+
+        def timed(game):
+            start = clock()
+            result = function(game)
+            phase_seconds[phase] += clock() - start
+            return result
+
+        return timed
+
+    def visit(self):
+        """
+        Count a node, report progress and raise SearchTimeout once the deadline has passed.
+        """
+        self.nodes += 1
+        if not self.nodes & (TIME_CHECK_INTERVAL - 1):
+            if self.callback is not None:
+                self.callback("progress", {"depth": self.depth, "nodes": self.nodes})
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchTimeout
+
+    def counters(self):
+        """
+        Get the node and event counts of the search so far.
+
+        Returns:
+            dict: The nodes, leaf evaluations, transposition table hits and cutoffs, and beta cutoffs.
+        """
+        return {
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "tt_hits": self.tt_hits,
+            "tt_cutoffs": self.tt_cutoffs,
+            "beta_cutoffs": self.beta_cutoffs,
+        }
+
+
+def new_stats():
+    """
+    Get an empty search report, as filled in by analyze.
 
-def alphabeta(
-    game, max_depth, maximizing_player=True, alpha=float("-inf"), beta=float("inf")
+    Returns:
+        dict: The report with every count at zero, no score, an empty principal variation and no iterations.
+    """
+    return {
+        "nodes": 0,
+        "leaf_evals": 0,
+        "tt_hits": 0,
+        "tt_cutoffs": 0,
+        "beta_cutoffs": 0,
+        "depth": 0,
+        "score": None,
+        "pv": [],
+        "iterations": [],
+        "time_ms": 0.0,
+        "book": False,
+    }
+
+
+def add_counters(stats, counters):
+    """
+    Add the counts of a search context (see SearchContext.counters) to a search report.
+
+    Parameters:
+        stats (dict): The search report.
+        counters (dict): The counts to add.
+    """
+    for key, value in counters.items():
+        stats[key] += value
+
+
+def record_iteration(
+    stats, depth, score, principal_variation, nodes, seconds, callback=None
 ):
     """
-    Alpha-Beta Pruning algorithm for selecting the best move for the AI player.
+    Add a completed iterative-deepening iteration to a search report and pass it to the callback.
+
+    Parameters:
+        stats (dict): The search report.
+        depth (int): The depth of the iteration.
+        score (float): The score of the iteration.
+        principal_variation (list): The principal variation of the iteration.
+        nodes (int): The nodes searched so far, including earlier iterations.
+        seconds (float): The time taken by the iteration alone.
+        callback (callable): Called as callback("iteration", iteration) if given.
+    """
+    iteration = {
+        "depth": depth,
+        "score": score,
+        "nodes": nodes,
+        "ms": seconds * 1000,
+        "pv": [move_to_notation(move) for move in principal_variation],
+    }
+    stats["iterations"].append(iteration)
+    if callback is not None:
+        callback("iteration", iteration)
+
+
+def get_best_move(
+    game,
+    max_depth=8,
+    table=None,
+    time_limit_ms=None,
+    orderer=None,
+    workers=1,
+    endgame_empties=DEFAULT_ENDGAME_EMPTIES,
+    evaluator=None,
+    stats=None,
+    callback=None,
+    time_phases=False,
+    use_book=None,
+    batch_plies=0,
+):
+    """
+    Given the current game state, this function returns the best move for the AI player.
+
+    Positions in the opening book (see opening_book.py) are answered from the book without searching; the
+    search report then has "book" set to True, the book move as its principal variation and the book's search
+    depth and score. The book is searched with evaluate_game_state, so by default it is only used with that
+    evaluator.
+
+    If the OTHELLO_PROFILE environment variable is set to "cprofile" or "pyinstrument", every call is run under
+    that profiler and the profile is saved to the directory in OTHELLO_PROFILE_DIR (see profiling.py). Other
+    values are ignored with a warning.
 
     Parameters:
         game (OthelloGame): The current game state.
-        max_depth (int): The maximum search depth for the Alpha-Beta algorithm.
-        maximizing_player (bool): True if maximizing player (AI), False if minimizing player (opponent).
-        alpha (float): The alpha value for pruning. Defaults to negative infinity.
-        beta (float): The beta value for pruning. Defaults to positive infinity.
+        max_depth (int): The maximum search depth.
+        table (TranspositionTable): The transposition table to use. Defaults to the module-level table of the
+            evaluator (see default_table), which persists across calls.
+        time_limit_ms (float): The time budget for the move in milliseconds. Defaults to None (no limit).
+        orderer (MoveOrderer): The move orderer to use. Pass one in to read its cutoff statistics afterwards.
+            Defaults to a new MoveOrderer.
+        workers (int): The number of processes to split the root moves across. Defaults to 1 (search in this
+            process).
+        endgame_empties (int): Solve the game exactly once this many squares or fewer are empty. Defaults to
+            DEFAULT_ENDGAME_EMPTIES.
+        evaluator (callable): The leaf evaluation function (see EVALUATORS). Defaults to evaluate_game_state.
+        stats (dict): If given, filled with the search report (see analyze).
+        callback (callable): Called with search progress and completed iterations (see analyze).
+        time_phases (bool): Whether to time move generation and leaf evaluation (see analyze).
+        use_book (bool): Whether to play the opening book move of positions in the book. Defaults to None (only
+            with the default evaluator, evaluate_game_state).
+        batch_plies (int): The number of plies above the horizon whose leaves are scored in batches (see
+            analyze).
 
     Returns:
-        tuple: A tuple containing the evaluation value of the best move and the corresponding move (row, col).
+        tuple: The best move (row, col), or PASS (None) if the current player has no valid move.
     """
-    if max_depth == 0 or game.is_game_over():
-        return evaluate_game_state(game), None
+    if use_book is None:
+        use_book = evaluator is None or evaluator is evaluate_game_state
+    if use_book:
+        from opening_book import get_default_book
+
+        book = get_default_book()
+        hit = book.probe(game) if book is not None else None
+        if hit is not None:
+            move, depth, score = hit
+            if stats is not None:
+                stats.clear()
+                stats.update(new_stats())
+                stats["book"] = True
+                _finish_stats(stats, depth, score, [move], time.perf_counter())
+            return move
+
+    arguments = (
+        game,
+        max_depth,
+        table,
+        time_limit_ms,
+        orderer,
+        workers,
+        endgame_empties,
+        evaluator,
+        stats,
+        callback,
+        time_phases,
+        batch_plies,
+    )
+    profiler = _profiler_from_environment()
+    if profiler:
+        from profiling import profile_to_directory
+
+        _, principal_variation = profile_to_directory(analyze, arguments, profiler)
+    else:
+        _, principal_variation = analyze(*arguments)
+    return principal_variation[0] if principal_variation else None
 
+
+def _profiler_from_environment():
+    """
+    Read the profiler named by OTHELLO_PROFILE, on the first call only.
+
+    An unknown name, or pyinstrument when it is not installed, is reported with a warning and ignored, so a
+    mistyped diagnostics setting never stops the search.
+
+    Returns:
+        str: "cprofile", "pyinstrument", or "" for no profiling.
+    """
+    global _environment_profiler
+    if _environment_profiler is None:
+        value = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, "")
+        profiler = value.strip().lower()
+        if profiler:
+            from profiling import PROFILERS
+
+            if profiler not in PROFILERS:
+                warnings.warn(
+                    f"Ignoring {PROFILE_ENVIRONMENT_VARIABLE}={value!r}: expected one of {PROFILERS}"
+                )
+                profiler = ""
+            elif (
+                profiler == "pyinstrument"
+                and importlib.util.find_spec("pyinstrument") is None
+            ):
+                warnings.warn(
+                    f"Ignoring {PROFILE_ENVIRONMENT_VARIABLE}={value!r}: pyinstrument is not installed"
+                )
+                profiler = ""
+        _environment_profiler = profiler
+    return _environment_profiler
+
+
+def analyze(
+    game,
+    max_depth=8,
+    table=None,
+    time_limit_ms=None,
+    orderer=None,
+    workers=1,
+    endgame_empties=DEFAULT_ENDGAME_EMPTIES,
+    evaluator=None,
+    stats=None,
+    callback=None,
+    time_phases=False,
+    batch_plies=0,
+):
+    """
+    Search the current game state and return its score and principal variation.
+
+    Runs iterative deepening over the negamax search. Each iteration searches one ply deeper than the previous
+    one inside an aspiration window centred on the previous score, widening and re-searching on a fail-high or
+    fail-low. The transposition table carries the best moves of earlier iterations forward so they are tried
+    first. When a time limit is given, the search stops as soon as it runs out and the result of the last
+    completed iteration is returned.
+
+    Once few squares are empty, the endgame solver searches to the end of the game instead, and the score is the
+    exact final disk differential times GAME_OVER_SCALE, the unit in which the search scores finished games. With
+    a time limit the solver gets half of the budget; if it does not finish, the heuristic search runs in the
+    remaining half.
+
+    The search report filled into stats has the keys of new_stats(): the counts of nodes, leaf evaluations
+    ("leaf_evals"), transposition table hits and cutoffs ("tt_hits", "tt_cutoffs") and beta cutoffs; the depth
+    of the last completed iteration (the number of empty squares for an exact endgame solve); the score and
+    principal variation (in standard notation); the total time ("time_ms"); and one entry per completed
+    iteration in "iterations" with its depth, score, cumulative nodes, own time in milliseconds and principal
+    variation. With time_phases, "movegen_ms" and "eval_ms" give the time spent generating moves and evaluating
+    leaves. "book" is always False here; only get_best_move plays from the opening book.
+
+    Parameters:
+        game (OthelloGame): The current game state.
+        max_depth (int): The maximum search depth.
+        table (TranspositionTable): The transposition table to use. Defaults to the module-level table of the
+            evaluator (see default_table), which persists across calls.
+        time_limit_ms (float): The time budget for the move in milliseconds. Defaults to None (no limit).
+        orderer (MoveOrderer): The move orderer to use. Defaults to a new MoveOrderer.
+        workers (int): The number of processes to split the root moves across (see parallel_search). With more
+            than one worker, the workers' own transposition tables and orderers are used instead of table and
+            orderer. Defaults to 1 (search in this process).
+        endgame_empties (int): Solve the game exactly once this many squares or fewer are empty. Defaults to
+            DEFAULT_ENDGAME_EMPTIES.
+        evaluator (callable): The leaf evaluation function (see EVALUATORS). Defaults to evaluate_game_state.
+        stats (dict): If given, filled with the search report.
+        callback (callable): If given, called as callback("iteration", iteration) after every completed
+            iteration, with the same dict that is added to stats["iterations"], and as
+            callback("progress", {"depth": ..., "nodes": ...}) every TIME_CHECK_INTERVAL nodes of a search in
+            this process. It runs inside the search, so it should return quickly.
+        time_phases (bool): Whether to time move generation and leaf evaluation. It slows the search down a
+            little and is ignored with more than one worker. Defaults to False.
+        batch_plies (int): If positive, the last batch_plies plies of every line are searched in full without
+            pruning, and all the leaves below each such node are scored in one call of the batched NumPy
+            evaluation (see batch_search), which scores like evaluate_weighted and replaces evaluator. It gives
+            up pruning in those plies for far fewer evaluation calls, so it only pays off when leaf evaluation
+            dominates the search time. Needs NumPy, and is ignored with more than one worker. Defaults to 0.
+
+    Returns:
+        tuple: The score from the current player's point of view and the principal variation as a list of
+        moves (row, col) or PASS, starting with the best move. The list is empty if the game is over.
+    """
+    start = time.perf_counter()
+    if stats is None:
+        stats = {}
+    stats.clear()
+    stats.update(new_stats())
+    if game.is_game_over():
+        return _finish_stats(stats, 0, game_over_score(game), [], start)
     valid_moves = game.get_valid_moves()
 
-    if maximizing_player:
-        max_eval = float("-inf")
-        best_move = None
+    empties = popcount(~(game.black | game.white) & FULL)
+    if empties <= endgame_empties:
+        solver_deadline = None
+        if time_limit_ms is not None:
+            solver_deadline = start + time_limit_ms / 2000
+            time_limit_ms /= 2
+        solver_context = SearchContext(deadline=solver_deadline, callback=callback)
+        solver_context.depth = empties
+        try:
+            score, move = solve_game(game, solver_context)
+        except SearchTimeout:
+            add_counters(stats, solver_context.counters())
+        else:
+            add_counters(stats, solver_context.counters())
+            # In the unit of the heuristic search, which scores finished games like game_over_score
+            score *= GAME_OVER_SCALE
+            elapsed = time.perf_counter() - start
+            record_iteration(
+                stats, empties, score, [move], stats["nodes"], elapsed, callback
+            )
+            return _finish_stats(stats, empties, score, [move], start)
+
+    if workers > 1:
+        from parallel_search import parallel_analyze
+
+        score, principal_variation = parallel_analyze(
+            game, max_depth, time_limit_ms, workers, evaluator, stats, callback
+        )
+        return _finish_stats(stats, stats["depth"], score, principal_variation, start)
+
+    if table is None:
+        # The batched evaluation scores like evaluate_weighted
+        table = default_table(evaluate_weighted if batch_plies else evaluator)
+    table.new_search()
+    if orderer is None:
+        orderer = MoveOrderer()
+    orderer.new_search()
+    deadline = None
+    if time_limit_ms is not None:
+        deadline = time.perf_counter() + time_limit_ms / 1000
+    context = SearchContext(
+        table, deadline, orderer, evaluator, callback, time_phases, batch_plies
+    )
+
+    score, principal_variation = None, [valid_moves[0] if valid_moves else PASS]
+    completed_depth = 0
+    solver_nodes = stats["nodes"]
+    for depth in range(1, max_depth + 1):
+        context.depth = depth
+        iteration_start = time.perf_counter()
+        try:
+            result = aspiration_search(game, depth, score, context)
+        except SearchTimeout:
+            break
+        score, principal_variation = result
+        completed_depth = depth
+        now = time.perf_counter()
+        record_iteration(
+            stats,
+            depth,
+            score,
+            principal_variation,
+            solver_nodes + context.nodes,
+            now - iteration_start,
+            callback,
+        )
+        if deadline is not None and now >= deadline:
+            break
+    add_counters(stats, context.counters())
+    if context.phase_seconds is not None:
+        stats["movegen_ms"] = context.phase_seconds["movegen"] * 1000
+        stats["eval_ms"] = context.phase_seconds["eval"] * 1000
+    return _finish_stats(stats, completed_depth, score, principal_variation, start)
 
-        for move in valid_moves:
-            new_game = OthelloGame(player_mode=game.player_mode)
-            new_game.board = [row[:] for row in game.board]
-            new_game.current_player = game.current_player
-            new_game.make_move(*move)
 
-            eval, _ = alphabeta(new_game, max_depth - 1, False, alpha, beta)
+def _finish_stats(stats, depth, score, principal_variation, start):
+    """
+    Complete a search report with the result of the search and return the result.
+    """
+    stats["depth"] = depth
+    stats["score"] = score
+    stats["pv"] = [move_to_notation(move) for move in principal_variation]
+    stats["time_ms"] = (time.perf_counter() - start) * 1000
+    return score, principal_variation
 
-            if eval > max_eval:
-                max_eval = eval
-                best_move = move
 
-            alpha = max(alpha, eval)
-            if beta <= alpha:
-                break
+def aspiration_search(game, depth, guess, context):
+    """
+    Search the root to a fixed depth inside an aspiration window around a guessed score.
 
-        return max_eval, best_move
-    else:
-        min_eval = float("inf")
-        best_move = None
+    Parameters:
+        game (OthelloGame): The current game state.
+        depth (int): The search depth.
+        guess (float): The expected score, usually that of the previous iteration, or None for a full window.
+        context (SearchContext): The state of the search.
+
+    Returns:
+        tuple: The exact score and the principal variation.
+    """
+    if guess is None:
+        return negamax(game, depth, -INFINITY, INFINITY, context)
+
+    window = ASPIRATION_WINDOW
+    alpha, beta = guess - window, guess + window
+    while True:
+        score, principal_variation = negamax(game, depth, alpha, beta, context)
+        if alpha < score < beta:
+            return score, principal_variation
+        window *= 2
+        if window > MAX_ASPIRATION_WINDOW:
+            alpha, beta = -INFINITY, INFINITY
+        elif score <= alpha:
+            alpha = score - window
+        else:
+            beta = score + window
+
+
+def negamax(game, depth, alpha, beta, context=None, ply=0):
+    """
+    Negamax search with alpha-beta pruning and principal variation search.
+
+    Scores are always from the point of view of the player to move. The first move of each node is searched with
+    the full window; the others are first searched with a zero window to prove they are no better, and are only
+    re-searched with the full window when that proof fails. The search is fail-soft: a score outside
+    (alpha, beta) is a bound on the true score.
+
+    Parameters:
+        game (OthelloGame): The current game state.
+        depth (int): The remaining search depth.
+        alpha (float): The lower bound of the search window.
+        beta (float): The upper bound of the search window.
+        context (SearchContext): The transposition table, deadline, move orderer and node counter of the search.
+            Defaults to None (no table, no time limit).
+        ply (int): The distance of the position from the root of the search.
+
+    Returns:
+        tuple: The score and the principal variation as a list of moves (row, col).
+
+    Raises:
+        SearchTimeout: If the deadline of the context passes. The game is restored to its original position.
+    """
+    if context is None:
+        context = SearchContext()
+    context.visit()
+
+    if depth == 0:
+        context.leaf_evals += 1
+        return context.evaluate(game), []
+    valid_moves = context.generate_moves(game)
+    if not valid_moves:
+        # Pass if the opponent can move; otherwise the game is over. A forced
+        # pass has no alternatives, so it does not use up depth.
+        record = game.pass_turn()
+        if game.get_valid_moves_mask() == 0:
+            game.undo_move(record)
+            return game_over_score(game), []
+        try:
+            value, child_pv = negamax(game, depth, -beta, -alpha, context, ply + 1)
+        finally:
+            game.undo_move(record)
+        return -value, [PASS] + child_pv
+
+    # Probe the transposition table. Results are only trusted for cutoffs at
+    # zero-window nodes, so the principal variation is always searched in full.
+    pv_node = beta - alpha > NULL_WINDOW
+    table = context.table
+    entry = table.probe(game.hash) if table is not None else None
+    tt_move = None
+    if entry is not None:
+        context.tt_hits += 1
+        _, entry_depth, bound, value, tt_move, _ = entry
+        if not pv_node and entry_depth >= depth:
+            if (
+                bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)
+            ):
+                context.tt_cutoffs += 1
+                return value, [tt_move] if tt_move is not None else []
+    alpha_original = alpha
+
+    if depth <= context.batch_plies:
+        best_value, principal_variation = batch_search(
+            game, valid_moves, depth, context
+        )
+        if table is not None:
+            table.store(game.hash, depth, EXACT, best_value, principal_variation[0])
+        return best_value, principal_variation
+
+    orderer = context.orderer
+    valid_moves = orderer.order_moves(valid_moves, ply, tt_move)
+
+    best_value = -INFINITY
+    best_move = None
+    principal_variation = []
+    for index, move in enumerate(valid_moves):
+        record = game.make_move(*move)
+        try:
+            if index == 0:
+                value, child_pv = negamax(
+                    game, depth - 1, -beta, -alpha, context, ply + 1
+                )
+                value = -value
+            else:
+                value, child_pv = negamax(
+                    game, depth - 1, -alpha - NULL_WINDOW, -alpha, context, ply + 1
+                )
+                value = -value
+                if alpha < value < beta:
+                    value, child_pv = negamax(
+                        game, depth - 1, -beta, -alpha, context, ply + 1
+                    )
+                    value = -value
+        finally:
+            game.undo_move(record)
+
+        if value > best_value:
+            best_value = value
+            best_move = move
+            principal_variation = [move] + child_pv
+        if value > alpha:
+            alpha = value
+        if alpha >= beta:
+            context.beta_cutoffs += 1
+            orderer.record_cutoff(move, ply, depth, index)
+            break
+
+    if table is not None:
+        if best_value <= alpha_original:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        table.store(game.hash, depth, bound, best_value, best_move)
+
+    return best_value, principal_variation
+
+
+def batch_search(game, valid_moves, depth, context):
+    """
+    Search the last plies above the horizon in full and score all their leaves in one batched call.
 
-        for move in valid_moves:
-            new_game = OthelloGame(player_mode=game.player_mode)
-            new_game.board = [row[:] for row in game.board]
-            new_game.current_player = game.current_player
-            new_game.make_move(*move)
+    The tree below the node is expanded on bitboards without pruning, the leaves are collected, and
+    context.batch_evaluate scores them all at once; the negamax values are then backed up through the tree.
+    The result is the exact depth-limited value, the same as negamax with the equivalent leaf evaluator.
 
-            eval, _ = alphabeta(new_game, max_depth - 1, True, alpha, beta)
+    Parameters:
+        game (OthelloGame): The current game state; it is not modified.
+        valid_moves (list): The valid moves of the current player (at least one).
+        depth (int): The remaining search depth.
+        context (SearchContext): The state of the search.
 
-            if eval < min_eval:
-                min_eval = eval
-                best_move = move
+    Returns:
+        tuple: The score and the principal variation (the best move only).
+    """
+    own, opponent = game.own_and_opponent()
+    leaves_own, leaves_opponent = [], []
+    children = []
+    for move in valid_moves:
+        move_bit = square_to_bit(*move)
+        flipped = flips(own, opponent, move_bit)
+        children.append(
+            _expand_horizon(
+                opponent ^ flipped,
+                own | move_bit | flipped,
+                depth - 1,
+                leaves_own,
+                leaves_opponent,
+                context,
+            )
+        )
+    scores = []
+    if leaves_own:
+        context.leaf_evals += len(leaves_own)
+        scores = context.batch_evaluate(leaves_own, leaves_opponent).tolist()
 
-            beta = min(beta, eval)
-            if beta <= alpha:
-                break
+    best_value, best_move = -INFINITY, None
+    for move, child in zip(valid_moves, children):
+        value = -_horizon_value(child, scores)
+        if value > best_value:
+            best_value, best_move = value, move
+    return best_value, [best_move]
 
-        return min_eval, best_move
+
+def _expand_horizon(own, opponent, depth, leaves_own, leaves_opponent, context):
+    """
+    Expand the tree below a position on bitboards for batch_search.
+
+    Returns:
+        The node: the index of a leaf in the leaf lists (int), the score of a finished game (float), a forced
+        pass as a 1-tuple holding the node after it, or a list of the nodes after each move.
+    """
+    context.visit()
+    if depth == 0:
+        leaves_own.append(own)
+        leaves_opponent.append(opponent)
+        return len(leaves_own) - 1
+    moves = legal_moves(own, opponent)
+    if not moves:
+        if not legal_moves(opponent, own):
+            return float(final_score(own, opponent) * GAME_OVER_SCALE)
+        # A forced pass does not use up depth, as in negamax
+        return (
+            _expand_horizon(opponent, own, depth, leaves_own, leaves_opponent, context),
+        )
+    children = []
+    for move_bit in iter_bits(moves):
+        flipped = flips(own, opponent, move_bit)
+        children.append(
+            _expand_horizon(
+                opponent ^ flipped,
+                own | move_bit | flipped,
+                depth - 1,
+                leaves_own,
+                leaves_opponent,
+                context,
+            )
+        )
+    return children
+
+
+def _horizon_value(node, scores):
+    """
+    Back up the negamax value of a node built by _expand_horizon, given the scores of the leaves.
+    """
+    node_type = type(node)
+    if node_type is int:
+        return scores[node]
+    if node_type is float:
+        return node
+    if node_type is tuple:
+        return -_horizon_value(node[0], scores)
+    return max(-_horizon_value(child, scores) for child in node)
 
 
 def evaluate_game_state(game):
     """
-    Evaluates the current game state for the AI player.
+    Evaluates the current game state for the player to move.
+
+    Every term is computed directly on the bitboards: counts are masked popcounts and mobility uses the
+    shift-and-mask move generator for both sides, so no part of the board is scanned cell by cell.
 
     Parameters:
         game (OthelloGame): The current game state.
 
     Returns:
-        float: The evaluation value representing the desirability of the game state for the AI player.
+        float: The evaluation value representing the desirability of the game state for the player to move.
     """
     # Evaluation weights for different factors
     coin_parity_weight = 1.0
@@ -99,30 +814,27 @@ def evaluate_game_state(game):
     stability_weight = 3.0
     edge_occupancy_weight = 2.5
 
+    own, opponent = game.own_and_opponent()
+
     # Coin parity (difference in disk count)
-    player_disk_count = sum(row.count(game.current_player) for row in game.board)
-    opponent_disk_count = sum(row.count(-game.current_player) for row in game.board)
-    coin_parity = player_disk_count - opponent_disk_count
-
-    # Mobility (number of valid moves for the current player)
-    player_valid_moves = len(game.get_valid_moves())
-    opponent_valid_moves = len(
-        OthelloGame(player_mode=-game.current_player).get_valid_moves()
-    )
-    mobility = player_valid_moves - opponent_valid_moves
+    coin_parity = popcount(own) - popcount(opponent)
 
-    # Corner occupancy (number of player disks in the corners)
-    corner_occupancy = sum(
-        game.board[i][j] for i, j in [(0, 0), (0, 7), (7, 0), (7, 7)]
-    )
+    # Mobility (difference in the number of valid moves)
+    own_moves = legal_moves(own, opponent)
+    opponent_moves = legal_moves(opponent, own)
+    if not own_moves and not opponent_moves:
+        return game_over_score(game)
+    mobility = popcount(own_moves) - popcount(opponent_moves)
 
-    # Stability (number of stable disks)
-    stability = calculate_stability(game)
+    # Corner occupancy (difference in disks on the corners)
+    corner_occupancy = popcount(own & CORNERS) - popcount(opponent & CORNERS)
 
-    # Edge occupancy (number of player disks on the edges)
-    edge_occupancy = sum(game.board[i][j] for i in [0, 7] for j in range(1, 7)) + sum(
-        game.board[i][j] for i in range(1, 7) for j in [0, 7]
-    )
+    # Stability (difference in disks that can never be flipped)
+    own_stable, opponent_stable = stable_bitboards(own, opponent)
+    stability = popcount(own_stable) - popcount(opponent_stable)
+
+    # Edge occupancy (difference in disks on the edges)
+    edge_occupancy = popcount(own & EDGES) - popcount(opponent & EDGES)
 
     # Combine the factors with the corresponding weights to get the final evaluation value
     evaluation = (
@@ -136,43 +848,109 @@ def evaluate_game_state(game):
     return evaluation
 
 
-def calculate_stability(game):
+def evaluate_material(game):
     """
-    Calculates the stability of the AI player's disks on the board.
+    Evaluates the current game state by disk count alone, as a weak baseline for engine matches.
 
     Parameters:
         game (OthelloGame): The current game state.
 
     Returns:
-        int: The number of stable disks for the AI player.
+        float: The difference in disk count for the player to move.
     """
+    own, opponent = game.own_and_opponent()
+    if not legal_moves(own, opponent) and not legal_moves(opponent, own):
+        return game_over_score(game)
+    return float(popcount(own) - popcount(opponent))
 
-    def neighbors(row, col):
-        return [
-            (row + dr, col + dc)
-            for dr in [-1, 0, 1]
-            for dc in [-1, 0, 1]
-            if (dr, dc) != (0, 0) and 0 <= row + dr < 8 and 0 <= col + dc < 8
-        ]
 
-    corners = [(0, 0), (0, 7), (7, 0), (7, 7)]
-    edges = [(i, j) for i in [0, 7] for j in range(1, 7)] + [
-        (i, j) for i in range(1, 7) for j in [0, 7]
-    ]
-    inner_region = [(i, j) for i in range(2, 6) for j in range(2, 6)]
-    regions = [corners, edges, inner_region]
+def evaluate_weighted(game):
+    """
+    Evaluates the current game state with a weighted-square table, mobility and frontier disks.
 
-    stable_count = 0
+    This is the evaluation of batch_evaluation.evaluate_boards for a single position, so searches that score
+    their leaves in batches and searches that score them one at a time agree.
 
-    def is_stable_disk(row, col):
-        return (
-            all(game.board[r][c] == game.current_player for r, c in neighbors(row, col))
-            or (row, col) in edges + corners
-        )
+    Parameters:
+        game (OthelloGame): The current game state.
+
+    Returns:
+        float: The evaluation value for the player to move: the sum of SQUARE_PRIORITY over the player's disks
+        minus the opponent's, plus MOBILITY_WEIGHT times the difference in valid moves, plus FRONTIER_WEIGHT
+        times the difference in frontier disks (disks next to an empty square, which are bad to have).
+    """
+    own, opponent = game.own_and_opponent()
+    own_moves = legal_moves(own, opponent)
+    opponent_moves = legal_moves(opponent, own)
+    if not own_moves and not opponent_moves:
+        return game_over_score(game)
+
+    squares = 0
+    for weight, mask in SQUARE_WEIGHT_MASKS:
+        squares += weight * (popcount(own & mask) - popcount(opponent & mask))
+    mobility = popcount(own_moves) - popcount(opponent_moves)
+    next_to_empty = neighbours(~(own | opponent) & FULL)
+    frontier = popcount(opponent & next_to_empty) - popcount(own & next_to_empty)
+    return float(squares + MOBILITY_WEIGHT * mobility + FRONTIER_WEIGHT * frontier)
+
+
+def evaluate_patterns(game):
+    """
+    Evaluates the current game state with the learned pattern weights (see pattern_evaluation.py).
+
+    Parameters:
+        game (OthelloGame): The current game state.
+
+    Returns:
+        float: The predicted final disk differential for the player to move.
+
+    Raises:
+        FileNotFoundError: If no pattern weights have been trained yet.
+    """
+    own, opponent = game.own_and_opponent()
+    if not legal_moves(own, opponent) and not legal_moves(opponent, own):
+        return game_over_score(game)
+    return pattern_score(own, opponent, get_default_weights())
 
-    for region in regions:
-        for row, col in region:
-            if game.board[row][col] == game.current_player and is_stable_disk(row, col):
-                stable_count += 1
 
-    return stable_count
+def game_over_score(game):
+    """
+    Scores a finished game for the player to move.
+
+    Parameters:
+        game (OthelloGame): The finished game state.
+
+    Returns:
+        float: The final disk differential for the player to move, scaled by GAME_OVER_SCALE.
+    """
+    own, opponent = game.own_and_opponent()
+    return final_score(own, opponent) * GAME_OVER_SCALE
+
+
+# Leaf evaluation functions selectable by name, e.g. for engine matches
+EVALUATORS = {
+    "classic": evaluate_game_state,
+    "material": evaluate_material,
+    "weighted": evaluate_weighted,
+    "pattern": evaluate_patterns,
+}
+
+
+def check_evaluator(name):
+    """
+    Check that an evaluation function can be used, loading any data it needs.
+
+    Parameters:
+        name (str): The name of the evaluation function in EVALUATORS.
+
+    Raises:
+        ValueError: If there is no evaluation function of that name, or the data it needs is missing or invalid,
+            e.g. pattern weights that have not been trained yet.
+    """
+    if name not in EVALUATORS:
+        raise ValueError(f"Unknown evaluator: {name!r}")
+    if EVALUATORS[name] is evaluate_patterns:
+        try:
+            get_default_weights()
+        except OSError as error:
+            raise ValueError(str(error)) from None
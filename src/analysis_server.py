@@ -0,0 +1,547 @@
+"""
+Analysis server: best moves for many concurrent games from one process pool.
+
+The server speaks a line protocol of JSON objects over local TCP or standard
+input/output. Each request is one line and gets one response line; responses
+to the requests of one connection may arrive out of order and carry the
+request's "id".
+
+An analysis request gives a position, either as a transcript of moves from the
+starting position or as bitboards, and optional search settings:
+
+    {"id": 1, "transcript": "e3f3f4", "time_ms": 500}
+    {"id": 2, "black": 34628173824, "white": 68853694464, "player": -1,
+     "depth": 8, "eval": "classic", "book": true}
+
+The opening book is used by default only with the "classic" evaluator, which
+it was searched with; "book" turns it on or off for any evaluator.
+
+and gets the best move and the search report:
+
+    {"id": 1, "move": "d3", "score": -4.5, "depth": 10, "pv": ["d3"],
+     "nodes": 0, "time_ms": 0.1, "queue_ms": 0.2, "book": true}
+
+A request of {"id": ..., "type": "status"} gets the number of workers, queued
+and running searches and searches served. Errors are answered with
+{"id": ..., "error": "..."}; a request turned away because the queue is full
+also has "busy": true and can be retried later.
+
+Searches run in a pool of worker processes, one search per worker at a time.
+Each worker is started and warmed up (modules imported, opening book opened,
+a short search run) before the server accepts connections, and keeps its
+transposition table across requests. Requests wait in a bounded queue: when it
+is full, new requests are turned away at once, and each connection has a limit
+on requests in flight, beyond which the server stops reading from it so that
+TCP flow control slows the client down. Every search has a time limit, the
+request's "time_ms" capped at the server's maximum, and time spent in the
+queue counts against it.
+
+Example:
+    python src/analysis_server.py --port 8765 --workers 4
+    python src/analysis_server.py --stdio < requests.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_CLIENT_REQUESTS = 16  # Requests in flight per connection
+DEFAULT_DEPTH = 8
+DEFAULT_TIME_MS = 1000.0
+MAX_TIME_MS = 10000.0
+
+# The smallest time budget a search gets, even when its request has used up its
+# time limit in the queue
+MIN_SEARCH_MS = 10.0
+
+# The longest request line accepted, in bytes
+MAX_LINE_BYTES = 1 << 16
+
+
+class RequestError(ValueError):
+    """
+    Raised for a malformed analysis request; the message is sent back to the client.
+    """
+
+
+def _warm_worker():
+    """
+    Prepare a worker process: import the engine, open the opening book and run a short search.
+    """
+    from ai_agent import analyze
+    from opening_book import get_default_book
+    from othello_game import OthelloGame
+    from transposition_table import TranspositionTable
+
+    get_default_book()
+    analyze(OthelloGame(player_mode="ai"), 4, TranspositionTable(1 << 10))
+
+
+def _ping():
+    """
+    Do nothing in a worker process; used to start the process.
+    """
+    return os.getpid()
+
+
+def search_position(request):
+    """
+    Search the position of an analysis request, in a worker process.
+
+    The search uses the worker's module-level transposition table of the request's evaluator, so later requests
+    with the same evaluator reuse the work of earlier ones.
+
+    Parameters:
+        request (dict): The validated request (see parse_request).
+
+    Returns:
+        dict: The best move and the search report.
+    """
+    from ai_agent import EVALUATORS, default_table, get_best_move
+    from othello_game import OthelloGame, game_from_transcript
+
+    if "transcript" in request:
+        game = game_from_transcript(request["transcript"], player_mode="ai")
+    else:
+        game = OthelloGame(player_mode="ai")
+        game.set_position(request["black"], request["white"], request["player"])
+    evaluator = EVALUATORS[request["eval"]]
+    stats = {}
+    get_best_move(
+        game,
+        request["depth"],
+        table=default_table(evaluator),
+        time_limit_ms=request["time_ms"],
+        evaluator=evaluator,
+        stats=stats,
+        use_book=request["book"],
+    )
+    return {
+        "move": stats["pv"][0] if stats["pv"] else None,
+        "score": stats["score"],
+        "depth": stats["depth"],
+        "pv": stats["pv"],
+        "nodes": stats["nodes"],
+        "time_ms": round(stats["time_ms"], 3),
+        "book": stats["book"],
+    }
+
+
+def _is_integer(value):
+    """
+    Check that a decoded JSON value is an integer; JSON true and false decode to bool, a subclass of int.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_request(request, max_time_ms=MAX_TIME_MS):
+    """
+    Validate an analysis request and fill in its defaults.
+
+    Parameters:
+        request (dict): The decoded request line.
+        max_time_ms (float): The largest time limit allowed.
+
+    Returns:
+        dict: The position ("transcript", or "black", "white" and "player") and the "depth", "time_ms", "eval"
+        and "book" settings, where "book" is None if the request leaves the default to the evaluator.
+
+    Raises:
+        RequestError: If the request is malformed.
+    """
+    from ai_agent import EVALUATORS, check_evaluator
+    from othello_game import game_from_transcript
+
+    parsed = {}
+    if "transcript" in request:
+        transcript = request["transcript"]
+        if not isinstance(transcript, str):
+            raise RequestError("transcript must be a string")
+        try:
+            game_from_transcript(transcript)
+        except ValueError as error:
+            raise RequestError(str(error)) from None
+        parsed["transcript"] = transcript
+    elif "black" in request and "white" in request:
+        black, white = request["black"], request["white"]
+        player = request.get("player", 1)
+        if not all(
+            _is_integer(bits) and 0 <= bits < 1 << 64 for bits in (black, white)
+        ):
+            raise RequestError("black and white must be 64-bit bitboards")
+        if black & white:
+            raise RequestError("black and white overlap")
+        if not _is_integer(player) or player not in (1, -1):
+            raise RequestError("player must be 1 (Black) or -1 (White)")
+        parsed.update(black=black, white=white, player=player)
+    else:
+        raise RequestError("request needs a transcript or black and white bitboards")
+
+    depth = request.get("depth", DEFAULT_DEPTH)
+    if not _is_integer(depth) or not 1 <= depth <= 60:
+        raise RequestError("depth must be an integer from 1 to 60")
+    time_ms = request.get("time_ms", DEFAULT_TIME_MS)
+    if (
+        not isinstance(time_ms, (int, float))
+        or isinstance(time_ms, bool)
+        or not math.isfinite(time_ms)
+        or time_ms <= 0
+    ):
+        raise RequestError("time_ms must be a positive number")
+    evaluator = request.get("eval", "classic")
+    if not isinstance(evaluator, str) or evaluator not in EVALUATORS:
+        raise RequestError(f"eval must be one of {sorted(EVALUATORS)}")
+    try:
+        check_evaluator(evaluator)
+    except ValueError as error:
+        raise RequestError(str(error)) from None
+    # By default the book is only used with the evaluator it was searched with (see get_best_move)
+    book = request.get("book")
+    if book is not None and not isinstance(book, bool):
+        raise RequestError("book must be true or false")
+    parsed.update(
+        depth=depth,
+        time_ms=min(float(time_ms), max_time_ms),
+        eval=evaluator,
+        book=book,
+    )
+    return parsed
+
+
+class AnalysisServer:
+    def __init__(
+        self,
+        workers=1,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        client_requests=DEFAULT_CLIENT_REQUESTS,
+        max_time_ms=MAX_TIME_MS,
+    ):
+        """
+        Serves analysis requests from a pool of warmed-up worker processes.
+
+        Call `start` before serving, then `serve_tcp` or `serve_stdio`, and `close` at the end. `analyze` can
+        also be awaited directly.
+
+        Parameters:
+            workers (int): The number of worker processes, each running one search at a time.
+            queue_size (int): The number of requests that can wait for a worker before new ones are turned away.
+            client_requests (int): The number of requests of one connection that can be in flight at once.
+            max_time_ms (float): The largest time limit of a search in milliseconds.
+
+        Attributes:
+            served (int): The number of searches completed.
+        """
+        self.workers = workers
+        self.client_requests = client_requests
+        self.max_time_ms = max_time_ms
+        self.served = 0
+        self.running = 0
+        self._queue_size = queue_size
+        self._queue = None
+        self._executors = []
+        self._tasks = []
+
+    async def start(self):
+        """
+        Start and warm up the worker processes and begin taking requests off the queue.
+        """
+        self._queue = asyncio.Queue(self._queue_size)
+        self._executors = [None] * self.workers
+        await asyncio.gather(
+            *(self._start_worker(index) for index in range(self.workers))
+        )
+        self._tasks = [
+            asyncio.create_task(self._work(index)) for index in range(self.workers)
+        ]
+
+    async def _start_worker(self, index):
+        """
+        Create the single-process executor of one worker and wait until its process is started and warmed up.
+        """
+        executor = ProcessPoolExecutor(max_workers=1, initializer=_warm_worker)
+        self._executors[index] = executor
+        # Executors start their process on the first task, so run one now
+        await asyncio.get_running_loop().run_in_executor(executor, _ping)
+
+    async def close(self):
+        """
+        Stop the workers and shut their processes down.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._tasks = []
+        self._executors = []
+
+    def status(self):
+        """
+        Get the load of the server.
+
+        Returns:
+            dict: The number of workers, queued and running searches, and searches served.
+        """
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "served": self.served,
+        }
+
+    async def analyze(self, request):
+        """
+        Queue an analysis request and wait for its result.
+
+        Parameters:
+            request (dict): The decoded request (see the module docstring).
+
+        Returns:
+            dict: The response, without the request id.
+        """
+        try:
+            parsed = parse_request(request, self.max_time_ms)
+        except RequestError as error:
+            return {"error": str(error)}
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((parsed, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            return {"error": "server busy", "busy": True}
+        return await future
+
+    async def _work(self, index):
+        """
+        Take requests off the queue and search them in one worker process.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            broken = False
+            request, future, queued = await self._queue.get()
+            if future.cancelled():
+                continue
+            queue_ms = (time.perf_counter() - queued) * 1000
+            # Time spent waiting counts against the request's time limit
+            request["time_ms"] = max(request["time_ms"] - queue_ms, MIN_SEARCH_MS)
+            self.running += 1
+            try:
+                response = await loop.run_in_executor(
+                    self._executors[index], search_position, request
+                )
+            except BrokenProcessPool:
+                broken = True
+                response = {"error": "worker process failed"}
+            except Exception as error:
+                response = {"error": f"search failed: {error}"}
+            else:
+                self.served += 1
+                response["queue_ms"] = round(queue_ms, 3)
+            finally:
+                self.running -= 1
+            if not future.done():
+                future.set_result(response)
+            if broken:
+                # Replace the failed process with a warmed-up one before taking the next request
+                self._executors[index].shutdown(wait=False, cancel_futures=True)
+                try:
+                    await self._start_worker(index)
+                except BrokenProcessPool:
+                    pass  # The next request fails and tries again
+
+    async def handle_request(self, line):
+        """
+        Answer one request line.
+
+        Parameters:
+            line (bytes): The request as a JSON object.
+
+        Returns:
+            dict: The response, with the request's id.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as error:
+            return {"id": None, "error": f"invalid request: {error}"}
+        request_type = request.get("type", "analyze")
+        if request_type == "status":
+            response = self.status()
+        elif request_type == "analyze":
+            response = await self.analyze(request)
+        else:
+            response = {"error": f"unknown request type: {request_type!r}"}
+        return {"id": request.get("id"), **response}
+
+    async def serve_stream(self, reader, writer):
+        """
+        Answer the requests of one connection until it closes.
+
+        Parameters:
+            reader (asyncio.StreamReader): The request lines.
+            writer (asyncio.StreamWriter): Where the response lines are written.
+        """
+        slots = asyncio.Semaphore(self.client_requests)
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def answer(line):
+            try:
+                response = await self.handle_request(line)
+                async with write_lock:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                # Stop reading while the connection has too many requests in flight
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    slots.release()
+                    break
+                if not line:
+                    slots.release()
+                    break
+                if not line.strip():
+                    slots.release()
+                    continue
+                task = asyncio.create_task(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def serve_tcp(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Serve connections on a TCP port until cancelled.
+
+        Parameters:
+            host (str): The address to listen on.
+            port (int): The port to listen on.
+        """
+        server = await asyncio.start_server(
+            self.serve_stream, host, port, limit=MAX_LINE_BYTES
+        )
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self):
+        """
+        Serve the requests on standard input, writing the responses to standard output, until input ends.
+
+        Standard input and output may be files as well as pipes or terminals.
+        """
+        await self.serve_stream(_StdinReader(), _StdoutWriter())
+
+
+class _StdinReader:
+    """
+    Reads request lines from standard input in a thread, like asyncio.StreamReader.readline.
+    """
+
+    async def readline(self):
+        return await asyncio.to_thread(sys.stdin.buffer.readline, MAX_LINE_BYTES)
+
+
+class _StdoutWriter:
+    """
+    Writes response lines to standard output, like asyncio.StreamWriter.
+    """
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+async def _serve(args):
+    """
+    Run the server with the command-line settings.
+    """
+    server = AnalysisServer(
+        args.workers, args.queue_size, args.client_requests, args.max_time_ms
+    )
+    await server.start()
+    try:
+        if args.stdio:
+            await server.serve_stdio()
+        else:
+            print(
+                f"Serving {args.workers} workers on {args.host}:{args.port}",
+                file=sys.stderr,
+            )
+            await server.serve_tcp(args.host, args.port)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """
+    Run the analysis server from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve best moves and analysis over a JSON line protocol."
+    )
+    parser.add_argument(
+        "--stdio", action="store_true", help="serve standard input instead of TCP"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="port to listen on"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="requests that can wait for a worker",
+    )
+    parser.add_argument(
+        "--client-requests",
+        type=int,
+        default=DEFAULT_CLIENT_REQUESTS,
+        help="requests in flight per connection",
+    )
+    parser.add_argument(
+        "--max-time-ms",
+        type=float,
+        default=MAX_TIME_MS,
+        help="largest time limit of a search in milliseconds",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
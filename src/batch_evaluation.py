@@ -0,0 +1,220 @@
+"""
+Batched leaf evaluation with NumPy.
+
+evaluate_boards scores a whole array of positions in one call: an (N, 8, 8)
+int8 array with 1 for the disks of the player to move, -1 for the disks of the
+other player and 0 for empty squares. The score is the same weighted-square
+evaluation as ai_agent.evaluate_weighted, computed for all positions at once:
+
+- the square weights are a matrix product with SQUARE_PRIORITY,
+- frontier disks (disks next to an empty square) are found by convolving the
+  empty squares with a 3x3 kernel,
+- mobility runs the shift-and-mask move generator of bitboard.legal_moves on
+  arrays of uint64 bitboards, one lane per position.
+
+evaluate_bitboards takes the positions as bitboards instead. The search uses it
+to score the leaves of its last plies in batches (see batch_plies in
+ai_agent.analyze), and offline jobs can use either to score many positions
+without a Python call per position.
+
+NumPy is an optional dependency: this module imports without it, and the
+evaluation functions raise ImportError if it is missing.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ai_agent import FRONTIER_WEIGHT, GAME_OVER_SCALE, MOBILITY_WEIGHT
+from bitboard import AXES, FULL, INNER_COLUMNS
+from move_ordering import SQUARE_PRIORITY
+
+# The eight neighbours of a square, as (row, col) offsets of the frontier convolution
+NEIGHBOUR_OFFSETS = tuple(
+    (row, col) for row in (-1, 0, 1) for col in (-1, 0, 1) if row or col
+)
+
+if np is not None:
+    _WEIGHTS = np.array(SQUARE_PRIORITY, dtype=np.int32).reshape(64)
+    _INNER_COLUMNS = np.uint64(INNER_COLUMNS)
+    _FULL = np.uint64(FULL)
+    _AXES = tuple((np.uint64(shift), masked) for shift, masked in AXES)
+
+
+def require_numpy():
+    """
+    Check that NumPy is installed.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError(
+            "Batched evaluation needs the numpy package (pip install numpy)"
+        )
+
+
+def popcount(bitboards):
+    """
+    Count the set bits of every bitboard in an array.
+
+    Args:
+        bitboards (numpy.ndarray): A uint64 array.
+
+    Returns:
+        numpy.ndarray: The number of set bits of each element.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitboards).astype(np.int64)
+    # NumPy before 2.0 has no population count
+    bits = np.unpackbits(np.ascontiguousarray(bitboards).view(np.uint8))
+    return bits.reshape(-1, 64).sum(axis=1)
+
+
+def legal_moves(own, opponent):
+    """
+    Compute the legal moves of many positions at once (see bitboard.legal_moves).
+
+    Args:
+        own (numpy.ndarray): uint64 bitboards of the side to move.
+        opponent (numpy.ndarray): uint64 bitboards of the other side.
+
+    Returns:
+        numpy.ndarray: The uint64 bitboards of the legal destination squares.
+    """
+    empty = ~(own | opponent)
+    inner = opponent & _INNER_COLUMNS
+    moves = np.zeros_like(own)
+    for shift, masked in _AXES:
+        mask = inner if masked else opponent
+
+        run = mask & (own << shift)
+        for _ in range(5):
+            run |= mask & (run << shift)
+        moves |= run << shift
+
+        run = mask & (own >> shift)
+        for _ in range(5):
+            run |= mask & (run >> shift)
+        moves |= run >> shift
+    return moves & empty & _FULL
+
+
+def boards_to_bitboards(boards):
+    """
+    Convert an (N, 8, 8) array of positions to bitboards.
+
+    Args:
+        boards (numpy.ndarray): The positions: 1 for the player to move, -1 for the other player, 0 for empty.
+
+    Returns:
+        tuple: The uint64 bitboards of the player to move and of the other player.
+    """
+    squares = boards.reshape(len(boards), 64)
+    own = np.packbits(squares == 1, axis=1, bitorder="little").view("<u8")
+    opponent = np.packbits(squares == -1, axis=1, bitorder="little").view("<u8")
+    return own.ravel().astype(np.uint64), opponent.ravel().astype(np.uint64)
+
+
+def bitboards_to_boards(own, opponent):
+    """
+    Convert bitboards to an (N, 8, 8) array of positions.
+
+    Args:
+        own (numpy.ndarray): uint64 bitboards of the player to move.
+        opponent (numpy.ndarray): uint64 bitboards of the other player.
+
+    Returns:
+        numpy.ndarray: The int8 positions: 1 for the player to move, -1 for the other player, 0 for empty.
+    """
+    own_squares = np.unpackbits(
+        own.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )
+    opponent_squares = np.unpackbits(
+        opponent.astype("<u8").view(np.uint8).reshape(-1, 8),
+        axis=1,
+        bitorder="little",
+    )
+    boards = own_squares.view(np.int8) - opponent_squares.view(np.int8)
+    return boards.reshape(-1, 8, 8)
+
+
+def evaluate_boards(boards):
+    """
+    Evaluate many positions in one call.
+
+    Args:
+        boards (array_like): An (N, 8, 8) array of positions: 1 for the disks of the player to move, -1 for the
+            disks of the other player and 0 for empty squares.
+
+    Returns:
+        numpy.ndarray: N float64 scores from the point of view of the player to move, equal to
+        ai_agent.evaluate_weighted of each position.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If the array does not have the shape (N, 8, 8).
+    """
+    require_numpy()
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim != 3 or boards.shape[1:] != (8, 8):
+        raise ValueError(f"Expected an (N, 8, 8) array, got shape {boards.shape}")
+    own, opponent = boards_to_bitboards(boards)
+    return _evaluate(boards, own, opponent)
+
+
+def evaluate_bitboards(own, opponent):
+    """
+    Evaluate many positions given as bitboards in one call.
+
+    Args:
+        own (array_like): The bitboards of the player to move, as Python ints or uint64.
+        opponent (array_like): The bitboards of the other player.
+
+    Returns:
+        numpy.ndarray: The float64 scores from the point of view of the player to move (see evaluate_boards).
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    require_numpy()
+    own = np.asarray(own, dtype=np.uint64)
+    opponent = np.asarray(opponent, dtype=np.uint64)
+    return _evaluate(bitboards_to_boards(own, opponent), own, opponent)
+
+
+def _evaluate(boards, own, opponent):
+    """
+    Evaluate positions given both as boards and as bitboards.
+    """
+    count = len(boards)
+    squares = boards.reshape(count, 64).astype(np.int32) @ _WEIGHTS
+
+    # Convolve the empty squares with a 3x3 kernel (without its centre) to count the empty neighbours of every
+    # square; a disk with at least one is a frontier disk
+    empty = np.pad(boards == 0, ((0, 0), (1, 1), (1, 1))).astype(np.int8)
+    empty_neighbours = sum(
+        empty[:, 1 + row : 9 + row, 1 + col : 9 + col] for row, col in NEIGHBOUR_OFFSETS
+    )
+    frontier = (empty_neighbours > 0).astype(np.int8) * boards
+    frontier = -frontier.reshape(count, 64).sum(axis=1, dtype=np.int32)
+
+    own_moves = legal_moves(own, opponent)
+    opponent_moves = legal_moves(opponent, own)
+    mobility = popcount(own_moves) - popcount(opponent_moves)
+
+    scores = (squares + MOBILITY_WEIGHT * mobility + FRONTIER_WEIGHT * frontier).astype(
+        np.float64
+    )
+
+    # Finished games get the final disk differential, with empty squares credited to the winner
+    over = (own_moves == 0) & (opponent_moves == 0)
+    if over.any():
+        own_count = popcount(own)
+        opponent_count = popcount(opponent)
+        difference = own_count - opponent_count
+        empties = 64 - own_count - opponent_count
+        final = difference + np.sign(difference) * empties
+        scores = np.where(over, final * GAME_OVER_SCALE, scores)
+    return scores
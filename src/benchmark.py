@@ -0,0 +1,470 @@
+"""
+Search benchmark over a fixed set of positions.
+
+Every position is given as a game transcript from the starting position, so the
+set is reproducible and easy to extend. For each position the benchmark reports:
+
+- time-to-depth and nodes for each iterative-deepening depth, the nodes per second
+  of the deepest search and the effective branching factor,
+- an exact solve (nodes, time and score) for the endgame positions,
+- perft-style move-generation leaf counts and their throughput,
+
+plus raw calls per second of get_valid_moves and evaluate_game_state.
+
+The results can be saved as a baseline JSON file and later runs compared with it.
+Perft leaf counts and exact endgame scores must match the baseline exactly. Node
+counts and timings are compared with a relative tolerance, so a change to the
+search that costs a few more nodes is reported as a regression, not a failure.
+The exit status is non-zero if anything failed or regressed.
+
+Example:
+    python src/benchmark.py --save-baseline
+    python src/benchmark.py --baseline ./utils/benchmark_baseline.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from ai_agent import GAME_OVER_SCALE, analyze, evaluate_game_state
+from bitboard import FULL, popcount
+from move_ordering import MoveOrderer
+from othello_game import game_from_transcript, move_to_notation
+from perft import perft_bitboards
+from transposition_table import TranspositionTable
+
+DEFAULT_BASELINE_PATH = "./utils/benchmark_baseline.json"
+
+# The benchmark positions as (name, category, transcript). Transcripts list the
+# moves from the starting position without passes; a player with no valid move
+# passes implicitly, as in standard game records.
+POSITIONS = (
+    ("start", "opening", ""),
+    ("opening-6", "opening", "c5e6f5c4c3b4"),
+    ("opening-12", "opening", "f4f5c6d3f3d6c7f6e6d7g6g7"),
+    ("midgame-20", "midgame", "e3f3f4d3c3e6d6c5c4f5g3f2g4d7e7h2c8b2g6h4"),
+    (
+        "midgame-26",
+        "midgame",
+        "f4f5f6g5e6d3g4g6c4g3h2e3f3d7h5b5b4g2a6d6h4h3h7a4d2d1",
+    ),
+    (
+        "midgame-32",
+        "midgame",
+        "e3f3f4d3c3e6d2b3f2c4b4g3f7a4e2e1h3e7d1c2f1g2h1h2g1c5h4h5h6g8d6c6",
+    ),
+    (
+        "endgame-14",
+        "endgame",
+        "e3f3d6c6f4f5f6d3d2c1d1c5b1g7g6g5g4h5e6e7h7h6c7h8h4h3g2c3b4a3a5h1d7c4f2g3h2"
+        "e8f8g8d8c8e2g1f7e1",
+    ),
+    (
+        "endgame-10",
+        "endgame",
+        "e3f3f4d3c3e6f6f5f2g5e7d2e2c4g4b2h6f7a1e8c6b4b3a2c5h3a3h4h5e1d8h7d1c1d7g6f8"
+        "a4a5f1g1d6b1g3c2c8b5g7g2b6",
+    ),
+    (
+        "endgame-8",
+        "endgame",
+        "c5c6d6c4c3e6d7b2f4e7c7d8a1c8b5d3f8e8d2d1e3g8e1g3g5a6c1g4f6f5g6b4f3g2a5a3h3"
+        "a4b8a8h1h2f7h4b6b7h5b3f2h6a2g1",
+    ),
+)
+
+# Slots in the transposition table of each benchmark search
+TABLE_SIZE = 1 << 16
+
+# Calls of get_valid_moves and evaluate_game_state per position for the throughput figures
+THROUGHPUT_CALLS = 2000
+
+# Timings shorter than this in the baseline are too noisy to compare
+MIN_COMPARED_SECONDS = 0.05
+
+
+def _best_of(repeat, function):
+    """
+    Run a function several times and return its last result and its fastest time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def _search(game, depth, endgame_empties):
+    """
+    Search a position from scratch, with a fresh transposition table and move orderer.
+    """
+    stats = {}
+    score, principal_variation = analyze(
+        game,
+        depth,
+        TranspositionTable(TABLE_SIZE),
+        orderer=MoveOrderer(),
+        endgame_empties=endgame_empties,
+        stats=stats,
+    )
+    best_move = (
+        move_to_notation(principal_variation[0]) if principal_variation else None
+    )
+    return score, best_move, stats["nodes"]
+
+
+def benchmark_search(game, depth, repeat=1):
+    """
+    Measure time-to-depth of the heuristic search of a position for every depth from 1 to depth.
+
+    Parameters:
+        game (OthelloGame): The position to search.
+        depth (int): The deepest search depth.
+        repeat (int): The number of runs per depth; the fastest is reported.
+
+    Returns:
+        dict: The score, best move, nodes, seconds and nodes per second of the deepest search, the effective
+        branching factor and a time_to_depth list with the nodes and seconds of each depth.
+    """
+    time_to_depth = []
+    for current in range(1, depth + 1):
+        (score, best_move, nodes), seconds = _best_of(
+            repeat, lambda: _search(game, current, 0)
+        )
+        time_to_depth.append({"depth": current, "nodes": nodes, "seconds": seconds})
+
+    first, last = time_to_depth[0], time_to_depth[-1]
+    branching_factor = None
+    if depth > 1 and first["nodes"]:
+        branching_factor = (last["nodes"] / first["nodes"]) ** (1 / (depth - 1))
+    return {
+        "depth": depth,
+        "score": score,
+        "best_move": best_move,
+        "nodes": last["nodes"],
+        "seconds": last["seconds"],
+        "nps": last["nodes"] / last["seconds"] if last["seconds"] else None,
+        "branching_factor": branching_factor,
+        "time_to_depth": time_to_depth,
+    }
+
+
+def benchmark_solve(game, repeat=1):
+    """
+    Measure an exact endgame solve of a position.
+
+    Parameters:
+        game (OthelloGame): The position to solve.
+        repeat (int): The number of runs; the fastest is reported.
+
+    Returns:
+        dict: The exact score (in disks), best move, nodes, seconds and nodes per second of the solve.
+    """
+    (score, best_move, nodes), seconds = _best_of(repeat, lambda: _search(game, 1, 64))
+    return {
+        "score": round(score / GAME_OVER_SCALE),
+        "best_move": best_move,
+        "nodes": nodes,
+        "seconds": seconds,
+        "nps": nodes / seconds if seconds else None,
+    }
+
+
+def benchmark_perft(game, depth, repeat=1):
+    """
+    Measure move generation by counting the leaves of the move tree of a position.
+
+    Parameters:
+        game (OthelloGame): The position to expand.
+        depth (int): The number of plies to expand.
+        repeat (int): The number of runs; the fastest is reported.
+
+    Returns:
+        dict: The depth, leaf count, seconds and leaves per second.
+    """
+    own, opponent = game.own_and_opponent()
+    leaves, seconds = _best_of(repeat, lambda: perft_bitboards(own, opponent, depth))
+    return {
+        "depth": depth,
+        "leaves": leaves,
+        "seconds": seconds,
+        "leaves_per_second": leaves / seconds if seconds else None,
+    }
+
+
+def benchmark_throughput(games, calls=THROUGHPUT_CALLS, repeat=1):
+    """
+    Measure the calls per second of get_valid_moves and evaluate_game_state over a set of positions.
+
+    Parameters:
+        games (list): The positions to call the functions on.
+        calls (int): The number of calls per position.
+        repeat (int): The number of runs; the fastest is reported.
+
+    Returns:
+        dict: Calls per second of each function.
+    """
+    results = {}
+    for name, function in (
+        ("get_valid_moves", lambda game: game.get_valid_moves()),
+        ("evaluate_game_state", evaluate_game_state),
+    ):
+
+        def run():
+            for game in games:
+                for _ in range(calls):
+                    function(game)
+
+        _, seconds = _best_of(repeat, run)
+        results[name] = len(games) * calls / seconds
+    return results
+
+
+def run_benchmark(depth=6, perft_depth=4, repeat=1, positions=POSITIONS, log=None):
+    """
+    Run the benchmark over a set of positions.
+
+    Opening and midgame positions get a time-to-depth search; endgame positions get an exact solve. Every
+    position gets a perft count.
+
+    Parameters:
+        depth (int): The deepest search depth for opening and midgame positions.
+        perft_depth (int): The perft depth for every position.
+        repeat (int): The number of runs per measurement; the fastest is reported.
+        positions (iterable): The (name, category, transcript) positions to measure.
+        log (file): If given, a progress line is written to it after every position.
+
+    Returns:
+        dict: The settings, the results per position, the throughput figures and the search totals, ready to be
+        saved as JSON.
+    """
+    report = {
+        "settings": {"depth": depth, "perft_depth": perft_depth},
+        "positions": {},
+    }
+    games = []
+    total_nodes = total_seconds = 0
+    for name, category, transcript in positions:
+        game = game_from_transcript(transcript, player_mode="ai")
+        games.append(game)
+        empties = popcount(~(game.black | game.white) & FULL)
+        result = {"category": category, "empties": empties}
+        if category == "endgame":
+            result["solve"] = benchmark_solve(game, repeat)
+            search = result["solve"]
+        else:
+            result["search"] = benchmark_search(game, depth, repeat)
+            search = result["search"]
+        result["perft"] = benchmark_perft(game, perft_depth, repeat)
+        total_nodes += search["nodes"]
+        total_seconds += search["seconds"]
+        report["positions"][name] = result
+        if log is not None:
+            print(
+                f"{name:<12} {search['nodes']:>9} nodes {search['seconds']:>8.3f}s "
+                f"{search['nps'] or 0:>9.0f} nps  perft({perft_depth}) {result['perft']['leaves']}",
+                file=log,
+            )
+
+    report["throughput"] = benchmark_throughput(games, repeat=repeat)
+    report["totals"] = {
+        "nodes": total_nodes,
+        "seconds": total_seconds,
+        "nps": total_nodes / total_seconds if total_seconds else None,
+    }
+    return report
+
+
+def compare_reports(report, baseline, tolerance=0.1, timings=True):
+    """
+    Compare a benchmark report with a baseline report.
+
+    Perft leaf counts and exact endgame scores must match the baseline exactly; a difference is a correctness
+    failure. Node counts, times-to-depth and speeds regress if they are worse than the baseline by more than the
+    tolerance. Timings are only meaningful against a baseline recorded on the same machine; they can be skipped,
+    and those that took less than MIN_COMPARED_SECONDS in the baseline always are. Search node counts are only
+    compared when both reports used the same settings.
+
+    Parameters:
+        report (dict): The current results, as returned by run_benchmark.
+        baseline (dict): The baseline results.
+        tolerance (float): The allowed relative slowdown, e.g. 0.1 for 10%.
+        timings (bool): Whether to compare timings as well as counts.
+
+    Returns:
+        tuple: A list of (level, message) pairs, where level is "fail", "regression", "improvement" or "note",
+        and a bool that is True if there was no failure or regression.
+    """
+    findings = []
+
+    def check(label, current, previous, higher_is_better, seconds=None):
+        if current is None or previous is None or previous == 0:
+            return
+        if seconds is not None and (not timings or seconds < MIN_COMPARED_SECONDS):
+            return
+        change = (current - previous) / previous
+        if not higher_is_better:
+            change = -change
+        if change < -tolerance:
+            findings.append(("regression", f"{label}: {previous:.6g} -> {current:.6g}"))
+        elif change > tolerance:
+            findings.append(
+                ("improvement", f"{label}: {previous:.6g} -> {current:.6g}")
+            )
+
+    same_settings = report["settings"] == baseline.get("settings")
+    if not same_settings:
+        findings.append(
+            (
+                "note",
+                f"settings differ from the baseline ({baseline.get('settings')}); "
+                "node counts were not compared",
+            )
+        )
+
+    for name, result in report["positions"].items():
+        previous = baseline["positions"].get(name)
+        if previous is None:
+            continue
+        if (
+            result["perft"]["depth"] == previous["perft"]["depth"]
+            and result["perft"]["leaves"] != previous["perft"]["leaves"]
+        ):
+            findings.append(
+                (
+                    "fail",
+                    f"{name}: perft({result['perft']['depth']}) = {result['perft']['leaves']}, "
+                    f"baseline {previous['perft']['leaves']}",
+                )
+            )
+        check(
+            f"{name} perft leaves/s",
+            result["perft"]["leaves_per_second"],
+            previous["perft"]["leaves_per_second"],
+            True,
+            previous["perft"]["seconds"],
+        )
+
+        if "solve" in result and "solve" in previous:
+            current, old = result["solve"], previous["solve"]
+            if current["score"] != old["score"]:
+                findings.append(
+                    (
+                        "fail",
+                        f"{name}: exact score {current['score']}, baseline {old['score']}",
+                    )
+                )
+            check(f"{name} solve nodes", current["nodes"], old["nodes"], False)
+            check(
+                f"{name} solve seconds",
+                current["seconds"],
+                old["seconds"],
+                False,
+                old["seconds"],
+            )
+        elif "search" in result and "search" in previous and same_settings:
+            current, old = result["search"], previous["search"]
+            check(f"{name} nodes", current["nodes"], old["nodes"], False)
+            check(f"{name} nps", current["nps"], old["nps"], True, old["seconds"])
+            for step, old_step in zip(current["time_to_depth"], old["time_to_depth"]):
+                check(
+                    f"{name} time to depth {step['depth']}",
+                    step["seconds"],
+                    old_step["seconds"],
+                    False,
+                    old_step["seconds"],
+                )
+
+    for name, rate in report["throughput"].items():
+        check(f"{name} calls/s", rate, baseline["throughput"].get(name), True, 1.0)
+    if same_settings:
+        check(
+            "total nps",
+            report["totals"]["nps"],
+            baseline["totals"]["nps"],
+            True,
+            baseline["totals"]["seconds"],
+        )
+
+    ok = not any(level in ("fail", "regression") for level, _ in findings)
+    return findings, ok
+
+
+def main(argv=None):
+    """
+    Run the search benchmark from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the search, move generation and evaluation on a fixed set of positions."
+    )
+    parser.add_argument(
+        "--depth", type=int, default=6, help="deepest search depth (default: 6)"
+    )
+    parser.add_argument(
+        "--perft-depth", type=int, default=4, help="perft depth (default: 4)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs per measurement; the fastest is kept (default: 3)",
+    )
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE_PATH,
+        help=f"compare with a baseline JSON file (default: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE_PATH,
+        help=f"save the results as a baseline JSON file (default: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative slowdown before a timing counts as a regression (default: 0.1)",
+    )
+    parser.add_argument(
+        "--counts-only",
+        action="store_true",
+        help="compare only the deterministic counts, e.g. against a baseline from another machine",
+    )
+    parser.add_argument("--output", help="write the full results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.depth, args.perft_depth, args.repeat, log=sys.stdout)
+    totals = report["totals"]
+    print(
+        f"total        {totals['nodes']:>9} nodes {totals['seconds']:>8.3f}s {totals['nps']:>9.0f} nps"
+    )
+    for name, rate in report["throughput"].items():
+        print(f"{name}: {rate:.0f} calls/s")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+                file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        findings, ok = compare_reports(
+            report, baseline, args.tolerance, not args.counts_only
+        )
+        for level, message in findings:
+            print(f"{level.upper():<12} {message}")
+        print("OK" if ok else "REGRESSED")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
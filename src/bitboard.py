@@ -0,0 +1,259 @@
+"""
+Bitboard primitives for the Othello engine.
+
+A position is stored as two 64-bit integers, one per colour. Square (row, col)
+maps to bit ``row * 8 + col``, so bit 0 is the top-left corner (0, 0) and bit 63
+is the bottom-right corner (7, 7).
+"""
+
+FULL = 0xFFFFFFFFFFFFFFFF
+
+# Mask with columns 0 and 7 cleared. Opponent disks on those columns can never be
+# in the middle of a horizontal or diagonal run, which also stops shifts from
+# wrapping around to the neighbouring row.
+INNER_COLUMNS = 0x7E7E7E7E7E7E7E7E
+
+# Region masks used by the evaluation
+CORNERS = 0x8100000000000081
+BORDER = 0xFF818181818181FF
+EDGES = BORDER & ~CORNERS  # Border squares other than the corners
+
+# (shift amount, uses inner-column mask) for the four axes. Each axis is walked
+# in both directions: a left shift moves towards higher bit indexes, a right
+# shift towards lower ones.
+AXES = ((1, True), (8, False), (7, True), (9, True))
+
+
+def square_to_bit(row, col):
+    """
+    Convert a (row, col) coordinate to its single-bit mask.
+
+    Args:
+        row (int): The row index of the square.
+        col (int): The column index of the square.
+
+    Returns:
+        int: The bitboard with only that square set.
+    """
+    return 1 << (row * 8 + col)
+
+
+def bit_to_square(bit):
+    """
+    Convert a single-bit mask back to its (row, col) coordinate.
+
+    Args:
+        bit (int): A bitboard with exactly one bit set.
+
+    Returns:
+        tuple: The (row, col) coordinate of the set bit.
+    """
+    return divmod(bit.bit_length() - 1, 8)
+
+
+# Count the set bits of a bitboard. Bound directly to the int method so that hot
+# loops do not pay for an extra Python-level call.
+popcount = int.bit_count
+
+
+def iter_bits(bitboard):
+    """
+    Yield every set bit of a bitboard as a single-bit mask, lowest square first.
+
+    Args:
+        bitboard (int): The bitboard.
+
+    Yields:
+        int: A bitboard with one bit set.
+    """
+    while bitboard:
+        bit = bitboard & -bitboard
+        yield bit
+        bitboard ^= bit
+
+
+def neighbours(bitboard):
+    """
+    Compute every square adjacent (in any of the eight directions) to a set bit.
+
+    Args:
+        bitboard (int): The bitboard.
+
+    Returns:
+        int: Bitboard of the squares next to at least one set square.
+    """
+    # Clear the column a shift would wrap out of before moving sideways
+    left = bitboard & 0xFEFEFEFEFEFEFEFE
+    right = bitboard & 0x7F7F7F7F7F7F7F7F
+    result = (
+        (right << 1)
+        | (left >> 1)
+        | (bitboard << 8)
+        | (bitboard >> 8)
+        | (left << 7)
+        | (right >> 7)
+        | (right << 9)
+        | (left >> 9)
+    )
+    return result & FULL
+
+
+def legal_moves(own, opponent):
+    """
+    Compute every legal move for the side owning ``own``.
+
+    Uses a shift-and-mask fill in each of the eight directions: starting from the
+    own disks, slide over contiguous opponent disks and mark the empty square that
+    ends the run.
+
+    Args:
+        own (int): Bitboard of the side to move.
+        opponent (int): Bitboard of the other side.
+
+    Returns:
+        int: Bitboard of the legal destination squares.
+    """
+    empty = ~(own | opponent) & FULL
+    inner = opponent & INNER_COLUMNS
+    moves = 0
+    for shift, masked in AXES:
+        mask = inner if masked else opponent
+
+        run = mask & (own << shift)
+        run |= mask & (run << shift)
+        run |= mask & (run << shift)
+        run |= mask & (run << shift)
+        run |= mask & (run << shift)
+        run |= mask & (run << shift)
+        moves |= run << shift
+
+        run = mask & (own >> shift)
+        run |= mask & (run >> shift)
+        run |= mask & (run >> shift)
+        run |= mask & (run >> shift)
+        run |= mask & (run >> shift)
+        run |= mask & (run >> shift)
+        moves |= run >> shift
+    return moves & empty
+
+
+def flips(own, opponent, move_bit):
+    """
+    Compute the opponent disks flipped by playing ``move_bit``.
+
+    Args:
+        own (int): Bitboard of the side to move.
+        opponent (int): Bitboard of the other side.
+        move_bit (int): Single-bit mask of the (empty) destination square.
+
+    Returns:
+        int: Bitboard of the disks that change colour; 0 if the move is illegal.
+    """
+    inner = opponent & INNER_COLUMNS
+    flipped = 0
+    for shift, masked in AXES:
+        mask = inner if masked else opponent
+
+        run = 0
+        cursor = (move_bit << shift) & mask
+        while cursor:
+            run |= cursor
+            cursor <<= shift
+            if cursor & own:
+                flipped |= run
+                break
+            cursor &= mask
+
+        run = 0
+        cursor = (move_bit >> shift) & mask
+        while cursor:
+            run |= cursor
+            cursor >>= shift
+            if cursor & own:
+                flipped |= run
+                break
+            cursor &= mask
+    return flipped
+
+
+# Number of symmetries of the board: the identity, three rotations and four reflections
+SYMMETRIES = 8
+
+
+def flip_vertical(bitboard):
+    """
+    Mirror a bitboard top to bottom, so row r becomes row 7 - r.
+
+    Args:
+        bitboard (int): The bitboard.
+
+    Returns:
+        int: The mirrored bitboard.
+    """
+    return int.from_bytes(bitboard.to_bytes(8, "little"), "big")
+
+
+def flip_horizontal(bitboard):
+    """
+    Mirror a bitboard left to right, so column c becomes column 7 - c.
+
+    Args:
+        bitboard (int): The bitboard.
+
+    Returns:
+        int: The mirrored bitboard.
+    """
+    # Swap neighbouring bits, then bit pairs, then nibbles within every row
+    bitboard = ((bitboard >> 1) & 0x5555555555555555) | (
+        (bitboard & 0x5555555555555555) << 1
+    )
+    bitboard = ((bitboard >> 2) & 0x3333333333333333) | (
+        (bitboard & 0x3333333333333333) << 2
+    )
+    return ((bitboard >> 4) & 0x0F0F0F0F0F0F0F0F) | (
+        (bitboard & 0x0F0F0F0F0F0F0F0F) << 4
+    )
+
+
+def transpose(bitboard):
+    """
+    Mirror a bitboard in its main diagonal, so square (row, col) becomes (col, row).
+
+    Args:
+        bitboard (int): The bitboard.
+
+    Returns:
+        int: The mirrored bitboard.
+    """
+    # Swap the off-diagonal 4x4 blocks, then 2x2 blocks, then single squares
+    swap = 0x0F0F0F0F00000000 & (bitboard ^ (bitboard << 28))
+    bitboard ^= swap ^ (swap >> 28)
+    swap = 0x3333000033330000 & (bitboard ^ (bitboard << 14))
+    bitboard ^= swap ^ (swap >> 14)
+    swap = 0x5500550055005500 & (bitboard ^ (bitboard << 7))
+    bitboard ^= swap ^ (swap >> 7)
+    return bitboard & FULL
+
+
+def apply_symmetry(bitboard, symmetry):
+    """
+    Apply one of the eight board symmetries to a bitboard.
+
+    Symmetry 0 is the identity. Otherwise bit 2 of the number transposes the board, bit 1 mirrors it top to
+    bottom and bit 0 mirrors it left to right, in that order. The rules of the game are the same under every
+    symmetry, so a transformed position has the same value and its moves are the transformed moves.
+
+    Args:
+        bitboard (int): The bitboard.
+        symmetry (int): The symmetry, from 0 to SYMMETRIES - 1.
+
+    Returns:
+        int: The transformed bitboard.
+    """
+    if symmetry & 4:
+        bitboard = transpose(bitboard)
+    if symmetry & 2:
+        bitboard = flip_vertical(bitboard)
+    if symmetry & 1:
+        bitboard = flip_horizontal(bitboard)
+    return bitboard
@@ -0,0 +1,277 @@
+"""
+Exact endgame solver.
+
+Once few squares are empty, the game can be searched to the end and scored by
+its final disk differential instead of the heuristic evaluation. The solver works
+directly on bitboards (``own`` is the side to move) and uses:
+
+- fastest-first ordering (moves leaving the opponent the fewest replies first)
+  while many squares are empty,
+- parity ordering (moves into regions with an odd number of empties first),
+- specialised routines for the last one, two and three empty squares that try
+  the empty squares directly instead of generating moves.
+
+Scores are final disk differentials for the side to move, with empty squares
+going to the winner as in tournament scoring.
+"""
+
+from bitboard import FULL, bit_to_square, flips, legal_moves, popcount
+
+# Solve exactly once the number of empty squares is at or below this
+DEFAULT_ENDGAME_EMPTIES = 12
+
+# Use fastest-first ordering above this many empties; below it the extra move
+# generation costs more than the pruning saves
+FASTEST_FIRST_EMPTIES = 7
+
+# The four 4x4 quadrants used for parity ordering
+QUADRANTS = (
+    0x000000000F0F0F0F,
+    0x00000000F0F0F0F0,
+    0x0F0F0F0F00000000,
+    0xF0F0F0F000000000,
+)
+
+
+class _NoLimit:
+    """
+    Stand-in for a search context when the solver is called without one.
+    """
+
+    nodes = 0
+
+    def visit(self):
+        self.nodes += 1
+
+
+def final_score(own, opponent):
+    """
+    Score a finished game for the side owning ``own``.
+
+    Parameters:
+        own (int): Bitboard of the side to move.
+        opponent (int): Bitboard of the other side.
+
+    Returns:
+        int: The final disk differential, with empty squares credited to the winner.
+    """
+    own_count = popcount(own)
+    opponent_count = popcount(opponent)
+    difference = own_count - opponent_count
+    empties = 64 - own_count - opponent_count
+    if difference > 0:
+        return difference + empties
+    if difference < 0:
+        return difference - empties
+    return 0
+
+
+def solve(own, opponent, alpha=-64, beta=64, context=None):
+    """
+    Compute the exact final disk differential of a position with the side owning ``own`` to move.
+
+    The search is fail-soft: a score outside (alpha, beta) is a bound on the exact score.
+
+    Parameters:
+        own (int): Bitboard of the side to move.
+        opponent (int): Bitboard of the other side.
+        alpha (int): The lower bound of the search window.
+        beta (int): The upper bound of the search window.
+        context (SearchContext): Counts nodes and enforces the deadline of the search, if given.
+
+    Returns:
+        int: The final disk differential for the side to move.
+
+    Raises:
+        SearchTimeout: If the deadline of the context passes.
+    """
+    if context is None:
+        context = _NoLimit()
+    return _solve(own, opponent, alpha, beta, context, False)
+
+
+def _solve(own, opponent, alpha, beta, context, passed):
+    context.visit()
+    empty = ~(own | opponent) & FULL
+    empties = popcount(empty)
+    if empties == 1:
+        return _solve_last_1(own, opponent, empty)
+    if empties == 2:
+        return _solve_last_2(own, opponent, empty, alpha, beta, context)
+    if empties == 3:
+        return _solve_last_3(own, opponent, empty, alpha, beta, context)
+    if empties == 0:
+        return final_score(own, opponent)
+
+    moves = legal_moves(own, opponent)
+    if not moves:
+        if passed:
+            return final_score(own, opponent)
+        return -_solve(opponent, own, -beta, -alpha, context, True)
+
+    best = -65
+    for bit, flipped in _ordered_moves(own, opponent, moves, empty, empties):
+        score = -_solve(
+            opponent ^ flipped, own | bit | flipped, -beta, -alpha, context, False
+        )
+        if score > best:
+            best = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+    return best
+
+
+def _ordered_moves(own, opponent, moves, empty, empties):
+    """
+    Order the moves of a node, returning (move bit, flipped disks) pairs.
+    """
+    odd_regions = 0
+    for quadrant in QUADRANTS:
+        if popcount(empty & quadrant) & 1:
+            odd_regions |= quadrant
+
+    scored = []
+    while moves:
+        bit = moves & -moves
+        moves ^= bit
+        flipped = flips(own, opponent, bit)
+        if empties > FASTEST_FIRST_EMPTIES:
+            # Fewest opponent replies first, parity breaks ties
+            replies = popcount(legal_moves(opponent ^ flipped, own | bit | flipped))
+            key = replies * 2 + (0 if bit & odd_regions else 1)
+        else:
+            key = 0 if bit & odd_regions else 1
+        scored.append((key, bit, flipped))
+    scored.sort(key=lambda item: item[0])
+    return [(bit, flipped) for _, bit, flipped in scored]
+
+
+def _solve_last_1(own, opponent, empty):
+    """
+    Score a position with one empty square; the move and any pass are resolved directly.
+    """
+    flipped = flips(own, opponent, empty)
+    if flipped:
+        own_count = popcount(own) + popcount(flipped) + 1
+        return 2 * own_count - 64
+    flipped = flips(opponent, own, empty)
+    if flipped:
+        opponent_count = popcount(opponent) + popcount(flipped) + 1
+        return 64 - 2 * opponent_count
+    return final_score(own, opponent)
+
+
+def _solve_last_2(own, opponent, empty, alpha, beta, context):
+    """
+    Score a position with two empty squares by trying each square directly.
+    """
+    context.visit()
+    first = empty & -empty
+    second = empty ^ first
+
+    best = -65
+    for bit, rest in ((first, second), (second, first)):
+        flipped = flips(own, opponent, bit)
+        if flipped:
+            score = -_solve_last_1(opponent ^ flipped, own | bit | flipped, rest)
+            if score > best:
+                best = score
+                if score >= beta:
+                    return best
+    if best > -65:
+        return best
+
+    # The side to move must pass
+    best = 65
+    for bit, rest in ((first, second), (second, first)):
+        flipped = flips(opponent, own, bit)
+        if flipped:
+            score = _solve_last_1(own ^ flipped, opponent | bit | flipped, rest)
+            if score < best:
+                best = score
+                if score <= alpha:
+                    return best
+    if best < 65:
+        return best
+    return final_score(own, opponent)
+
+
+def _solve_last_3(own, opponent, empty, alpha, beta, context):
+    """
+    Score a position with three empty squares, trying squares in odd-parity quadrants first.
+    """
+    context.visit()
+    odd_regions = 0
+    for quadrant in QUADRANTS:
+        if popcount(empty & quadrant) & 1:
+            odd_regions |= quadrant
+    squares = []
+    remaining = empty
+    while remaining:
+        bit = remaining & -remaining
+        remaining ^= bit
+        squares.append(bit)
+    squares.sort(key=lambda bit: 0 if bit & odd_regions else 1)
+
+    best = -65
+    for bit in squares:
+        flipped = flips(own, opponent, bit)
+        if flipped:
+            score = -_solve_last_2(
+                opponent ^ flipped,
+                own | bit | flipped,
+                empty ^ bit,
+                -beta,
+                -alpha,
+                context,
+            )
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        return best
+    if best > -65:
+        return best
+
+    # The side to move must pass
+    if not legal_moves(opponent, own):
+        return final_score(own, opponent)
+    return -_solve_last_3(opponent, own, empty, -beta, -alpha, context)
+
+
+def solve_game(game, context=None):
+    """
+    Solve the current game state exactly.
+
+    Parameters:
+        game (OthelloGame): The current game state.
+        context (SearchContext): Counts nodes and enforces the deadline of the search, if given.
+
+    Returns:
+        tuple: The final disk differential for the player to move under perfect play, and the best move
+        (row, col), or None if the player to move has no valid move.
+
+    Raises:
+        SearchTimeout: If the deadline of the context passes.
+    """
+    if context is None:
+        context = _NoLimit()
+    own, opponent = game.own_and_opponent()
+    empty = ~(own | opponent) & FULL
+    moves = legal_moves(own, opponent)
+    if not moves:
+        return _solve(own, opponent, -64, 64, context, False), None
+
+    best_score, best_move = -65, None
+    alpha = -64
+    for bit, flipped in _ordered_moves(own, opponent, moves, empty, popcount(empty)):
+        score = -_solve(
+            opponent ^ flipped, own | bit | flipped, -64, -alpha, context, False
+        )
+        if score > best_score:
+            best_score, best_move = score, bit_to_square(bit)
+            alpha = max(alpha, score)
+    return best_score, best_move
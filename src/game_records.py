@@ -0,0 +1,423 @@
+"""
+Compact game records and streaming game archives.
+
+A game record is the list of moves of a game from the starting position,
+passes included, and optionally the final score: Black's disk differential
+with empty squares going to the winner (see endgame_solver.final_score).
+Positions on their own are encoded with OthelloGame.to_bytes.
+
+In binary form a record takes two bytes plus one per move: the number of
+moves (uint8), one byte per move (the square's bit index, row * 8 + col, or
+64 for a pass) and the score (int8, or -128 if it is unknown). An archive is
+the magic bytes b"OTHREC01" followed by records back to back, and is gzip
+compressed when its name ends in ".gz". Archives are read and written one
+record at a time, so files of millions of games never have to fit in memory.
+
+read_records also reads text files (plain or gzip compressed) with one game
+per line: either a transcript such as "e3f3f4", optionally followed by the
+score, or a JSON object with "moves", e.g. the game records of selfplay.py.
+
+Example:
+    python src/replay_games.py --input games.jsonl --output games.bin.gz
+"""
+
+import gzip
+import io
+import json
+import struct
+import zlib
+
+from endgame_solver import final_score
+from othello_game import PASS, OthelloGame, move_to_notation, notation_to_move
+
+MAGIC = b"OTHREC01"
+HEADER = struct.Struct("<B")
+SCORE = struct.Struct("<b")
+
+# The move byte of a pass, and the score byte of a record without a score
+PASS_CODE = 64
+NO_SCORE = -128
+
+# The largest disk differential of a finished game
+MAX_SCORE = 64
+
+# The most moves a game can have: every pass is followed by a move, so at most
+# as many passes as the 60 squares played
+MAX_GAME_MOVES = 120
+
+# The two bytes every gzip stream starts with
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Raised while reading a gzip stream that is truncated or corrupt
+_CORRUPT_STREAM_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile)
+
+
+class GameRecord:
+    def __init__(self, moves, score=None):
+        """
+        The moves of a game and, if known, its final score.
+
+        Parameters:
+            moves (list): The moves (row, col) from the starting position, with PASS for a pass. Passes may
+                be left out; `replay` makes them where the player to move has no valid move.
+            score (int): Black's final disk differential, or None if it is unknown.
+        """
+        self.moves = moves
+        self.score = score
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, GameRecord)
+            and self.moves == other.moves
+            and self.score == other.score
+        )
+
+    def __repr__(self):
+        return f"GameRecord({self.transcript()!r}, score={self.score})"
+
+    def transcript(self):
+        """
+        Get the moves as a transcript in standard notation, e.g. "e3f3f4", with the passes left out.
+
+        Returns:
+            str: The transcript (see othello_game.game_from_transcript).
+        """
+        return "".join(
+            move_to_notation(move) for move in self.moves if move is not PASS
+        )
+
+    @classmethod
+    def from_transcript(cls, transcript, score=None):
+        """
+        Create a record from a transcript in standard notation, with or without explicit "pass" moves.
+
+        Parameters:
+            transcript (str): The moves without separators, e.g. "e3f3f4".
+            score (int): Black's final disk differential, or None if it is unknown.
+
+        Returns:
+            GameRecord: The record.
+
+        Raises:
+            ValueError: If the transcript contains an invalid move.
+        """
+        transcript = transcript.strip().lower()
+        moves = []
+        index = 0
+        while index < len(transcript):
+            if transcript.startswith("pass", index):
+                moves.append(PASS)
+                index += 4
+            else:
+                moves.append(notation_to_move(transcript[index : index + 2]))
+                index += 2
+        return cls(moves, score)
+
+    def to_bytes(self):
+        """
+        Encode the record in its binary form.
+
+        Returns:
+            bytes: The encoded record, for `from_bytes`.
+
+        Raises:
+            ValueError: If the record has more than 255 moves or its score is out of range.
+        """
+        if len(self.moves) > 255:
+            raise ValueError(f"A record holds at most 255 moves, got {len(self.moves)}")
+        if self.score is not None:
+            _check_score(self.score)
+        codes = bytes(
+            PASS_CODE if move is PASS else move[0] * 8 + move[1] for move in self.moves
+        )
+        score = NO_SCORE if self.score is None else self.score
+        return HEADER.pack(len(codes)) + codes + SCORE.pack(score)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Decode a record encoded with `to_bytes`.
+
+        Parameters:
+            data (bytes): The encoded record.
+
+        Returns:
+            GameRecord: The record.
+
+        Raises:
+            ValueError: If the data is not a valid encoded record.
+        """
+        if len(data) < HEADER.size + SCORE.size or data[0] + 2 != len(data):
+            raise ValueError("Invalid encoded game record")
+        score = SCORE.unpack_from(data, len(data) - 1)[0]
+        return cls(_decode_moves(data[1:-1]), None if score == NO_SCORE else score)
+
+    def replay(self, player_mode="friend"):
+        """
+        Play the moves from the starting position.
+
+        Parameters:
+            player_mode (str): The mode of the returned game.
+
+        Returns:
+            OthelloGame: The game after the last move, with any forced pass already made.
+
+        Raises:
+            ValueError: If a move or pass is illegal, with its ply.
+        """
+        game = OthelloGame(player_mode)
+        for ply, move in enumerate(self.moves, 1):
+            if move is PASS:
+                if game.pass_turn() is None:
+                    raise ValueError(f"Illegal pass at ply {ply}")
+                continue
+            if game.must_pass():
+                game.pass_turn()
+            if game.make_move(*move) is None:
+                raise ValueError(
+                    f"Illegal move {move_to_notation(move)!r} at ply {ply}"
+                )
+        if game.must_pass():
+            game.pass_turn()
+        return game
+
+
+def _decode_moves(codes):
+    """
+    Turn the move bytes of an encoded record into moves.
+
+    Raises:
+        ValueError: If a byte is neither a square nor a pass.
+    """
+    moves = []
+    for code in codes:
+        if code == PASS_CODE:
+            moves.append(PASS)
+        elif code < 64:
+            moves.append(divmod(code, 8))
+        else:
+            raise ValueError(f"Invalid move byte {code}")
+    return moves
+
+
+def _check_score(score):
+    """
+    Check that a score is a possible final disk differential.
+
+    Raises:
+        ValueError: If the score is not an int from -MAX_SCORE to MAX_SCORE.
+    """
+    if type(score) is not int or not -MAX_SCORE <= score <= MAX_SCORE:
+        raise ValueError(
+            f"Score must be an integer from {-MAX_SCORE} to {MAX_SCORE}, got {score!r}"
+        )
+
+
+def game_score(game):
+    """
+    Get Black's final disk differential of a game, with empty squares going to the winner.
+
+    Parameters:
+        game (OthelloGame): A finished game.
+
+    Returns:
+        int: The score.
+    """
+    return final_score(game.black, game.white)
+
+
+def record_from_json(data):
+    """
+    Create a record from a JSON game record, such as those of selfplay.py.
+
+    Parameters:
+        data (dict): An object with "moves", a list of moves in standard notation ("pass" for a pass) or a
+            transcript, and optionally a "score" or the final "black_discs" and "white_discs".
+
+    Returns:
+        GameRecord: The record.
+
+    Raises:
+        ValueError: If the object has no moves, a move is invalid or the score is out of range.
+    """
+    moves = data.get("moves")
+    if moves is None:
+        raise ValueError("Record has no moves")
+    score = data.get("score")
+    if score is None and "black_discs" in data and "white_discs" in data:
+        # Empty squares go to the winner, as in final_score
+        black, white = data["black_discs"], data["white_discs"]
+        empties = 64 - black - white
+        score = black - white
+        if score:
+            score += empties if score > 0 else -empties
+    if score is not None:
+        _check_score(score)
+    if isinstance(moves, str):
+        return GameRecord.from_transcript(moves, score)
+    return GameRecord([notation_to_move(text) for text in moves], score)
+
+
+def record_from_line(line):
+    """
+    Create a record from a line of a text file: a JSON object, or a transcript optionally followed by the score.
+
+    Parameters:
+        line (str): The line.
+
+    Returns:
+        GameRecord: The record.
+
+    Raises:
+        ValueError: If the line is not a valid game record.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        return record_from_json(json.loads(line))
+    fields = line.split()
+    if len(fields) not in (1, 2):
+        raise ValueError("Expected a transcript and optionally a score")
+    score = int(fields[1]) if len(fields) == 2 else None
+    if score is not None:
+        _check_score(score)
+    return GameRecord.from_transcript(fields[0], score)
+
+
+def _open(path):
+    """
+    Open a file for reading as a binary stream, decompressing it if it is gzip compressed.
+    """
+    file = open(path, "rb")
+    if file.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return io.BufferedReader(gzip.GzipFile(fileobj=file, mode="rb"))
+    return file
+
+
+def read_records(path):
+    """
+    Read the records of an archive or a text file one at a time.
+
+    Parameters:
+        path (str): A game archive or a text file with one game per line, plain or gzip compressed.
+
+    Yields:
+        GameRecord: The records, in the order of the file.
+
+    Raises:
+        ValueError: If a record is malformed, with its file and record or line number.
+    """
+    with _open(path) as file:
+        try:
+            is_archive = file.peek(len(MAGIC))[: len(MAGIC)] == MAGIC
+        except _CORRUPT_STREAM_ERRORS as error:
+            raise ValueError(f"{path}: truncated or corrupt ({error})") from error
+        if is_archive:
+            file.read(len(MAGIC))
+            yield from _read_archive(file, path)
+            return
+        number = 0
+        lines = io.TextIOWrapper(file, encoding="utf-8")
+        while True:
+            # A compressed file that ends early raises on the read that reaches its end
+            try:
+                line = lines.readline()
+            except _CORRUPT_STREAM_ERRORS as error:
+                raise ValueError(
+                    f"{path}, line {number + 1}: truncated or corrupt ({error})"
+                ) from error
+            if not line:
+                return
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                record = record_from_line(line)
+            except (ValueError, AttributeError, TypeError) as error:
+                raise ValueError(f"{path}, line {number}: {error}") from error
+            yield record
+
+
+def _read_archive(file, path):
+    """
+    Read the records of an archive after its magic bytes.
+    """
+    number = 0
+    while True:
+        number += 1
+        # A compressed archive that ends early raises on the read that reaches its end
+        try:
+            header = file.read(HEADER.size)
+            if not header:
+                return
+            body = file.read(header[0] + SCORE.size)
+        except _CORRUPT_STREAM_ERRORS as error:
+            raise ValueError(
+                f"{path}, record {number}: truncated or corrupt ({error})"
+            ) from error
+        if len(body) != header[0] + SCORE.size:
+            raise ValueError(f"{path}, record {number}: truncated")
+        try:
+            moves = _decode_moves(body[:-1])
+        except ValueError as error:
+            raise ValueError(f"{path}, record {number}: {error}") from error
+        score = SCORE.unpack_from(body, len(body) - 1)[0]
+        yield GameRecord(moves, None if score == NO_SCORE else score)
+
+
+class RecordWriter:
+    def __init__(self, path, compresslevel=6):
+        """
+        Write game records to an archive one at a time.
+
+        Use as a context manager, or call `close` when done.
+
+        Parameters:
+            path (str): The archive to write. It is gzip compressed if its name ends in ".gz".
+            compresslevel (int): The gzip compression level, from 1 (fastest) to 9 (smallest).
+        """
+        if path.endswith(".gz"):
+            self._file = gzip.open(path, "wb", compresslevel=compresslevel)
+        else:
+            self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self.count = 0
+
+    def write(self, record):
+        """
+        Append a record to the archive.
+
+        Parameters:
+            record (GameRecord): The record.
+        """
+        self._file.write(record.to_bytes())
+        self.count += 1
+
+    def close(self):
+        """
+        Finish the archive and close its file.
+        """
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_records(path, records, compresslevel=6):
+    """
+    Write game records to an archive.
+
+    Parameters:
+        path (str): The archive to write. It is gzip compressed if its name ends in ".gz".
+        records (iterable): The records; they are consumed one at a time.
+        compresslevel (int): The gzip compression level, from 1 (fastest) to 9 (smallest).
+
+    Returns:
+        int: The number of records written.
+    """
+    with RecordWriter(path, compresslevel) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.count
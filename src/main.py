@@ -1,4 +1,17 @@
-from GUI.menu_gui import run_menu
+import argparse
+import time
+
+# Taken before the GUI is imported, so the cold start includes loading Pygame
+START_TIME = time.perf_counter()
+
+from GUI.menu_gui import run_menu  # noqa: E402
 
 if __name__ == "__main__":
-    run_menu()
+    parser = argparse.ArgumentParser(description="Play Othello.")
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="print how long the menu and each game take to appear",
+    )
+    args = parser.parse_args()
+    run_menu(START_TIME, report_timing=args.timing)
@@ -0,0 +1,468 @@
+"""
+Opening book: deeply searched opening moves, looked up instead of searched.
+
+The book maps positions to their best move. It is built offline by build_book,
+which covers the opening tree to a fixed number of plies from the point of view
+of the engine playing either colour: every reply of the opponent is followed,
+and every position in which the engine is to move is searched deeper than the
+AI can afford during a game and followed by its book move only. So whatever
+the opponent plays, the engine stays in the book for the covered plies. The
+book is saved as a compact binary file that get_best_move probes before
+searching.
+
+Positions are stored once per symmetry class: a position and its seven
+rotations and reflections are looked up under the key of the canonical one
+(see canonical_position), and the book move is mapped back onto the actual
+board. Positions are stored from the point of view of the player to move, so
+the book serves both colours.
+
+File format (little-endian): a 16-byte header with the magic bytes
+b"OTHBOOK1", the number of records (uint32) and the record size (uint32),
+followed by the records sorted by key. Each record is the 64-bit Zobrist key
+of the canonical position, the square of the best move on the canonical board
+(row * 8 + col), the search depth and the score (float32). The file is
+memory-mapped and binary-searched in place, so opening a book reads nothing
+but the header and a probe touches about log2(n) records.
+
+Example:
+    python src/opening_book.py --plies 12 --depth 8 --workers 4
+    python src/opening_book.py --info
+    python src/opening_book.py --probe e3f3f4
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from multiprocessing import Pool
+
+from bitboard import (
+    SYMMETRIES,
+    apply_symmetry,
+    bit_to_square,
+    flips,
+    iter_bits,
+    legal_moves,
+)
+from othello_game import (
+    INITIAL_BLACK,
+    INITIAL_WHITE,
+    OthelloGame,
+    game_from_transcript,
+    move_to_notation,
+)
+from zobrist import hash_position
+
+DEFAULT_BOOK_PATH = "./utils/opening_book.bin"
+
+MAGIC = b"OTHBOOK1"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<QBBf")  # key, move square, depth, score
+KEY = struct.Struct("<Q")
+
+# Defaults of build_book
+DEFAULT_PLIES = 12
+DEFAULT_FULL_WIDTH_PLIES = 0
+DEFAULT_DEPTH = 8
+
+# Roles of a position in the opening tree of build_book: the engine is to move
+# (search it and follow its book move), or its opponent is (follow every move)
+ENGINE_TO_MOVE = 1
+OPPONENT_TO_MOVE = 2
+
+# Slots in the transposition table of each book search
+BOOK_TABLE_SIZE = 1 << 18
+
+_default_book = None
+_default_book_loaded = False
+
+
+def canonical_position(own, opponent):
+    """
+    Find the canonical form of a position among its eight symmetric versions.
+
+    The canonical form is the transformed (own, opponent) pair that compares lowest, so every position of a
+    symmetry class has the same canonical form.
+
+    Args:
+        own (int): Bitboard of the player to move.
+        opponent (int): Bitboard of the other player.
+
+    Returns:
+        tuple: The canonical own and opponent bitboards and the symmetry that produces them.
+    """
+    best = (own, opponent)
+    best_symmetry = 0
+    for symmetry in range(1, SYMMETRIES):
+        transformed = (
+            apply_symmetry(own, symmetry),
+            apply_symmetry(opponent, symmetry),
+        )
+        if transformed < best:
+            best = transformed
+            best_symmetry = symmetry
+    return best[0], best[1], best_symmetry
+
+
+def position_key(own, opponent):
+    """
+    Compute the book key of a position: the Zobrist hash of its canonical form.
+
+    Args:
+        own (int): Bitboard of the player to move.
+        opponent (int): Bitboard of the other player.
+
+    Returns:
+        tuple: The 64-bit key and the symmetry that maps the position onto its canonical form.
+    """
+    canonical_own, canonical_opponent, symmetry = canonical_position(own, opponent)
+    return hash_position(canonical_own, canonical_opponent, 1), symmetry
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        """
+        A read-only opening book file, memory-mapped and searched in place.
+
+        Parameters:
+            path (str): The book file (see write_book).
+
+        Raises:
+            ValueError: If the file is not an opening book.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book")
+        magic, count, record_size = HEADER.unpack_from(self._map)
+        if (
+            magic != MAGIC
+            or record_size != RECORD.size
+            or len(self._map) != HEADER.size + count * RECORD.size
+        ):
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book")
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Unmap the book file.
+        """
+        self._map.close()
+
+    def lookup(self, key):
+        """
+        Find the record of a canonical position.
+
+        Parameters:
+            key (int): The key of the position (see position_key).
+
+        Returns:
+            tuple: The move square on the canonical board, the search depth and the score, or None if the
+            position is not in the book.
+        """
+        data = self._map
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            middle_key = KEY.unpack_from(data, offset)[0]
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                _, square, depth, score = RECORD.unpack_from(data, offset)
+                return square, depth, score
+        return None
+
+    def probe(self, game):
+        """
+        Look up the book move of the current position.
+
+        Parameters:
+            game (OthelloGame): The current game state.
+
+        Returns:
+            tuple: The book move (row, col), its search depth and its score from the current player's point of
+            view, or None if the position is not in the book.
+        """
+        own, opponent = game.own_and_opponent()
+        moves = legal_moves(own, opponent)
+        if not moves:
+            return None
+        key, symmetry = position_key(own, opponent)
+        record = self.lookup(key)
+        if record is None:
+            return None
+        square, depth, score = record
+        canonical_move = 1 << square
+        # Map the move back by finding the legal move that the symmetry sends onto it; a key collision leaves
+        # no such move
+        for bit in iter_bits(moves):
+            if apply_symmetry(bit, symmetry) == canonical_move:
+                return bit_to_square(bit), depth, score
+        return None
+
+    def records(self):
+        """
+        Iterate over the records of the book in key order.
+
+        Yields:
+            tuple: The key, move square, depth and score of each record.
+        """
+        for index in range(self._count):
+            yield RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+
+
+def write_book(path, entries):
+    """
+    Write an opening book file.
+
+    Parameters:
+        path (str): The file to write.
+        entries (dict): The records by key: (move square, depth, score) on the canonical board.
+    """
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(entries), RECORD.size))
+        for key in sorted(entries):
+            square, depth, score = entries[key]
+            file.write(RECORD.pack(key, square, depth, score))
+
+
+def get_default_book():
+    """
+    Get the opening book in DEFAULT_BOOK_PATH, opening it on first use.
+
+    Returns:
+        OpeningBook: The book, or None if there is no book file.
+    """
+    global _default_book, _default_book_loaded
+    if not _default_book_loaded:
+        _default_book_loaded = True
+        if os.path.exists(DEFAULT_BOOK_PATH):
+            _default_book = OpeningBook(DEFAULT_BOOK_PATH)
+    return _default_book
+
+
+def _play(own, opponent, move_bit):
+    """
+    Play a move on bitboards and return the next position, with any forced pass made.
+
+    Returns:
+        tuple: The own and opponent bitboards of the player to move next, or None if the game is over.
+    """
+    flipped = flips(own, opponent, move_bit)
+    own |= move_bit | flipped
+    opponent ^= flipped
+    if legal_moves(opponent, own):
+        return opponent, own
+    if legal_moves(own, opponent):
+        return own, opponent
+    return None
+
+
+def _search_position(task):
+    """
+    Search one canonical book position, in a worker process or in this one.
+    """
+    from ai_agent import analyze
+    from transposition_table import TranspositionTable
+
+    own, opponent, depth, time_limit_ms = task
+    game = OthelloGame(player_mode="ai")
+    game.set_position(own, opponent, 1)
+    stats = {}
+    score, principal_variation = analyze(
+        game, depth, TranspositionTable(BOOK_TABLE_SIZE), time_limit_ms, stats=stats
+    )
+    row, col = principal_variation[0]
+    return row * 8 + col, stats["depth"], score
+
+
+def build_book(
+    plies=DEFAULT_PLIES,
+    full_width_plies=DEFAULT_FULL_WIDTH_PLIES,
+    depth=DEFAULT_DEPTH,
+    time_limit_ms=None,
+    workers=1,
+    log=None,
+):
+    """
+    Search the opening tree and collect the book records.
+
+    The tree is followed for the engine playing either colour. In a position where the engine's opponent is to
+    move, every legal move is followed; in one where the engine is to move, the position is searched and only
+    its book move is followed. A position can be both, e.g. the starting position, reached through the lines of
+    either colour. Positions are searched once per symmetry class, ply by ply, in parallel worker processes.
+
+    Parameters:
+        plies (int): The number of plies from the starting position to cover.
+        full_width_plies (int): The number of plies in which every position is searched and every legal move is
+            followed, whoever is to move.
+        depth (int): The search depth of each position.
+        time_limit_ms (float): The time budget of each search in milliseconds, or None for no limit.
+        workers (int): The number of worker processes.
+        log (file): If given, a progress line is written to it after every ply.
+
+    Returns:
+        dict: The records by key (see write_book).
+    """
+    entries = {}
+    start = time.perf_counter()
+    key, _ = position_key(INITIAL_BLACK, INITIAL_WHITE)
+    # Canonical key -> (canonical own and opponent bitboards, roles)
+    frontier = {
+        key: (
+            canonical_position(INITIAL_BLACK, INITIAL_WHITE)[:2],
+            ENGINE_TO_MOVE | OPPONENT_TO_MOVE,
+        )
+    }
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        for ply in range(plies):
+            if ply < full_width_plies:
+                frontier = {
+                    key: (position, ENGINE_TO_MOVE | OPPONENT_TO_MOVE)
+                    for key, (position, _) in frontier.items()
+                }
+            keys = [
+                key
+                for key, (_, roles) in frontier.items()
+                if roles & ENGINE_TO_MOVE and key not in entries
+            ]
+            tasks = [(*frontier[key][0], depth, time_limit_ms) for key in keys]
+            if pool is not None:
+                results = pool.map(_search_position, tasks)
+            else:
+                results = map(_search_position, tasks)
+            entries.update(zip(keys, results))
+
+            next_frontier = {}
+            for key, ((own, opponent), roles) in frontier.items():
+                children = []
+                if roles & ENGINE_TO_MOVE:
+                    children.append((1 << entries[key][0], OPPONENT_TO_MOVE))
+                if roles & OPPONENT_TO_MOVE:
+                    moves = legal_moves(own, opponent)
+                    children.extend((bit, ENGINE_TO_MOVE) for bit in iter_bits(moves))
+                for move_bit, role in children:
+                    child = _play(own, opponent, move_bit)
+                    if child is None:
+                        continue
+                    if child[0] & move_bit:
+                        # The other player had to pass, so the same side moves again
+                        role ^= ENGINE_TO_MOVE | OPPONENT_TO_MOVE
+                    child_own, child_opponent, _ = canonical_position(*child)
+                    child_key = hash_position(child_own, child_opponent, 1)
+                    _, child_roles = next_frontier.get(child_key, (None, 0))
+                    next_frontier[child_key] = (
+                        (child_own, child_opponent),
+                        child_roles | role,
+                    )
+            frontier = next_frontier
+            if log is not None:
+                print(
+                    f"ply {ply + 1}: {len(tasks)} positions searched, {len(entries)} in the book "
+                    f"({time.perf_counter() - start:.1f} s)",
+                    file=log,
+                )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return entries
+
+
+def main(argv=None):
+    """
+    Build, inspect or probe an opening book from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build an opening book by searching the opening tree deeply, or inspect one."
+    )
+    parser.add_argument(
+        "--book", default=DEFAULT_BOOK_PATH, help="the book file to write or read"
+    )
+    parser.add_argument(
+        "--plies", type=int, default=DEFAULT_PLIES, help="plies of the opening to cover"
+    )
+    parser.add_argument(
+        "--full-width-plies",
+        type=int,
+        default=DEFAULT_FULL_WIDTH_PLIES,
+        help="plies in which every position is searched and every legal move followed",
+    )
+    parser.add_argument(
+        "--depth", type=int, default=DEFAULT_DEPTH, help="search depth per position"
+    )
+    parser.add_argument(
+        "--time-ms",
+        type=float,
+        default=None,
+        help="time budget per position in milliseconds",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument(
+        "--info", action="store_true", help="print the size of an existing book"
+    )
+    action.add_argument(
+        "--probe",
+        metavar="TRANSCRIPT",
+        help="print the book move after the moves of a transcript, e.g. e3f3f4",
+    )
+    args = parser.parse_args(argv)
+
+    if args.info or args.probe is not None:
+        try:
+            book = OpeningBook(args.book)
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+        with book:
+            if args.info:
+                depths = [depth for _, _, depth, _ in book.records()]
+                print(
+                    f"{args.book}: {len(book)} positions, search depth "
+                    f"{min(depths, default=0)}-{max(depths, default=0)}"
+                )
+                return
+            try:
+                game = game_from_transcript(args.probe)
+            except ValueError as error:
+                parser.error(str(error))
+            hit = book.probe(game)
+            if hit is None:
+                print("not in the book")
+            else:
+                move, depth, score = hit
+                print(f"{move_to_notation(move)}  score {score}  depth {depth}")
+        return
+
+    entries = build_book(
+        args.plies,
+        args.full_width_plies,
+        args.depth,
+        args.time_ms,
+        args.workers,
+        log=sys.stderr,
+    )
+    write_book(args.book, entries)
+    print(f"Wrote {len(entries)} positions to {args.book}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,151 @@
+import struct
+
+from bitboard import (
+    FULL,
+    bit_to_square,
+    flips,
+    iter_bits,
+    legal_moves,
+    popcount,
+    square_to_bit,
+)
+from zobrist import BLACK_KEYS, SIDE_KEY, WHITE_KEYS, flip_hash, hash_position
+
+# The move value used for a pass in move lists and principal variations
+PASS = None
+
+# Bitboards of the four centre disks in the starting position
+INITIAL_BLACK = square_to_bit(3, 3) | square_to_bit(4, 4)
+INITIAL_WHITE = square_to_bit(3, 4) | square_to_bit(4, 3)
+
+# Compact position encoding: the black and white bitboards (little-endian uint64) and the side to move (int8)
+POSITION = struct.Struct("<QQb")
+
+
 class OthelloGame:
     def __init__(self, player_mode="friend"):
         """
         A class representing the Othello game board and its rules.
 
+        The position is stored as two bitboards (``black`` and ``white``); ``board``
+        is a lazily built 8x8 list view of them for code that reads individual cells.
+        ``hash`` is the Zobrist hash of the position and side to move, kept up to date
+        as moves are made and undone.
+
         Args:
             player_mode (str): The mode of the game, either "friend" or "ai" (default is "friend").
         """
-        self.board = [[0 for _ in range(8)] for _ in range(8)]
-        self.board[3][3] = 1
-        self.board[3][4] = -1
-        self.board[4][3] = -1
-        self.board[4][4] = 1
+        self.black = INITIAL_BLACK
+        self.white = INITIAL_WHITE
         self.current_player = 1
         self.player_mode = player_mode
+        self.hash = hash_position(self.black, self.white, self.current_player)
+        self._board = None
+
+    @property
+    def board(self):
+        """
+        An 8x8 list view of the position (1 for Black, -1 for White, 0 for empty).
+
+        The view is rebuilt only after the position changes. It is read-only:
+        assign a whole new board to change the position.
+
+        Returns:
+            list: The board as a list of 8 rows of 8 cells.
+        """
+        if self._board is None:
+            black, white = self.black, self.white
+            self._board = [
+                [
+                    (
+                        1
+                        if black >> (row * 8 + col) & 1
+                        else -1 if white >> (row * 8 + col) & 1 else 0
+                    )
+                    for col in range(8)
+                ]
+                for row in range(8)
+            ]
+        return self._board
+
+    @board.setter
+    def board(self, board):
+        """
+        Replace the position with the one described by an 8x8 list of cells.
+
+        Args:
+            board (list): A list of 8 rows of 8 cells (1, -1 or 0).
+        """
+        black = white = 0
+        for row in range(8):
+            for col in range(8):
+                if board[row][col] == 1:
+                    black |= square_to_bit(row, col)
+                elif board[row][col] == -1:
+                    white |= square_to_bit(row, col)
+        self.black = black
+        self.white = white
+        self.hash = hash_position(black, white, self.current_player)
+        self._board = None
+
+    def set_position(self, black, white, current_player):
+        """
+        Replace the position with the one described by two bitboards and the side to move.
+
+        Args:
+            black (int): Bitboard of the black disks.
+            white (int): Bitboard of the white disks.
+            current_player (int): The player to move (1 for Black, -1 for White).
+        """
+        self.black = black
+        self.white = white
+        self.current_player = current_player
+        self.hash = hash_position(black, white, current_player)
+        self._board = None
+
+    def to_bytes(self):
+        """
+        Encode the position and side to move in POSITION.size (17) bytes.
+
+        Returns:
+            bytes: The encoded position, for `from_bytes`.
+        """
+        return POSITION.pack(self.black, self.white, self.current_player)
+
+    @classmethod
+    def from_bytes(cls, data, player_mode="friend"):
+        """
+        Create a game from a position encoded with `to_bytes`.
+
+        Args:
+            data (bytes): The encoded position.
+            player_mode (str): The mode of the returned game.
+
+        Returns:
+            OthelloGame: A game in the encoded position.
+
+        Raises:
+            ValueError: If the data is not a valid encoded position.
+        """
+        if len(data) != POSITION.size:
+            raise ValueError(f"Expected {POSITION.size} bytes, got {len(data)}")
+        black, white, current_player = POSITION.unpack(data)
+        if black & white or current_player not in (1, -1):
+            raise ValueError("Invalid encoded position")
+        game = cls(player_mode)
+        game.set_position(black, white, current_player)
+        return game
+
+    def own_and_opponent(self):
+        """
+        Get the bitboards of the current player and of their opponent.
+
+        Returns:
+            tuple: (own, opponent) bitboards.
+        """
+        if self.current_player == 1:
+            return self.black, self.white
+        return self.white, self.black
 
     def is_valid_move(self, row, col):
         """
@@ -25,35 +158,13 @@ class OthelloGame:
         Returns:
             bool: True if the move is valid and flips opponent disks, False otherwise.
         """
-        if self.board[row][col] != 0:
+        if not (0 <= row < 8 and 0 <= col < 8):
             return False
-
-        # Check in all eight directions for opponent disks to flip
-        directions = [
-            (-1, -1),
-            (-1, 0),
-            (-1, 1),
-            (0, -1),
-            (0, 1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-        ]
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            while (
-                0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == -self.current_player
-            ):
-                r += dr
-                c += dc
-                if (
-                    0 <= r < 8
-                    and 0 <= c < 8
-                    and self.board[r][c] == self.current_player
-                ):
-                    return True
-
-        return False
+        bit = square_to_bit(row, col)
+        if (self.black | self.white) & bit:
+            return False
+        own, opponent = self.own_and_opponent()
+        return flips(own, opponent, bit) != 0
 
     def flip_disks(self, row, col):
         """
@@ -62,56 +173,110 @@ class OthelloGame:
         Args:
             row (int): The row index of the move.
             col (int): The column index of the move.
+
+        Returns:
+            int: The bitboard of the flipped disks.
         """
-        directions = [
-            (-1, -1),
-            (-1, 0),
-            (-1, 1),
-            (0, -1),
-            (0, 1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-        ]
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            flip_list = []
-            while (
-                0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == -self.current_player
-            ):
-                flip_list.append((r, c))
-                r += dr
-                c += dc
-                if (
-                    0 <= r < 8
-                    and 0 <= c < 8
-                    and self.board[r][c] == self.current_player
-                ):
-                    for fr, fc in flip_list:
-                        self.board[fr][fc] = self.current_player
+        own, opponent = self.own_and_opponent()
+        flipped = flips(own, opponent, square_to_bit(row, col))
+        self.black ^= flipped
+        self.white ^= flipped
+        self.hash ^= flip_hash(flipped)
+        self._board = None
+        return flipped
 
     def make_move(self, row, col):
         """
         Make a move at the given position for the current player if it's a valid move.
 
+        The move is applied in place. The returned undo record can be passed to
+        `undo_move` to restore the previous position, which lets the search walk a
+        single game object instead of copying it for every node.
+
         Args:
             row (int): The row index of the move.
             col (int): The column index of the move.
+
+        Returns:
+            tuple: The undo record (move bit, flipped disks, previous hash), or None if the move is invalid.
+        """
+        if not (0 <= row < 8 and 0 <= col < 8):
+            return None
+        bit = square_to_bit(row, col)
+        if (self.black | self.white) & bit:
+            return None
+        own, opponent = self.own_and_opponent()
+        flipped = flips(own, opponent, bit)
+        if not flipped:
+            return None
+        record = (bit, flipped, self.hash)
+        square = bit.bit_length() - 1
+        if self.current_player == 1:
+            self.black ^= flipped | bit
+            self.white ^= flipped
+            self.hash ^= BLACK_KEYS[square] ^ flip_hash(flipped) ^ SIDE_KEY
+        else:
+            self.white ^= flipped | bit
+            self.black ^= flipped
+            self.hash ^= WHITE_KEYS[square] ^ flip_hash(flipped) ^ SIDE_KEY
+        self._board = None
+        self.current_player *= -1
+        return record
+
+    def undo_move(self, record):
+        """
+        Take back the move or pass described by an undo record returned from `make_move` or `pass_turn`.
+
+        Records must be undone in the reverse order of the moves that produced them.
+
+        Args:
+            record (tuple): The undo record (move bit, flipped disks, previous hash).
+        """
+        bit, flipped, self.hash = record
+        self.current_player *= -1
+        if self.current_player == 1:
+            self.black ^= flipped | bit
+            self.white ^= flipped
+        else:
+            self.white ^= flipped | bit
+            self.black ^= flipped
+        self._board = None
+
+    def pass_turn(self):
+        """
+        Pass the turn to the opponent. Only allowed when the current player has no valid move.
+
+        Returns:
+            tuple: The undo record of the pass, for `undo_move`, or None if the current player has a valid move.
+        """
+        if self.get_valid_moves_mask():
+            return None
+        record = (0, 0, self.hash)
+        self.hash ^= SIDE_KEY
+        self.current_player *= -1
+        return record
+
+    def must_pass(self):
+        """
+        Check if the current player has no valid move while the opponent still has one.
+
+        Returns:
+            bool: True if the current player has to pass, False otherwise.
         """
-        if self.is_valid_move(row, col):
-            self.board[row][col] = self.current_player
-            self.flip_disks(row, col)
-            self.current_player *= -1
+        own, opponent = self.own_and_opponent()
+        return not legal_moves(own, opponent) and legal_moves(opponent, own) != 0
 
     def is_game_over(self):
         """
-        Check if the game is over (no more valid moves or board is full).
+        Check if the game is over (neither player has a valid move, which includes a full board).
 
         Returns:
             bool: True if the game is over, False otherwise.
         """
-        return not self.get_valid_moves() or all(
-            all(cell != 0 for cell in row) for row in self.board
+        if (self.black | self.white) == FULL:
+            return True
+        return not legal_moves(self.black, self.white) and not legal_moves(
+            self.white, self.black
         )
 
     def get_winner(self):
@@ -121,8 +286,8 @@ class OthelloGame:
         Returns:
             int: The winner of the game (1 for Black, -1 for White, 0 for a tie).
         """
-        black_count = sum(row.count(1) for row in self.board)
-        white_count = sum(row.count(-1) for row in self.board)
+        black_count = popcount(self.black)
+        white_count = popcount(self.white)
 
         if black_count > white_count:
             return 1
@@ -131,6 +296,16 @@ class OthelloGame:
         else:
             return 0
 
+    def get_valid_moves_mask(self):
+        """
+        Get the valid moves for the current player as a bitboard.
+
+        Returns:
+            int: A bitboard with one bit set per valid move.
+        """
+        own, opponent = self.own_and_opponent()
+        return legal_moves(own, opponent)
+
     def get_valid_moves(self):
         """
         Get a list of valid moves for the current player.
@@ -138,9 +313,69 @@ class OthelloGame:
         Returns:
             list: A list of valid moves represented as tuples (row, col).
         """
-        valid_moves = []
-        for row in range(8):
-            for col in range(8):
-                if self.is_valid_move(row, col):
-                    valid_moves.append((row, col))
-        return valid_moves
+        return [bit_to_square(bit) for bit in iter_bits(self.get_valid_moves_mask())]
+
+
+def move_to_notation(move):
+    """
+    Convert a move to its standard notation: a column letter and a row number, e.g. "d3".
+
+    Args:
+        move (tuple): The move (row, col), or PASS.
+
+    Returns:
+        str: The move in standard notation, or "pass".
+    """
+    if move is PASS:
+        return "pass"
+    row, col = move
+    return f"{'abcdefgh'[col]}{row + 1}"
+
+
+def notation_to_move(text):
+    """
+    Convert a move in standard notation (e.g. "d3" or "pass") back to a move.
+
+    Args:
+        text (str): The move in standard notation.
+
+    Returns:
+        tuple: The move (row, col), or PASS.
+
+    Raises:
+        ValueError: If the text is not a valid square or "pass".
+    """
+    text = text.strip().lower()
+    if text == "pass":
+        return PASS
+    if len(text) != 2 or text[0] not in "abcdefgh" or text[1] not in "12345678":
+        raise ValueError(f"Invalid move notation: {text!r}")
+    return int(text[1]) - 1, "abcdefgh".index(text[0])
+
+
+def game_from_transcript(transcript, player_mode="friend"):
+    """
+    Replay a game transcript from the starting position.
+
+    Args:
+        transcript (str): The moves in standard notation without separators, e.g. "e3f3f4". Passes are implicit:
+            a player with no valid move passes before the next move is read.
+        player_mode (str): The mode of the returned game.
+
+    Returns:
+        OthelloGame: The game after the last move, with any forced pass already made.
+
+    Raises:
+        ValueError: If the transcript contains an invalid or illegal move.
+    """
+    game = OthelloGame(player_mode)
+    for index in range(0, len(transcript), 2):
+        if game.must_pass():
+            game.pass_turn()
+        text = transcript[index : index + 2]
+        move = notation_to_move(text)
+        if move is PASS or game.make_move(*move) is None:
+            raise ValueError(f"Illegal move {text!r} at ply {index // 2 + 1}")
+    if game.must_pass():
+        game.pass_turn()
+    return game
@@ -0,0 +1,313 @@
+"""
+Parallel root search across CPU cores.
+
+The root moves of each iterative-deepening iteration are split across a pool of
+worker processes. The first (principal) move is searched with a full window to
+establish a score; every other move is then searched concurrently with a zero
+window around that score. A move that proves better is re-searched with a full
+window as soon as its zero-window result arrives, concurrently with the other
+searches and re-searches still running. Each worker keeps its own
+transposition table between tasks, so later iterations and later moves of a
+game reuse earlier work.
+
+Run this module to print a time-to-depth speedup curve for 1..N workers.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import ai_agent
+from ai_agent import (
+    INFINITY,
+    NULL_WINDOW,
+    SearchContext,
+    SearchTimeout,
+    add_counters,
+    negamax,
+    new_stats,
+    record_iteration,
+)
+from move_ordering import MoveOrderer
+from othello_game import OthelloGame
+
+_pool = None
+_pool_workers = 0
+
+
+def get_pool(workers):
+    """
+    Get the shared worker pool, (re)creating it if the number of workers changed.
+
+    Parameters:
+        workers (int): The number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    """
+    Shut down the shared worker pool, discarding the workers' transposition tables.
+    """
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+
+
+def search_root_move(position, move, depth, alpha, beta, deadline, evaluator):
+    """
+    Search one root move in a worker process.
+
+    Parameters:
+        position (tuple): The root position as (black, white, current_player).
+        move (tuple): The root move (row, col) to search.
+        depth (int): The search depth of the root, including the move itself.
+        alpha (float): The lower bound of the root window.
+        beta (float): The upper bound of the root window.
+        deadline (float): The time.time() value at which the search of the whole move stops, or None for no
+            limit. It is an absolute time so that every task of the move shares it, however long it was queued.
+        evaluator (callable): The leaf evaluation function, or None for the default.
+
+    Returns:
+        tuple: The score of the move from the root player's point of view, the principal variation starting with
+        the move and the counts of the search (see SearchContext.counters), or None if the time budget ran out.
+    """
+    game = OthelloGame()
+    game.set_position(*position)
+    game.make_move(*move)
+
+    # The search reads time.perf_counter(), whose origin differs between processes
+    if deadline is not None:
+        deadline = time.perf_counter() + (deadline - time.time())
+    table = ai_agent.default_table(evaluator)
+    table.new_search()
+    context = SearchContext(table, deadline, evaluator=evaluator)
+    try:
+        value, principal_variation = negamax(game, depth - 1, -beta, -alpha, context, 1)
+    except SearchTimeout:
+        return None
+    return -value, [move] + principal_variation, context.counters()
+
+
+def parallel_analyze(
+    game,
+    max_depth=8,
+    time_limit_ms=None,
+    workers=None,
+    evaluator=None,
+    stats=None,
+    callback=None,
+):
+    """
+    Search the current game state with the root moves split across worker processes.
+
+    Parameters:
+        game (OthelloGame): The current game state.
+        max_depth (int): The maximum search depth.
+        time_limit_ms (float): The time budget for the move in milliseconds. Defaults to None (no limit).
+        workers (int): The number of worker processes. Defaults to the number of CPUs.
+        evaluator (callable): The leaf evaluation function. It must be a module-level function so it can be
+            sent to the workers. Defaults to evaluate_game_state.
+        stats (dict): If given, the counts of every worker's searches, the depth of the last completed iteration
+            and the completed iterations are added to it (see ai_agent.analyze).
+        callback (callable): Called as callback("iteration", iteration) after every completed iteration. The
+            workers do not report progress within an iteration.
+
+    Returns:
+        tuple: The score from the current player's point of view and the principal variation, as returned by
+        ai_agent.analyze.
+    """
+    if stats is None:
+        stats = {}
+    for key, value in new_stats().items():
+        stats.setdefault(key, value)
+    stats["depth"] = 0
+    valid_moves = game.get_valid_moves()
+    if not valid_moves:
+        return ai_agent.analyze(
+            game, max_depth, evaluator=evaluator, stats=stats, callback=callback
+        )
+
+    pool = get_pool(workers or os.cpu_count() or 1)
+    position = (game.black, game.white, game.current_player)
+    # A wall-clock deadline, which the worker processes can compare against
+    deadline = None
+    if time_limit_ms is not None:
+        deadline = time.time() + time_limit_ms / 1000
+
+    root_moves = MoveOrderer().order_moves(valid_moves, 0)
+    score, principal_variation = None, [root_moves[0]]
+    for depth in range(1, max_depth + 1):
+        if deadline is not None and time.time() >= deadline:
+            break
+        iteration_start = time.perf_counter()
+        result = _search_root(
+            pool, position, root_moves, depth, deadline, evaluator, stats
+        )
+        if result is None:
+            break
+        score, principal_variation, scores = result
+        stats["depth"] = depth
+        record_iteration(
+            stats,
+            depth,
+            score,
+            principal_variation,
+            stats["nodes"],
+            time.perf_counter() - iteration_start,
+            callback,
+        )
+        root_moves.sort(key=lambda move: scores[move], reverse=True)
+    return score, principal_variation
+
+
+def _search_root(pool, position, root_moves, depth, deadline, evaluator, stats):
+    """
+    Run one iteration of the parallel root search.
+
+    Returns:
+        tuple: The root score, the principal variation and a dict of (bound) scores per root move for ordering
+        the next iteration, or None if the time budget ran out.
+    """
+    first = root_moves[0]
+    result = pool.submit(
+        search_root_move,
+        position,
+        first,
+        depth,
+        -INFINITY,
+        INFINITY,
+        deadline,
+        evaluator,
+    ).result()
+    if result is None:
+        return None
+    best_value, principal_variation, counters = result
+    add_counters(stats, counters)
+    alpha = best_value
+    scores = {first: best_value}
+
+    # Each future maps to its move, the alpha of its window, which the current
+    # alpha may have moved past by the time the result arrives, and whether it
+    # is a full-window re-search
+    pending = {
+        pool.submit(
+            search_root_move,
+            position,
+            move,
+            depth,
+            alpha,
+            alpha + NULL_WINDOW,
+            deadline,
+            evaluator,
+        ): (move, alpha, False)
+        for move in root_moves[1:]
+    }
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                move, window_alpha, full_window = pending.pop(future)
+                result = future.result()
+                if result is None:
+                    return None
+                value, move_pv, counters = result
+                add_counters(stats, counters)
+                if not full_window and value >= window_alpha + NULL_WINDOW:
+                    # The zero-window search failed high, so the move may beat the
+                    # current best; re-search it with a full window for its score,
+                    # alongside the searches still running
+                    future = pool.submit(
+                        search_root_move,
+                        position,
+                        move,
+                        depth,
+                        alpha,
+                        INFINITY,
+                        deadline,
+                        evaluator,
+                    )
+                    pending[future] = (move, alpha, True)
+                    continue
+                # A value inside the window is exact, and one at or below its
+                # alpha cannot beat the best move
+                if value > best_value:
+                    best_value, principal_variation = value, move_pv
+                    alpha = value
+                scores[move] = value
+    finally:
+        for future in pending:
+            future.cancel()
+    return best_value, principal_variation, scores
+
+
+def speedup_curve(game, depth, worker_counts):
+    """
+    Measure time-to-depth of the parallel search for several worker counts.
+
+    Every measurement starts from a fresh pool, so no worker reuses a table from a previous run.
+
+    Parameters:
+        game (OthelloGame): The position to search.
+        depth (int): The depth to search to.
+        worker_counts (iterable): The worker counts to measure.
+
+    Returns:
+        list: One (workers, seconds, speedup over the first measurement) tuple per worker count.
+    """
+    curve = []
+    for workers in worker_counts:
+        shutdown_pool()
+        get_pool(workers).submit(int).result()  # Start the workers outside the timing
+        start = time.perf_counter()
+        parallel_analyze(game, depth, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = curve[0][1] if curve else elapsed
+        curve.append((workers, elapsed, baseline / elapsed))
+    shutdown_pool()
+    return curve
+
+
+def main():
+    """
+    Print the time-to-depth speedup curve of the parallel search from a midgame position.
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--depth", type=int, default=7, help="search depth")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="largest worker count to measure",
+    )
+    args = parser.parse_args()
+
+    game = OthelloGame()
+    for move in [(2, 3), (2, 2), (3, 2), (4, 2), (5, 3), (2, 4)]:
+        game.make_move(*move)
+
+    worker_counts = []
+    workers = 1
+    while workers < args.max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    worker_counts.append(args.max_workers)
+
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for workers, seconds, speedup in speedup_curve(game, args.depth, worker_counts):
+        print(f"{workers:>8} {seconds:>9.3f} {speedup:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Pattern-based evaluation with learned weights.
+
+The board is covered by pattern instances: the edges with their two X-squares,
+the 3x3 and 2x5 corner regions, and the diagonals of length 4 to 8, each in
+every orientation the board symmetries give it. The contents of an instance
+(empty, own or opponent on each of its squares) is read as a base-3 index
+into the weight table of its pattern, which all instances of the pattern
+share. The score of a position is the sum of the weights of its instances
+plus a bias, with a separate set of tables for each game phase (by number of
+disks), and predicts the final disk differential for the player to move.
+
+The indexes are computed on the bitboards without visiting squares: the
+squares of an instance are split into groups with distinct columns (on the
+board or on its transpose), each group is gathered into one byte with a
+multiplication, and a 256-entry table turns the byte into the group's share
+of the base-3 index.
+
+Weights are fitted by train_patterns.py and stored in a compact binary file
+(little-endian): the magic bytes b"OTHPAT01", the number of phases (uint32)
+and the number of weights per phase (uint32), followed by the float32 weights
+of each phase in turn. Loading a file reads it straight into an array.
+
+Example:
+    python src/train_patterns.py --input games.jsonl --output utils/pattern_weights.bin
+    python src/selfplay.py --games 100 --black-eval pattern --white-eval classic
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+from bitboard import SYMMETRIES, apply_symmetry, popcount, square_to_bit, transpose
+
+DEFAULT_WEIGHTS_PATH = "./utils/pattern_weights.bin"
+
+MAGIC = b"OTHPAT01"
+HEADER = struct.Struct("<8sII")
+
+# The number of game phases with their own weights, by number of disks on the board
+PHASES = 10
+
+# The squares of one instance of each pattern, in the order of the digits of its index
+PATTERNS = {
+    "edge_2x": [(0, col) for col in range(8)] + [(1, 1), (1, 6)],
+    "corner_3x3": [(row, col) for row in range(3) for col in range(3)],
+    "corner_2x5": [(row, col) for row in range(2) for col in range(5)],
+    "diagonal_8": [(index, index) for index in range(8)],
+    "diagonal_7": [(index, index + 1) for index in range(7)],
+    "diagonal_6": [(index, index + 2) for index in range(6)],
+    "diagonal_5": [(index, index + 3) for index in range(5)],
+    "diagonal_4": [(index, index + 4) for index in range(4)],
+}
+
+# Multiplying a bitboard with at most one bit per column by this gathers its
+# bits into the top byte, in column order, without carries
+GATHER = 0x0101010101010101
+
+_default_weights = None
+
+
+def _instances(squares):
+    """
+    Get every distinct orientation of a pattern under the board symmetries.
+
+    Returns:
+        list: The square lists of the instances, in the digit order of the base instance.
+    """
+    instances = []
+    seen = set()
+    for symmetry in range(SYMMETRIES):
+        instance = []
+        for row, col in squares:
+            bit = apply_symmetry(square_to_bit(row, col), symmetry)
+            instance.append(divmod(bit.bit_length() - 1, 8))
+        if frozenset(instance) not in seen:
+            seen.add(frozenset(instance))
+            instances.append(instance)
+    return instances
+
+
+def _groups(instance):
+    """
+    Split the squares of an instance into groups that can each be gathered into one byte.
+
+    Returns:
+        list: One (transposed, mask, table) tuple per group: whether the group is read from the transposed
+        board, the bitboard of its squares there, and the 256-entry table from the gathered byte to the
+        group's share of the index.
+    """
+    best = None
+    for transposed in (False, True):
+        groups = []
+        for digit, (row, col) in enumerate(instance):
+            if transposed:
+                row, col = col, row
+            # Put the square in the first group that has nothing in its column yet
+            for group in groups:
+                if col not in group:
+                    group[col] = (row, digit)
+                    break
+            else:
+                groups.append({col: (row, digit)})
+        if best is None or len(groups) < len(best[1]):
+            best = (transposed, groups)
+
+    transposed, groups = best
+    result = []
+    for group in groups:
+        mask = 0
+        for col, (row, _) in group.items():
+            mask |= square_to_bit(row, col)
+        table = [0] * 256
+        for byte in range(256):
+            for col, (_, digit) in group.items():
+                if byte >> col & 1:
+                    table[byte] += 3**digit
+        result.append((transposed, mask, table))
+    return result
+
+
+def _build_layout():
+    """
+    Lay out the weights of one phase: the tables of the patterns in turn, then the bias.
+
+    Returns:
+        tuple: The (weight offset, groups) pair of every instance, and the number of weights per phase.
+    """
+    instances = []
+    offset = 0
+    for squares in PATTERNS.values():
+        for instance in _instances(squares):
+            instances.append((offset, _groups(instance)))
+        offset += 3 ** len(squares)
+    return tuple(instances), offset + 1
+
+
+INSTANCES, WEIGHTS_PER_PHASE = _build_layout()
+BIAS_OFFSET = WEIGHTS_PER_PHASE - 1
+
+
+def phase(own, opponent):
+    """
+    Get the game phase of a position.
+
+    Args:
+        own (int): Bitboard of the player to move.
+        opponent (int): Bitboard of the other player.
+
+    Returns:
+        int: The phase, from 0 (the opening) to PHASES - 1.
+    """
+    return min((popcount(own | opponent) - 4) * PHASES // 60, PHASES - 1)
+
+
+def pattern_features(own, opponent):
+    """
+    Get the weights that make up the score of a position.
+
+    Args:
+        own (int): Bitboard of the player to move.
+        opponent (int): Bitboard of the other player.
+
+    Returns:
+        list: The index of the weight of every pattern instance in the position, and of the bias, into the
+        weights of all phases.
+    """
+    base = phase(own, opponent) * WEIGHTS_PER_PHASE
+    boards = ((own, opponent), (transpose(own), transpose(opponent)))
+    features = [base + BIAS_OFFSET]
+    for offset, groups in INSTANCES:
+        index = base + offset
+        for transposed, mask, table in groups:
+            board_own, board_opponent = boards[transposed]
+            index += table[((board_own & mask) * GATHER >> 56) & 0xFF]
+            index += 2 * table[((board_opponent & mask) * GATHER >> 56) & 0xFF]
+        features.append(index)
+    return features
+
+
+def pattern_score(own, opponent, weights):
+    """
+    Score a position with pattern weights.
+
+    Args:
+        own (int): Bitboard of the player to move.
+        opponent (int): Bitboard of the other player.
+        weights (array): The weights of all phases (see load_weights).
+
+    Returns:
+        float: The predicted final disk differential for the player to move.
+    """
+    return sum([weights[index] for index in pattern_features(own, opponent)])
+
+
+def new_weights():
+    """
+    Get a set of weights that are all zero.
+
+    Returns:
+        array: PHASES * WEIGHTS_PER_PHASE float32 weights.
+    """
+    return array("f", bytes(4 * PHASES * WEIGHTS_PER_PHASE))
+
+
+def save_weights(path, weights):
+    """
+    Write pattern weights to a file.
+
+    Args:
+        path (str): The file to write.
+        weights (sequence): PHASES * WEIGHTS_PER_PHASE weights.
+    """
+    weights = array("f", weights)
+    if len(weights) != PHASES * WEIGHTS_PER_PHASE:
+        raise ValueError(
+            f"Expected {PHASES * WEIGHTS_PER_PHASE} weights, got {len(weights)}"
+        )
+    if sys.byteorder == "big":
+        weights.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, PHASES, WEIGHTS_PER_PHASE))
+        weights.tofile(file)
+
+
+def load_weights(path=DEFAULT_WEIGHTS_PATH):
+    """
+    Read pattern weights from a file.
+
+    Args:
+        path (str): The weight file (see save_weights).
+
+    Returns:
+        array: The float32 weights of all phases.
+
+    Raises:
+        ValueError: If the file is not a weight file for these patterns and phases.
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path} is not a pattern weight file")
+        magic, phases, per_phase = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pattern weight file")
+        if phases != PHASES or per_phase != WEIGHTS_PER_PHASE:
+            raise ValueError(
+                f"{path} has {phases} phases of {per_phase} weights; expected {PHASES} of {WEIGHTS_PER_PHASE}"
+            )
+        weights = array("f")
+        try:
+            weights.fromfile(file, phases * per_phase)
+        except EOFError as error:
+            raise ValueError(f"{path} is truncated") from error
+    if sys.byteorder == "big":
+        weights.byteswap()
+    return weights
+
+
+def get_default_weights():
+    """
+    Get the weights in DEFAULT_WEIGHTS_PATH, loading them on first use.
+
+    Returns:
+        array: The weights.
+
+    Raises:
+        FileNotFoundError: If there is no weight file; train_patterns.py writes one.
+    """
+    global _default_weights
+    if _default_weights is None:
+        if not os.path.exists(DEFAULT_WEIGHTS_PATH):
+            raise FileNotFoundError(
+                f"No pattern weights in {DEFAULT_WEIGHTS_PATH}; train them with src/train_patterns.py"
+            )
+        _default_weights = load_weights(DEFAULT_WEIGHTS_PATH)
+    return _default_weights
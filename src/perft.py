@@ -0,0 +1,310 @@
+"""
+Perft: move-generation verification and throughput.
+
+perft(game, depth) counts the leaves of the game tree to a fixed number of
+plies, walking it with the same OthelloGame methods the search uses
+(get_valid_moves, make_move, pass_turn and undo_move). A forced pass counts as
+a ply, and a finished game is a leaf however many plies remain. The counts from
+the starting position are known (START_POSITION_COUNTS), so any change to move
+generation or to making and undoing moves can be checked against them, and a
+faster move generator can be proven equivalent by comparing divide output.
+
+perft_bitboards counts the same tree directly on bitboards, without the game
+object, as a raw move-generation throughput figure.
+
+Example:
+    python src/perft.py --depth 8 --workers 4
+    python src/perft.py --depth 6 --divide --transcript e3f3f4
+    python src/perft.py --verify
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from bitboard import flips, legal_moves, popcount
+from othello_game import PASS, OthelloGame, game_from_transcript, move_to_notation
+
+# Leaf counts of the starting position by depth
+START_POSITION_COUNTS = {
+    1: 4,
+    2: 12,
+    3: 56,
+    4: 244,
+    5: 1396,
+    6: 8200,
+    7: 55092,
+    8: 390216,
+    9: 3005288,
+}
+
+# The parallel mode splits the tree until there are this many subtrees per worker
+TASKS_PER_WORKER = 8
+
+
+def perft(game, depth, workers=1):
+    """
+    Count the leaves of the game tree of a position to a fixed depth.
+
+    Parameters:
+        game (OthelloGame): The position to expand. It is restored before returning.
+        depth (int): The number of plies to expand.
+        workers (int): The number of processes to split the subtrees across. Defaults to 1 (count in this
+            process).
+
+    Returns:
+        int: The number of leaves.
+    """
+    if workers > 1:
+        counts = divide(game, depth, workers)
+        if counts:
+            return sum(leaves for _, leaves in counts)
+    return _perft(game, depth)
+
+
+def _perft(game, depth):
+    if depth == 0:
+        return 1
+    valid_moves = game.get_valid_moves()
+    if not valid_moves:
+        record = game.pass_turn()
+        if game.get_valid_moves_mask() == 0:
+            game.undo_move(record)
+            return 1
+        try:
+            return _perft(game, depth - 1)
+        finally:
+            game.undo_move(record)
+    if depth == 1:
+        return len(valid_moves)
+
+    leaves = 0
+    for move in valid_moves:
+        record = game.make_move(*move)
+        leaves += _perft(game, depth - 1)
+        game.undo_move(record)
+    return leaves
+
+
+def divide(game, depth, workers=1):
+    """
+    Count the leaves of the game tree below each root move, to compare two move generators move by move.
+
+    Parameters:
+        game (OthelloGame): The position to expand. It is restored before returning.
+        depth (int): The number of plies to expand, including the root move.
+        workers (int): The number of processes to split the subtrees across. Defaults to 1.
+
+    Returns:
+        list: (move, leaves) pairs in move generation order, where move is (row, col) or PASS. The list is empty
+        if depth is 0 or the game is over.
+    """
+    if depth == 0:
+        return []
+    if workers <= 1:
+        counts = []
+        for move, record in _children(game):
+            try:
+                counts.append((move, _perft(game, depth - 1)))
+            finally:
+                game.undo_move(record)
+        return counts
+
+    tasks = _split(game, depth, workers * TASKS_PER_WORKER)
+    with Pool(workers) as pool:
+        results = pool.map(_perft_task, [task[1:] for task in tasks])
+    counts = {}
+    for (move, *_), leaves in zip(tasks, results):
+        counts[move] = counts.get(move, 0) + leaves
+    return list(counts.items())
+
+
+def _children(game):
+    """
+    Make each move of a position in turn, yielding (move, undo record); the caller undoes the record.
+
+    A forced pass is the only child of a position without moves, and a finished game has no children.
+    """
+    valid_moves = game.get_valid_moves()
+    if not valid_moves:
+        if not game.must_pass():
+            return
+        yield PASS, game.pass_turn()
+        return
+    for move in valid_moves:
+        yield move, game.make_move(*move)
+
+
+def _split(game, depth, min_tasks):
+    """
+    Split the tree of a position into independent subtrees for the parallel mode.
+
+    Returns:
+        list: (root move, black, white, current player, remaining depth) tasks whose leaf counts add up to the
+        perft of the position. Finished games below the root become tasks of depth 0.
+    """
+    tasks = []
+    for move, record in _children(game):
+        tasks.append((move, game.black, game.white, game.current_player, depth - 1))
+        game.undo_move(record)
+
+    node = OthelloGame()
+    while len(tasks) < min_tasks and any(task[4] > 1 for task in tasks):
+        expanded = []
+        for move, black, white, current_player, remaining in tasks:
+            if remaining <= 1:
+                expanded.append((move, black, white, current_player, remaining))
+                continue
+            node.set_position(black, white, current_player)
+            children = 0
+            for _, record in _children(node):
+                expanded.append(
+                    (move, node.black, node.white, node.current_player, remaining - 1)
+                )
+                node.undo_move(record)
+                children += 1
+            if not children:
+                expanded.append((move, black, white, current_player, 0))
+        tasks = expanded
+    return tasks
+
+
+def _perft_task(task):
+    """
+    Count the leaves of one subtree in a worker process.
+    """
+    black, white, current_player, depth = task
+    game = OthelloGame()
+    game.set_position(black, white, current_player)
+    return _perft(game, depth)
+
+
+def perft_bitboards(own, opponent, depth, passed=False):
+    """
+    Count the leaves of the game tree of a position directly on bitboards.
+
+    Gives the same counts as perft without the overhead of the game object, to measure raw move generation.
+
+    Parameters:
+        own (int): Bitboard of the side to move.
+        opponent (int): Bitboard of the other side.
+        depth (int): The number of plies to expand.
+        passed (bool): Whether the previous ply was a pass.
+
+    Returns:
+        int: The number of leaves.
+    """
+    if depth == 0:
+        return 1
+    moves = legal_moves(own, opponent)
+    if not moves:
+        if passed:
+            return 1
+        return perft_bitboards(opponent, own, depth - 1, True)
+    if depth == 1:
+        return popcount(moves)
+    leaves = 0
+    while moves:
+        bit = moves & -moves
+        moves ^= bit
+        flipped = flips(own, opponent, bit)
+        leaves += perft_bitboards(opponent ^ flipped, own | bit | flipped, depth - 1)
+    return leaves
+
+
+def verify(max_depth=max(START_POSITION_COUNTS), workers=1, log=None):
+    """
+    Check perft and perft_bitboards from the starting position against the known counts.
+
+    Parameters:
+        max_depth (int): The deepest depth to check.
+        workers (int): The number of processes for perft.
+        log (file): If given, a line is written to it per depth.
+
+    Returns:
+        bool: True if every count matched.
+    """
+    ok = True
+    game = OthelloGame()
+    own, opponent = game.own_and_opponent()
+    for depth in range(1, max_depth + 1):
+        expected = START_POSITION_COUNTS.get(depth)
+        leaves = perft(game, depth, workers)
+        fast_leaves = perft_bitboards(own, opponent, depth)
+        matched = fast_leaves == leaves and expected in (None, leaves)
+        ok = ok and matched
+        if log is not None:
+            print(
+                f"perft({depth}) = {leaves}, bitboards {fast_leaves}, expected {expected}: "
+                f"{'ok' if matched else 'MISMATCH'}",
+                file=log,
+            )
+    return ok
+
+
+def main(argv=None):
+    """
+    Run perft from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Count the leaves of the Othello game tree to verify and time move generation."
+    )
+    parser.add_argument("--depth", type=int, default=6, help="plies to expand")
+    parser.add_argument(
+        "--transcript",
+        default="",
+        help="moves from the starting position, e.g. e3f3f4 (default: the starting position)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--divide", action="store_true", help="print the leaf count of every root move"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=f"worker processes (0 for one per CPU, {os.cpu_count()} here)",
+    )
+    mode.add_argument(
+        "--bitboards",
+        action="store_true",
+        help="count directly on bitboards instead of through OthelloGame",
+    )
+    mode.add_argument(
+        "--verify",
+        action="store_true",
+        help="check the counts of the starting position up to --depth against the known values",
+    )
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.verify:
+        ok = verify(args.depth, workers, log=sys.stdout)
+        print("OK" if ok else "MISMATCH")
+        return 0 if ok else 1
+
+    try:
+        game = game_from_transcript(args.transcript)
+    except ValueError as error:
+        parser.error(str(error))
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(game, args.depth, workers)
+        for move, leaves in counts:
+            print(f"{move_to_notation(move)}: {leaves}")
+        leaves = sum(count for _, count in counts)
+    elif args.bitboards:
+        leaves = perft_bitboards(*game.own_and_opponent(), args.depth)
+    else:
+        leaves = perft(game, args.depth, workers)
+    elapsed = time.perf_counter() - start
+    print(
+        f"perft({args.depth}) = {leaves} in {elapsed:.3f}s ({leaves / elapsed:.0f} leaves/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
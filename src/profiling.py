@@ -0,0 +1,236 @@
+"""
+Profiling and reporting for the search.
+
+profile_call runs any function under cProfile (built in) or pyinstrument (an
+optional dependency) and returns its result. Profiles can be saved to a file or
+printed.
+
+Setting the OTHELLO_PROFILE environment variable to "cprofile" or "pyinstrument"
+makes every get_best_move call profile itself, with no code changes. The
+profiles go to the directory in OTHELLO_PROFILE_DIR (default: the current
+directory), one file per call: .prof files for cProfile (read them with pstats
+or snakeviz) and .html files for pyinstrument.
+
+Run this module to search one position and print the search report, optionally
+under a profiler.
+
+Example:
+    OTHELLO_PROFILE=cprofile OTHELLO_PROFILE_DIR=/tmp/profiles python src/main.py
+    python src/profiling.py --depth 8 --transcript e3f3f4 --time-phases --profiler cprofile
+"""
+
+import argparse
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import sys
+import time
+
+from ai_agent import EVALUATORS, analyze, check_evaluator
+from othello_game import game_from_transcript
+from transposition_table import TranspositionTable
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+# The directory for the profiles of get_best_move calls
+PROFILE_DIR_ENVIRONMENT_VARIABLE = "OTHELLO_PROFILE_DIR"
+
+# Functions listed when a cProfile profile is printed
+PRINTED_FUNCTIONS = 25
+
+_profile_counter = itertools.count(1)
+
+
+def profile_call(
+    function, arguments=(), profiler="cprofile", output=None, sort="cumulative"
+):
+    """
+    Call a function under a profiler.
+
+    Parameters:
+        function (callable): The function to profile.
+        arguments (tuple): The positional arguments of the call.
+        profiler (str): "cprofile" or "pyinstrument".
+        output (str): The file to save the profile to: pstats data for cProfile, HTML for pyinstrument. If None,
+            a text summary is printed to standard error.
+        sort (str): The pstats sort key of a printed cProfile summary.
+
+    Returns:
+        The return value of the function.
+
+    Raises:
+        ValueError: If the profiler is unknown.
+        ImportError: If pyinstrument is requested but not installed.
+    """
+    if profiler == "cprofile":
+        profile = cProfile.Profile()
+        result = profile.runcall(function, *arguments)
+        if output is not None:
+            profile.dump_stats(output)
+        else:
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(
+                PRINTED_FUNCTIONS
+            )
+            print(stream.getvalue(), file=sys.stderr)
+        return result
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as error:
+            raise ImportError(
+                "The pyinstrument profiler needs the pyinstrument package (pip install pyinstrument)"
+            ) from error
+        profile = Profiler()
+        profile.start()
+        try:
+            result = function(*arguments)
+        finally:
+            profile.stop()
+        if output is not None:
+            with open(output, "w") as file:
+                file.write(profile.output_html())
+        else:
+            print(profile.output_text(), file=sys.stderr)
+        return result
+
+    raise ValueError(f"Unknown profiler: {profiler!r} (expected one of {PROFILERS})")
+
+
+def profile_to_directory(function, arguments, profiler):
+    """
+    Call a function under a profiler and save the profile to a new file in OTHELLO_PROFILE_DIR.
+
+    Parameters:
+        function (callable): The function to profile.
+        arguments (tuple): The positional arguments of the call.
+        profiler (str): "cprofile" or "pyinstrument".
+
+    Returns:
+        The return value of the function.
+    """
+    directory = os.environ.get(PROFILE_DIR_ENVIRONMENT_VARIABLE, ".")
+    os.makedirs(directory, exist_ok=True)
+    extension = "html" if profiler == "pyinstrument" else "prof"
+    name = (
+        f"search-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+        f"{next(_profile_counter)}.{extension}"
+    )
+    return profile_call(function, arguments, profiler, os.path.join(directory, name))
+
+
+def format_stats(stats):
+    """
+    Format a search report (see ai_agent.analyze) as text.
+
+    Parameters:
+        stats (dict): The search report.
+
+    Returns:
+        str: The report, with one line per iteration.
+    """
+    lines = [
+        f"score {stats['score']}  depth {stats['depth']}  pv {' '.join(stats['pv'])}",
+        f"nodes {stats['nodes']}  leaf evals {stats['leaf_evals']}  tt hits {stats['tt_hits']}  "
+        f"tt cutoffs {stats['tt_cutoffs']}  beta cutoffs {stats['beta_cutoffs']}",
+    ]
+    time_ms = stats["time_ms"]
+    nps = stats["nodes"] / time_ms * 1000 if time_ms else 0
+    timing = f"time {time_ms:.1f} ms  {nps:.0f} nps"
+    if "movegen_ms" in stats:
+        timing += (
+            f"  movegen {stats['movegen_ms']:.1f} ms  eval {stats['eval_ms']:.1f} ms"
+        )
+    lines.append(timing)
+    lines.append(f"{'depth':>5} {'score':>9} {'nodes':>10} {'ms':>9}  pv")
+    for iteration in stats["iterations"]:
+        lines.append(
+            f"{iteration['depth']:>5} {iteration['score']:>9} {iteration['nodes']:>10} "
+            f"{iteration['ms']:>9.1f}  {' '.join(iteration['pv'])}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Search one position and print the search report from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Search one position and print the search report, optionally under a profiler."
+    )
+    parser.add_argument(
+        "--transcript",
+        default="",
+        help="moves from the starting position, e.g. e3f3f4 (default: the starting position)",
+    )
+    parser.add_argument("--depth", type=int, default=8, help="maximum search depth")
+    parser.add_argument(
+        "--time-ms", type=float, default=None, help="time budget in milliseconds"
+    )
+    parser.add_argument(
+        "--eval",
+        choices=sorted(EVALUATORS),
+        default="classic",
+        help="evaluation function",
+    )
+    parser.add_argument(
+        "--time-phases",
+        action="store_true",
+        help="time move generation and leaf evaluation",
+    )
+    parser.add_argument(
+        "--batch-plies",
+        type=int,
+        default=0,
+        help="score the leaves of this many plies above the horizon in NumPy batches",
+    )
+    parser.add_argument("--profiler", choices=PROFILERS, help="profile the search")
+    parser.add_argument(
+        "--output", help="save the profile to this file instead of printing it"
+    )
+    parser.add_argument(
+        "--sort", default="cumulative", help="sort key of a printed cProfile summary"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        game = game_from_transcript(args.transcript)
+        check_evaluator(args.eval)
+    except ValueError as error:
+        parser.error(str(error))
+    stats = {}
+
+    def search():
+        return analyze(
+            game,
+            args.depth,
+            TranspositionTable(),
+            args.time_ms,
+            evaluator=EVALUATORS[args.eval],
+            stats=stats,
+            time_phases=args.time_phases,
+            batch_plies=args.batch_plies,
+        )
+
+    if args.batch_plies:
+        from batch_evaluation import require_numpy
+
+        try:
+            require_numpy()
+        except ImportError as error:
+            parser.error(str(error))
+    if args.profiler:
+        try:
+            profile_call(search, (), args.profiler, args.output, args.sort)
+        except ImportError as error:
+            parser.error(str(error))
+    else:
+        search()
+    print(format_stats(stats))
+
+
+if __name__ == "__main__":
+    main()
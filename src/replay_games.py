@@ -0,0 +1,297 @@
+"""
+Bulk replay, validation and conversion of game records.
+
+Reads game archives and text files of games (see game_records.py), replays
+every game through OthelloGame to check that its moves are legal and that it
+is finished, and computes its final score. Games whose recorded score differs
+from the replayed one are counted as rescored. With --output, the valid games
+are written to an archive with their replayed scores and explicit passes,
+which also converts self-play JSONL or transcript files to the compact format.
+
+The stages are chained generators and games are replayed in batches of
+--batch-size, so memory stays bounded however many games the inputs hold.
+With --workers, each batch is split across worker processes.
+
+The exit status is 1 if any game is invalid.
+
+Example:
+    python src/replay_games.py --input games.jsonl --output games.bin.gz
+    python src/replay_games.py --input games.bin.gz --workers 8
+"""
+
+import argparse
+import collections
+import itertools
+import json
+import sys
+import time
+from multiprocessing import Pool
+
+from game_records import (
+    MAX_GAME_MOVES,
+    GameRecord,
+    RecordWriter,
+    game_score,
+    read_records,
+)
+from othello_game import PASS, OthelloGame, move_to_notation
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Results of replaying a game
+VALID = "valid"
+RESCORED = "rescored"
+ILLEGAL = "illegal"
+UNFINISHED = "unfinished"
+
+
+def replay_record(record, allow_unfinished=False):
+    """
+    Replay a game record and compute its score.
+
+    Parameters:
+        record (GameRecord): The record.
+        allow_unfinished (bool): Whether games that are not finished are valid. They keep no score.
+
+    Returns:
+        tuple: The result (VALID, RESCORED, ILLEGAL or UNFINISHED), the record with every pass made explicit
+        and the replayed score (None if the game is invalid or unfinished), and an error message or None.
+    """
+    if len(record.moves) > MAX_GAME_MOVES:
+        return (
+            ILLEGAL,
+            record,
+            f"A game has at most {MAX_GAME_MOVES} moves, got {len(record.moves)}",
+        )
+    game = OthelloGame(player_mode="ai")
+    moves = []
+    for ply, move in enumerate(record.moves, 1):
+        # Make the passes the record leaves out
+        if move is not PASS and game.must_pass():
+            game.pass_turn()
+            moves.append(PASS)
+        if move is PASS:
+            legal = game.pass_turn() is not None
+        else:
+            legal = game.make_move(*move) is not None
+        if not legal:
+            return (
+                ILLEGAL,
+                record,
+                f"Illegal move {move_to_notation(move)!r} at ply {ply}",
+            )
+        moves.append(move)
+
+    if not game.is_game_over():
+        if allow_unfinished:
+            return VALID, GameRecord(moves), None
+        return UNFINISHED, record, f"Unfinished after {len(record.moves)} moves"
+    score = game_score(game)
+    result = VALID if record.score in (None, score) else RESCORED
+    return result, GameRecord(moves, score), None
+
+
+def _replay_encoded(task):
+    """
+    Replay an encoded record in a worker process.
+    """
+    data, allow_unfinished = task
+    result, record, error = replay_record(GameRecord.from_bytes(data), allow_unfinished)
+    return result, record.to_bytes(), error
+
+
+def _batches(iterable, size):
+    """
+    Split an iterable into lists of at most size items, reading it one batch at a time.
+    """
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def replay_records(
+    records, allow_unfinished=False, workers=1, batch_size=DEFAULT_BATCH_SIZE
+):
+    """
+    Replay a stream of game records.
+
+    Parameters:
+        records (iterable): The records, consumed one batch at a time.
+        allow_unfinished (bool): Whether games that are not finished are valid.
+        workers (int): The number of worker processes; 1 replays in this process.
+        batch_size (int): The number of records read ahead and replayed together.
+
+    Yields:
+        tuple: The result of every record, in order (see replay_record).
+    """
+    if workers <= 1:
+        for record in records:
+            yield replay_record(record, allow_unfinished)
+        return
+
+    with Pool(workers) as pool:
+        for batch in _batches(records, batch_size):
+            # Records too long to be a game are illegal without a replay, and may not fit the binary form,
+            # so they are not sent to the workers
+            tasks = [
+                (record.to_bytes(), allow_unfinished)
+                for record in batch
+                if len(record.moves) <= MAX_GAME_MOVES
+            ]
+            chunksize = max(1, len(tasks) // (4 * workers))
+            results = pool.imap(_replay_encoded, tasks, chunksize)
+            for record in batch:
+                if len(record.moves) > MAX_GAME_MOVES:
+                    yield replay_record(record, allow_unfinished)
+                    continue
+                result, data, error = next(results)
+                yield result, GameRecord.from_bytes(data), error
+
+
+def _records(paths):
+    """
+    Read the records of several files in turn, numbering them.
+    """
+    for path in paths:
+        for number, record in enumerate(read_records(path), 1):
+            yield path, number, record
+
+
+def run_replay(
+    paths,
+    output=None,
+    allow_unfinished=False,
+    workers=1,
+    batch_size=DEFAULT_BATCH_SIZE,
+    max_errors=10,
+    log=None,
+):
+    """
+    Replay, validate and re-score the games of several files, and optionally write the valid ones to an archive.
+
+    Parameters:
+        paths (list): The archives or text files to read (see game_records.read_records).
+        output (str): If given, the archive to write the valid games to, with their replayed scores.
+        allow_unfinished (bool): Whether games that are not finished are valid.
+        workers (int): The number of worker processes.
+        batch_size (int): The number of records read ahead and replayed together.
+        max_errors (int): The number of invalid games to describe in the log.
+        log (file): If given, invalid games are described in it.
+
+    Returns:
+        dict: The number of games, of each result, of Black wins, White wins and draws among the finished
+        games, the number of moves, and the seconds taken.
+
+    Raises:
+        ValueError: If a file contains a malformed record.
+    """
+    summary = {
+        "games": 0,
+        VALID: 0,
+        RESCORED: 0,
+        ILLEGAL: 0,
+        UNFINISHED: 0,
+        "black_wins": 0,
+        "white_wins": 0,
+        "draws": 0,
+        "moves": 0,
+    }
+    start = time.perf_counter()
+    # The (path, number) of the records read but not replayed yet, for error messages; results come in order
+    sources = collections.deque()
+
+    def records():
+        for path, number, record in _records(paths):
+            sources.append((path, number))
+            yield record
+
+    writer = RecordWriter(output) if output else None
+    try:
+        for result, record, error in replay_records(
+            records(), allow_unfinished, workers, batch_size
+        ):
+            path, number = sources.popleft()
+            summary["games"] += 1
+            summary[result] += 1
+            summary["moves"] += len(record.moves)
+            if error is not None:
+                if (
+                    log is not None
+                    and summary[ILLEGAL] + summary[UNFINISHED] <= max_errors
+                ):
+                    print(f"{path}, game {number}: {error}", file=log)
+                continue
+            if record.score is not None:
+                if record.score > 0:
+                    summary["black_wins"] += 1
+                elif record.score < 0:
+                    summary["white_wins"] += 1
+                else:
+                    summary["draws"] += 1
+            if writer is not None:
+                writer.write(record)
+    finally:
+        if writer is not None:
+            writer.close()
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def main(argv=None):
+    """
+    Replay and validate game records from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay, validate and re-score Othello game records, and convert them to a compact archive."
+    )
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        required=True,
+        help="game archives, or text files of transcripts or JSON game records (plain or gzip compressed)",
+    )
+    parser.add_argument(
+        "--output",
+        help="write the valid games to this archive (gzip compressed if it ends in .gz)",
+    )
+    parser.add_argument(
+        "--allow-unfinished",
+        action="store_true",
+        help="count games that are not finished as valid",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="records read ahead and replayed together",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=10,
+        help="invalid games to describe on stderr",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run_replay(
+            args.input,
+            args.output,
+            args.allow_unfinished,
+            args.workers,
+            args.batch_size,
+            args.max_errors,
+            log=sys.stderr,
+        )
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if summary["seconds"]:
+        summary["games_per_second"] = round(summary["games"] / summary["seconds"], 1)
+    print(json.dumps(summary))
+    if summary[ILLEGAL] or summary[UNFINISHED]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Headless engine-vs-engine self-play.
+
+Plays batches of games between two engine configurations in parallel worker
+processes, without pygame, and streams one JSON object per finished game to a
+JSONL file. Each game can start with a number of random plies so that a batch
+covers many different openings.
+
+Example:
+    python src/selfplay.py --games 1000 --workers 8 --black-depth 4 --white-time-ms 200 \
+        --random-plies 6 --output results.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from ai_agent import EVALUATORS, analyze, check_evaluator
+from othello_game import PASS, OthelloGame, move_to_notation
+from transposition_table import TranspositionTable
+
+# Slots in each engine's transposition table; every game gets fresh tables
+DEFAULT_TABLE_SIZE = 1 << 16
+
+
+class EngineConfig:
+    def __init__(self, depth=4, time_limit_ms=None, evaluator="classic"):
+        """
+        The search settings of one side in a self-play game.
+
+        Parameters:
+            depth (int): The maximum search depth.
+            time_limit_ms (float): The time budget per move in milliseconds, or None for no limit.
+            evaluator (str): The name of the leaf evaluation function in ai_agent.EVALUATORS.
+
+        Raises:
+            ValueError: If the evaluation function does not exist or cannot be used (see check_evaluator).
+        """
+        check_evaluator(evaluator)
+        self.depth = depth
+        self.time_limit_ms = time_limit_ms
+        self.evaluator = evaluator
+
+    def to_dict(self):
+        """
+        Get the settings as a JSON-serialisable dict.
+
+        Returns:
+            dict: The depth, time limit and evaluator name.
+        """
+        return {
+            "depth": self.depth,
+            "time_limit_ms": self.time_limit_ms,
+            "evaluator": self.evaluator,
+        }
+
+
+def play_game(black, white, random_plies=0, seed=None, table_size=DEFAULT_TABLE_SIZE):
+    """
+    Play one engine-vs-engine game to the end.
+
+    Parameters:
+        black (EngineConfig): The settings of the Black engine.
+        white (EngineConfig): The settings of the White engine.
+        random_plies (int): The number of opening plies played at random instead of searched.
+        seed (int): The seed of the random opening.
+        table_size (int): The number of slots in each engine's transposition table.
+
+    Returns:
+        dict: The game record: moves in standard notation, the search score, nodes and milliseconds of every
+        move (None, 0 and 0 for random moves and passes), the final disk counts and the winner.
+    """
+    rng = random.Random(seed)
+    game = OthelloGame(player_mode="ai")
+    engines = {
+        1: (black, TranspositionTable(table_size)),
+        -1: (white, TranspositionTable(table_size)),
+    }
+    moves, scores, nodes, times = [], [], [], []
+
+    while not game.is_game_over():
+        if game.must_pass():
+            game.pass_turn()
+            moves.append(move_to_notation(PASS))
+            scores.append(None)
+            nodes.append(0)
+            times.append(0)
+            continue
+
+        if len(moves) < random_plies:
+            move = rng.choice(game.get_valid_moves())
+            score, move_nodes, elapsed_ms = None, 0, 0
+        else:
+            config, table = engines[game.current_player]
+            stats = {}
+            start = time.perf_counter()
+            score, principal_variation = analyze(
+                game,
+                config.depth,
+                table,
+                config.time_limit_ms,
+                evaluator=EVALUATORS[config.evaluator],
+                stats=stats,
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            move, move_nodes = principal_variation[0], stats["nodes"]
+
+        game.make_move(*move)
+        moves.append(move_to_notation(move))
+        scores.append(score)
+        nodes.append(move_nodes)
+        times.append(round(elapsed_ms, 3))
+
+    black_count, white_count = game.black.bit_count(), game.white.bit_count()
+    return {
+        "moves": moves,
+        "scores": scores,
+        "nodes": nodes,
+        "times_ms": times,
+        "black_discs": black_count,
+        "white_discs": white_count,
+        "winner": game.get_winner(),
+    }
+
+
+def _play_game_task(task):
+    """
+    Play one game of a batch in a worker process.
+    """
+    index, black, white, random_plies, seed, table_size = task
+    record = play_game(black, white, random_plies, seed, table_size)
+    record["game"] = index
+    record["seed"] = seed
+    record["black"] = black.to_dict()
+    record["white"] = white.to_dict()
+    return record
+
+
+def run_selfplay(
+    games,
+    black,
+    white,
+    output,
+    workers=1,
+    random_plies=0,
+    seed=0,
+    table_size=DEFAULT_TABLE_SIZE,
+):
+    """
+    Play a batch of games in worker processes and stream the records to a file as JSON lines.
+
+    Records are written in the order games finish, with a "game" index and the "seed" that reproduces them.
+
+    Parameters:
+        games (int): The number of games to play.
+        black (EngineConfig): The settings of the Black engine.
+        white (EngineConfig): The settings of the White engine.
+        output (file): A text file to write one JSON object per game to.
+        workers (int): The number of worker processes.
+        random_plies (int): The number of random opening plies per game.
+        seed (int): The base seed; game i uses seed + i.
+        table_size (int): The number of slots in each engine's transposition table.
+
+    Returns:
+        dict: The number of Black wins, White wins and draws.
+    """
+    tasks = [
+        (index, black, white, random_plies, seed + index, table_size)
+        for index in range(games)
+    ]
+    summary = {"black_wins": 0, "white_wins": 0, "draws": 0}
+    with Pool(workers) as pool:
+        for record in pool.imap_unordered(_play_game_task, tasks):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if record["winner"] == 1:
+                summary["black_wins"] += 1
+            elif record["winner"] == -1:
+                summary["white_wins"] += 1
+            else:
+                summary["draws"] += 1
+    return summary
+
+
+def main(argv=None):
+    """
+    Play engine-vs-engine games from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Play headless engine-vs-engine Othello games and write them to JSONL."
+    )
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument(
+        "--random-plies", type=int, default=0, help="random opening plies per game"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument(
+        "--table-size",
+        type=int,
+        default=DEFAULT_TABLE_SIZE,
+        help="transposition table slots per engine",
+    )
+    parser.add_argument(
+        "--output", default="-", help="JSONL output file ('-' for stdout)"
+    )
+    for side in ("black", "white"):
+        parser.add_argument(
+            f"--{side}-depth", type=int, default=4, help=f"{side} search depth"
+        )
+        parser.add_argument(
+            f"--{side}-time-ms",
+            type=float,
+            default=None,
+            help=f"{side} time budget per move in milliseconds",
+        )
+        parser.add_argument(
+            f"--{side}-eval",
+            choices=sorted(EVALUATORS),
+            default="classic",
+            help=f"{side} evaluation function",
+        )
+    args = parser.parse_args(argv)
+
+    try:
+        black = EngineConfig(args.black_depth, args.black_time_ms, args.black_eval)
+        white = EngineConfig(args.white_depth, args.white_time_ms, args.white_eval)
+    except ValueError as error:
+        parser.error(str(error))
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        summary = run_selfplay(
+            args.games,
+            black,
+            white,
+            output,
+            args.workers,
+            args.random_plies,
+            args.seed,
+            args.table_size,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"Black wins: {summary['black_wins']}, White wins: {summary['white_wins']}, "
+        f"draws: {summary['draws']}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
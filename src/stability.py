@@ -0,0 +1,249 @@
+"""
+Stable-disc detection.
+
+A disk is stable if no sequence of future moves can ever flip it. Stable disks
+are found in three steps:
+
+1. Edge disks are looked up in a precomputed table covering all 3^8
+   configurations of an edge, since edge disks can only be flipped along their edge.
+2. A disk whose row, column and both diagonals are full can never be flipped.
+3. A disk is stable if, along each of its four lines, the line is full or the disk
+   touches the board's border or an own stable disk; this is propagated until no
+   more disks are added.
+"""
+
+from bitboard import BORDER, CORNERS, FULL
+
+ROW_0 = 0x00000000000000FF
+ROW_7 = 0xFF00000000000000
+COLUMN_0 = 0x0101010101010101
+COLUMN_7 = 0x8080808080808080
+
+# The two diagonal directions: shift 9 runs down-right, shift 7 runs down-left
+DIAGONALS_9 = []
+DIAGONALS_7 = []
+for _start in range(-7, 8):
+    _line_9 = _line_7 = 0
+    for _row in range(8):
+        if 0 <= _row - _start < 8:
+            _line_9 |= 1 << (_row * 8 + _row - _start)
+        if 0 <= _row + _start < 8:
+            _line_7 |= 1 << (_row * 8 + 7 - _row - _start)
+    DIAGONALS_9.append(_line_9)
+    DIAGONALS_7.append(_line_7)
+
+
+def _edge_index(first, second):
+    """
+    Get the base-3 index of an edge from the 8-bit masks of its two colours.
+    """
+    return BASE_3[first] + 2 * BASE_3[second]
+
+
+def _line_flips(own, opponent, square):
+    """
+    Compute the disks flipped along an 8-square line by placing a disk on ``square``.
+    """
+    flipped = 0
+    for step in (1, -1):
+        run = 0
+        cursor = square + step
+        while 0 <= cursor < 8 and opponent >> cursor & 1:
+            run |= 1 << cursor
+            cursor += step
+        if 0 <= cursor < 8 and own >> cursor & 1:
+            flipped |= run
+    return flipped
+
+
+def _build_edge_table():
+    """
+    Compute the stable squares of every edge configuration.
+
+    A disk is stable in a configuration if it is stable in every configuration reachable by placing a disk of
+    either colour on an empty square (flipping along the edge as the rules require) and is not flipped by that
+    placement. Configurations are solved from full edges down to empty ones.
+    """
+    table = [0] * 3**8
+    configurations = [
+        (first, second)
+        for first in range(256)
+        for second in range(256)
+        if not first & second
+    ]
+    configurations.sort(key=lambda pair: -(pair[0] | pair[1]).bit_count())
+    for first, second in configurations:
+        stable = first | second
+        empty = ~stable & 0xFF
+        square = 0
+        while empty and stable:
+            if empty & 1:
+                bit = 1 << square
+                flipped = _line_flips(first, second, square)
+                after = table[_edge_index(first | bit | flipped, second & ~flipped)]
+                stable &= after & ~flipped
+                flipped = _line_flips(second, first, square)
+                after = table[_edge_index(first & ~flipped, second | bit | flipped)]
+                stable &= after & ~flipped
+            empty >>= 1
+            square += 1
+        table[_edge_index(first, second)] = stable
+    return table
+
+
+def _column_to_byte(bitboard):
+    """
+    Pack column 0 of a bitboard into an 8-bit mask (row 0 in bit 0).
+    """
+    return ((bitboard & COLUMN_0) * 0x0102040810204080 >> 56) & 0xFF
+
+
+# BASE_3[mask] is the base-3 number whose digits are the bits of mask
+BASE_3 = [sum(3**i for i in range(8) if mask >> i & 1) for mask in range(256)]
+
+# COLUMN_FROM_BYTE[mask] is the column-0 bitboard with the rows of mask set
+COLUMN_FROM_BYTE = [
+    sum(1 << (8 * i) for i in range(8) if mask >> i & 1) for mask in range(256)
+]
+
+EDGE_STABLE = _build_edge_table()
+
+
+def full_lines(filled):
+    """
+    Compute the squares whose rows, columns and diagonals are completely filled.
+
+    Parameters:
+        filled (int): Bitboard of the occupied squares.
+
+    Returns:
+        tuple: Bitboards (rows, columns, diagonals_9, diagonals_7) of the squares lying on a full line of each kind.
+    """
+    rows, columns = _full_rows_and_columns(filled)
+    return (rows, columns) + _full_diagonals(filled)
+
+
+def _full_rows_and_columns(filled):
+    """
+    Compute the squares lying on a full row and on a full column.
+    """
+    rows = filled & (filled >> 1)
+    rows &= rows >> 2
+    rows &= rows >> 4
+    rows = (rows & COLUMN_0) * 0xFF
+
+    columns = filled & (filled >> 8)
+    columns &= columns >> 16
+    columns &= columns >> 32
+    columns = (columns & ROW_0) * COLUMN_0
+    return rows, columns
+
+
+def _full_diagonals(filled):
+    """
+    Compute the squares lying on a full diagonal of each direction.
+    """
+    diagonals_9 = 0
+    for line in DIAGONALS_9:
+        if filled & line == line:
+            diagonals_9 |= line
+    diagonals_7 = 0
+    for line in DIAGONALS_7:
+        if filled & line == line:
+            diagonals_7 |= line
+    return diagonals_9, diagonals_7
+
+
+def edge_stable(first, second):
+    """
+    Look up the stable disks on the four edges of the board.
+
+    Parameters:
+        first (int): Bitboard of one colour.
+        second (int): Bitboard of the other colour.
+
+    Returns:
+        int: Bitboard of the stable edge disks of both colours.
+    """
+    stable = EDGE_STABLE[_edge_index(first & 0xFF, second & 0xFF)]
+    stable |= EDGE_STABLE[_edge_index(first >> 56, second >> 56)] << 56
+    stable |= COLUMN_FROM_BYTE[
+        EDGE_STABLE[_edge_index(_column_to_byte(first), _column_to_byte(second))]
+    ]
+    stable |= (
+        COLUMN_FROM_BYTE[
+            EDGE_STABLE[
+                _edge_index(_column_to_byte(first >> 7), _column_to_byte(second >> 7))
+            ]
+        ]
+        << 7
+    )
+    return stable
+
+
+def stable_bitboards(own, opponent):
+    """
+    Compute the stable disks of both players.
+
+    Parameters:
+        own (int): Bitboard of one player.
+        opponent (int): Bitboard of the other player.
+
+    Returns:
+        tuple: Bitboards of the stable disks of own and of opponent.
+    """
+    filled = own | opponent
+    rows, columns = _full_rows_and_columns(filled)
+
+    # Every stable disk is anchored, through a chain of stable neighbours, on a
+    # stable edge disk or a disk whose four lines are full. Edge disks can only
+    # be stable once a corner is taken (a full edge includes its corners), so
+    # with no corners and no square on both a full row and a full column there
+    # is nothing to find.
+    if not filled & CORNERS and not rows & columns:
+        return 0, 0
+
+    diagonals_9, diagonals_7 = _full_diagonals(filled)
+    edges = edge_stable(own, opponent)
+    full = rows & columns & diagonals_9 & diagonals_7
+
+    # A border square is safe along every line that would leave the board
+    rows |= COLUMN_0 | COLUMN_7
+    columns |= ROW_0 | ROW_7
+    diagonals_9 |= BORDER
+    diagonals_7 |= BORDER
+
+    result = []
+    for player in (own, opponent):
+        stable = player & (edges | full)
+        while stable:
+            # Clear the column a sideways shift would wrap out of
+            rightward = stable & 0x7F7F7F7F7F7F7F7F
+            leftward = stable & 0xFEFEFEFEFEFEFEFE
+            safe = (
+                (rows | (rightward << 1) | (leftward >> 1))
+                & (columns | (stable << 8) | (stable >> 8))
+                & (diagonals_9 | (rightward << 9) | (leftward >> 9))
+                & (diagonals_7 | (leftward << 7) | (rightward >> 7))
+            )
+            grown = stable | (player & safe & FULL)
+            if grown == stable:
+                break
+            stable = grown
+        result.append(stable)
+    return tuple(result)
+
+
+def stable_discs(game, player):
+    """
+    Compute the stable disks of a player.
+
+    Parameters:
+        game (OthelloGame): The current game state.
+        player (int): The player (1 for Black, -1 for White).
+
+    Returns:
+        int: Bitboard of the player's stable disks.
+    """
+    black_stable, white_stable = stable_bitboards(game.black, game.white)
+    return black_stable if player == 1 else white_stable
@@ -0,0 +1,318 @@
+"""
+Training pipeline for the pattern evaluation.
+
+Reads positions labelled with final disk differentials from JSONL files and
+fits the pattern weights (see pattern_evaluation.py) by stochastic gradient
+descent on the squared error, that is a least-squares fit, on the CPU with no
+dependencies. Two kinds of records are read:
+
+- game records, as written by selfplay.py: {"moves": ["e3", "f3", ...]}, with
+  "pass" for passes, or a transcript {"moves": "e3f3..."}. Passes may be left
+  out, as in game_records.py: a player with no valid move passes before the
+  next move. Every position of the game in which the player to move has a
+  move is labelled with the final disk differential of the game for that
+  player (empty squares going to the winner), replayed from the moves: a
+  "score" key, as in the records of replay_games.py, is ignored. With
+  --solve-empties N, positions with N or fewer empty squares are labelled with
+  their exact score from the endgame solver instead.
+- position records: {"moves": "e3f3f4...", "position_score": 12}, labelled
+  with the given score for the player to move after the moves (moves may also
+  be a list), e.g. exact endgame solves.
+
+A share of the positions is held out to report the validation error after
+every epoch.
+
+Example:
+    python src/selfplay.py --games 2000 --workers 8 --black-depth 2 --white-depth 2 \
+        --random-plies 10 --output games.jsonl
+    python src/train_patterns.py --input games.jsonl --solve-empties 10 --epochs 20
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from array import array
+
+from endgame_solver import final_score, solve
+from game_records import GameRecord
+from othello_game import (
+    PASS,
+    OthelloGame,
+    game_from_transcript,
+    move_to_notation,
+    notation_to_move,
+)
+from pattern_evaluation import (
+    DEFAULT_WEIGHTS_PATH,
+    load_weights,
+    new_weights,
+    pattern_features,
+    save_weights,
+)
+
+DEFAULT_EPOCHS = 10
+
+# The share of the error of a position corrected by one update, split between its weights
+DEFAULT_LEARNING_RATE = 0.05
+
+# The share of the positions held out for validation
+DEFAULT_VALIDATION = 0.1
+
+
+def _replay(moves):
+    """
+    Replay a list of moves from the starting position, making the passes the list leaves out.
+
+    Parameters:
+        moves (list): The moves (row, col), with PASS for a pass.
+
+    Returns:
+        list: The (own, opponent) bitboards of every position in which the player to move had a move, the
+        positions' players, and the final game.
+
+    Raises:
+        ValueError: If a move or pass is illegal.
+    """
+    game = OthelloGame(player_mode="ai")
+    positions = []
+    for ply, move in enumerate(moves, 1):
+        if move is PASS:
+            if game.pass_turn() is None:
+                raise ValueError(f"Illegal pass at ply {ply}")
+            continue
+        if game.must_pass():
+            game.pass_turn()
+        positions.append((*game.own_and_opponent(), game.current_player))
+        if game.make_move(*move) is None:
+            raise ValueError(f"Illegal move {move_to_notation(move)!r} at ply {ply}")
+    return positions, game
+
+
+def _record_moves(moves):
+    """
+    Parse the moves of a record: a transcript, or a list of moves in standard notation.
+
+    Raises:
+        ValueError: If a move is invalid.
+    """
+    if isinstance(moves, str):
+        return GameRecord.from_transcript(moves).moves
+    return [notation_to_move(text) for text in moves]
+
+
+def record_samples(record, solve_empties=0):
+    """
+    Get the labelled positions of one JSONL record.
+
+    Parameters:
+        record (dict): A game record or a position record (see the module docstring).
+        solve_empties (int): Label game positions with this many empty squares or fewer with their exact score.
+
+    Returns:
+        list: One (own, opponent, score) tuple per position, with the score for the player owning own.
+
+    Raises:
+        ValueError: If the record is malformed or its moves are illegal.
+    """
+    moves = record.get("moves")
+    if moves is None:
+        raise ValueError("Record has no moves")
+
+    if "position_score" in record:
+        if isinstance(moves, str):
+            game = game_from_transcript(moves)
+        else:
+            _, game = _replay(_record_moves(moves))
+        own, opponent = game.own_and_opponent()
+        return [(own, opponent, float(record["position_score"]))]
+
+    positions, game = _replay(_record_moves(moves))
+    if not game.is_game_over():
+        raise ValueError("Game record does not end with a finished game")
+    black_score = final_score(game.black, game.white)
+    samples = []
+    for own, opponent, player in positions:
+        empties = 64 - (own | opponent).bit_count()
+        if empties <= solve_empties:
+            score = solve(own, opponent)
+        else:
+            score = black_score * player
+        samples.append((own, opponent, float(score)))
+    return samples
+
+
+def load_samples(paths, solve_empties=0, log=None):
+    """
+    Read the labelled positions of JSONL files and extract their pattern features.
+
+    Parameters:
+        paths (list): The JSONL files to read ("-" for standard input).
+        solve_empties (int): Label game positions with this many empty squares or fewer with their exact score.
+        log (file): If given, a line with the number of positions read is written to it.
+
+    Returns:
+        list: One (features, score) pair per position (see pattern_evaluation.pattern_features).
+
+    Raises:
+        ValueError: If a record is malformed, with its file and line number.
+    """
+    samples = []
+    for path in paths:
+        file = sys.stdin if path == "-" else open(path)
+        try:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records = record_samples(json.loads(line), solve_empties)
+                except (ValueError, AttributeError, TypeError) as error:
+                    raise ValueError(f"{path}, line {number}: {error}") from error
+                for own, opponent, score in records:
+                    samples.append((pattern_features(own, opponent), score))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+    if log is not None:
+        print(f"{len(samples)} positions read", file=log)
+    return samples
+
+
+def root_mean_squared_error(samples, weights):
+    """
+    Compute the root mean squared error of the weights' predictions.
+
+    Parameters:
+        samples (list): (features, score) pairs.
+        weights (sequence): The weights.
+
+    Returns:
+        float: The error in disks, or 0.0 if there are no samples.
+    """
+    if not samples:
+        return 0.0
+    total = 0.0
+    for features, score in samples:
+        error = score - sum([weights[index] for index in features])
+        total += error * error
+    return math.sqrt(total / len(samples))
+
+
+def train(
+    samples,
+    weights=None,
+    epochs=DEFAULT_EPOCHS,
+    learning_rate=DEFAULT_LEARNING_RATE,
+    validation=DEFAULT_VALIDATION,
+    seed=0,
+    log=None,
+):
+    """
+    Fit pattern weights to labelled positions by stochastic gradient descent on the squared error.
+
+    Parameters:
+        samples (list): (features, score) pairs (see load_samples).
+        weights (array): The weights to start from. Defaults to all zero.
+        epochs (int): The number of passes over the training positions.
+        learning_rate (float): The share of a position's error corrected by each update.
+        validation (float): The share of the positions held out to measure the error.
+        seed (int): The seed of the split and of the order of the updates.
+        log (file): If given, the training and validation errors are written to it after every epoch.
+
+    Returns:
+        array: The fitted float32 weights.
+    """
+    rng = random.Random(seed)
+    samples = list(samples)
+    rng.shuffle(samples)
+    held_out = int(len(samples) * validation)
+    validation_samples, training_samples = samples[:held_out], samples[held_out:]
+
+    # Train in double precision; the weight file stores float32
+    values = list(weights) if weights is not None else list(new_weights())
+    start = time.perf_counter()
+    for epoch in range(1, epochs + 1):
+        rng.shuffle(training_samples)
+        total = 0.0
+        for features, score in training_samples:
+            error = score - sum([values[index] for index in features])
+            total += error * error
+            step = learning_rate * error / len(features)
+            for index in features:
+                values[index] += step
+        if log is not None:
+            training_error = math.sqrt(total / max(len(training_samples), 1))
+            validation_error = root_mean_squared_error(validation_samples, values)
+            print(
+                f"epoch {epoch}: training rmse {training_error:.3f}, validation rmse "
+                f"{validation_error:.3f} ({time.perf_counter() - start:.1f} s)",
+                file=log,
+            )
+    return array("f", values)
+
+
+def main(argv=None):
+    """
+    Train pattern weights from JSONL files from the command line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Fit the pattern evaluation weights to self-play games or solved positions."
+    )
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        required=True,
+        help="JSONL files of game or position records ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--output", default=DEFAULT_WEIGHTS_PATH, help="the weight file to write"
+    )
+    parser.add_argument(
+        "--init", help="a weight file to start from instead of zero weights"
+    )
+    parser.add_argument(
+        "--epochs", type=int, default=DEFAULT_EPOCHS, help="passes over the data"
+    )
+    parser.add_argument(
+        "--learning-rate",
+        type=float,
+        default=DEFAULT_LEARNING_RATE,
+        help="share of each position's error corrected per update",
+    )
+    parser.add_argument(
+        "--validation",
+        type=float,
+        default=DEFAULT_VALIDATION,
+        help="share of the positions held out for validation",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--solve-empties",
+        type=int,
+        default=0,
+        help="label game positions with this many empty squares or fewer by solving them exactly",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        weights = load_weights(args.init) if args.init else None
+        samples = load_samples(args.input, args.solve_empties, log=sys.stderr)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    weights = train(
+        samples,
+        weights,
+        args.epochs,
+        args.learning_rate,
+        args.validation,
+        args.seed,
+        log=sys.stderr,
+    )
+    save_weights(args.output, weights)
+    print(f"Wrote the weights to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bounded transposition table for the alpha-beta search.
+"""
+
+# Bound types describing how a stored value relates to the true score
+EXACT = 0  # The value is the exact score of the position
+LOWER = 1  # The search failed high: the true score is at least the value
+UPPER = 2  # The search failed low: the true score is at most the value
+
+DEFAULT_SIZE = 1 << 20
+
+
+class TranspositionTable:
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        A fixed-size hash table of search results keyed by Zobrist hash.
+
+        Each slot holds one entry ``(key, depth, bound, value, move, generation)``.
+        A new entry replaces the one in its slot if the slot is empty, holds the
+        same position, was written by an earlier search, or was searched to a
+        depth no greater than the new entry's. Otherwise the deeper result from
+        the current search is kept.
+
+        Args:
+            size (int): The number of slots, rounded up to a power of two (default is 2**20).
+        """
+        self.size = 1 << max(0, size - 1).bit_length()
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        """
+        Mark the start of a new search so entries from earlier searches age out first.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """
+        Remove every entry from the table.
+        """
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def probe(self, key):
+        """
+        Look up the entry stored for a position.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+
+        Returns:
+            tuple: The entry (key, depth, bound, value, move, generation), or None if absent.
+        """
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, value, move):
+        """
+        Store a search result, subject to the replacement policy.
+
+        Args:
+            key (int): The Zobrist hash of the position.
+            depth (int): The remaining depth the position was searched to.
+            bound (int): One of EXACT, LOWER or UPPER.
+            value (float): The search value.
+            move (tuple): The best move found (row, col), or None.
+        """
+        index = key & self.mask
+        entry = self.entries[index]
+        if (
+            entry is None
+            or entry[0] == key
+            or entry[5] != self.generation
+            or depth >= entry[1]
+        ):
+            if move is None and entry is not None and entry[0] == key:
+                move = entry[4]
+            self.entries[index] = (key, depth, bound, value, move, self.generation)
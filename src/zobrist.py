@@ -0,0 +1,59 @@
+"""
+Zobrist keys for hashing Othello positions.
+
+Each (colour, square) pair and the side to move get a fixed random 64-bit key.
+The hash of a position is the XOR of the keys of its disks, plus the side key
+when White is to move, so it can be updated incrementally as moves are made.
+"""
+
+import random
+
+from bitboard import iter_bits
+
+_rng = random.Random(0x0DE110)
+
+BLACK_KEYS = [_rng.getrandbits(64) for _ in range(64)]
+WHITE_KEYS = [_rng.getrandbits(64) for _ in range(64)]
+
+# XOR-ing FLIP_KEYS[square] turns a disk on that square from one colour into the other
+FLIP_KEYS = [black ^ white for black, white in zip(BLACK_KEYS, WHITE_KEYS)]
+
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def hash_position(black, white, current_player):
+    """
+    Compute the Zobrist hash of a position from scratch.
+
+    Args:
+        black (int): Bitboard of the black disks.
+        white (int): Bitboard of the white disks.
+        current_player (int): The player to move (1 for Black, -1 for White).
+
+    Returns:
+        int: The 64-bit hash of the position.
+    """
+    key = SIDE_KEY if current_player == -1 else 0
+    for bit in iter_bits(black):
+        key ^= BLACK_KEYS[bit.bit_length() - 1]
+    for bit in iter_bits(white):
+        key ^= WHITE_KEYS[bit.bit_length() - 1]
+    return key
+
+
+def flip_hash(flipped):
+    """
+    Compute the hash delta for changing the colour of a set of disks.
+
+    Args:
+        flipped (int): Bitboard of the disks that change colour.
+
+    Returns:
+        int: The value to XOR into the position hash.
+    """
+    key = 0
+    while flipped:
+        bit = flipped & -flipped
+        key ^= FLIP_KEYS[bit.bit_length() - 1]
+        flipped ^= bit
+    return key
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+import opening_book  # noqa: E402
+from ai_agent import evaluate_game_state, evaluate_material, get_best_move  # noqa: E402
+from othello_game import OthelloGame  # noqa: E402
+
+BOOK_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, "utils", "opening_book.bin"
+)
+
+
+@pytest.fixture
+def book(monkeypatch):
+    book = opening_book.OpeningBook(BOOK_PATH)
+    monkeypatch.setattr(opening_book, "_default_book", book)
+    monkeypatch.setattr(opening_book, "_default_book_loaded", True)
+    yield book
+    book.close()
+
+
+@pytest.mark.parametrize(
+    "evaluator, use_book, expected",
+    [
+        (None, None, True),
+        (evaluate_game_state, None, True),
+        (evaluate_material, None, False),
+        (evaluate_material, True, True),
+        (None, False, False),
+    ],
+)
+def test_book_is_used_by_default_only_with_the_default_evaluator(
+    book, evaluator, use_book, expected
+):
+    stats = {}
+    get_best_move(
+        OthelloGame(player_mode="ai"),
+        2,
+        evaluator=evaluator,
+        stats=stats,
+        use_book=use_book,
+    )
+    assert stats["book"] is expected
@@ -0,0 +1,68 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+import ai_agent  # noqa: E402
+from GUI.ai_worker import AIWorker  # noqa: E402
+from othello_game import OthelloGame  # noqa: E402
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+
+
+def test_a_search_waits_for_a_slow_cancelled_one_without_blocking(monkeypatch):
+    release = threading.Event()
+    running = []
+    overlaps = []
+
+    def slow_search(game, *args, stats, **kwargs):
+        # Like an endgame solve, this never reaches a progress check until released
+        running.append(1)
+        overlaps.append(len(running))
+        release.wait()
+        running.pop()
+        stats["pv"] = []
+        return game.get_valid_moves()[0]
+
+    monkeypatch.setattr(ai_agent, "get_best_move", slow_search)
+    game = OthelloGame(player_mode="ai")
+    worker = AIWorker()
+    worker.start(game)
+    _wait_until(lambda: running)
+    worker.cancel(timeout=0)
+
+    started = time.perf_counter()
+    worker.start(game)
+    assert worker.thinking
+    assert not worker.done
+    assert time.perf_counter() - started < 0.5
+
+    release.set()
+    _wait_until(lambda: worker.done)
+    assert worker.result() == game.get_valid_moves()[0]
+    assert overlaps == [1, 1]
+
+
+def test_a_search_that_never_started_is_dropped_by_cancel(monkeypatch):
+    release = threading.Event()
+
+    def slow_search(game, *args, stats, **kwargs):
+        release.wait()
+        stats["pv"] = []
+        return None
+
+    monkeypatch.setattr(ai_agent, "get_best_move", slow_search)
+    worker = AIWorker()
+    worker.start(OthelloGame(player_mode="ai"))
+    worker.cancel(timeout=0)
+    worker.start(OthelloGame(player_mode="ai"))
+    worker.cancel(timeout=0)
+    assert not worker.thinking
+    release.set()
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+import analysis_server  # noqa: E402
+from analysis_server import AnalysisServer  # noqa: E402
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_a_failed_worker_process_is_replaced_by_a_warm_one(monkeypatch):
+    shut_down = []
+    shutdown = analysis_server.ProcessPoolExecutor.shutdown
+
+    def recording_shutdown(executor, *args, **kwargs):
+        shut_down.append(executor)
+        return shutdown(executor, *args, **kwargs)
+
+    monkeypatch.setattr(
+        analysis_server.ProcessPoolExecutor, "shutdown", recording_shutdown
+    )
+
+    async def scenario():
+        server = AnalysisServer(workers=1)
+        await server.start()
+        try:
+            broken = server._executors[0]
+            loop = asyncio.get_running_loop()
+            pid = await loop.run_in_executor(broken, analysis_server._ping)
+            request = {"transcript": "e3", "depth": 60, "time_ms": 5000, "book": False}
+            pending = asyncio.create_task(server.analyze(request))
+            await asyncio.sleep(0.2)
+            os.kill(pid, signal.SIGKILL)
+            assert await pending == {"error": "worker process failed"}
+
+            response = await server.analyze({"transcript": "e3", "time_ms": 200})
+            assert "move" in response
+            assert server._executors[0] is not broken
+            assert shut_down == [broken]
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
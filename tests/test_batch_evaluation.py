@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from ai_agent import evaluate_weighted  # noqa: E402
+from batch_evaluation import evaluate_bitboards, evaluate_boards  # noqa: E402
+from othello_game import OthelloGame  # noqa: E402
+
+
+def _random_games(count=400, seed=0):
+    """
+    Get the games of random playouts at every ply, finished games included.
+    """
+    rng = random.Random(seed)
+    games = []
+    while len(games) < count:
+        game = OthelloGame(player_mode="ai")
+        while True:
+            copy = OthelloGame(player_mode="ai")
+            copy.set_position(game.black, game.white, game.current_player)
+            games.append(copy)
+            if game.is_game_over():
+                break
+            if game.must_pass():
+                game.pass_turn()
+            game.make_move(*rng.choice(game.get_valid_moves()))
+    return games
+
+
+def test_evaluate_boards_matches_evaluate_weighted():
+    games = _random_games()
+    boards = [
+        [[cell * game.current_player for cell in row] for row in game.board]
+        for game in games
+    ]
+    expected = [evaluate_weighted(game) for game in games]
+    assert evaluate_boards(boards).tolist() == pytest.approx(expected)
+
+
+def test_evaluate_bitboards_matches_evaluate_weighted():
+    games = _random_games(seed=1)
+    own, opponent = zip(*(game.own_and_opponent() for game in games))
+    expected = [evaluate_weighted(game) for game in games]
+    assert evaluate_bitboards(own, opponent).tolist() == pytest.approx(expected)
+
+
+def test_evaluate_boards_rejects_other_shapes():
+    with pytest.raises(ValueError):
+        evaluate_boards(np.zeros((2, 8, 7)))
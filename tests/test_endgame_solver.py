@@ -0,0 +1,93 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from bitboard import FULL, flips, iter_bits, legal_moves  # noqa: E402
+from endgame_solver import final_score, solve, solve_game  # noqa: E402
+from othello_game import OthelloGame  # noqa: E402
+
+
+def _minimax(own, opponent, passed=False):
+    """
+    The exact score of a position by plain minimax, with no pruning or move ordering.
+    """
+    moves = legal_moves(own, opponent)
+    if not moves:
+        if passed:
+            return final_score(own, opponent)
+        return -_minimax(opponent, own, True)
+    best = -65
+    for bit in iter_bits(moves):
+        flipped = flips(own, opponent, bit)
+        best = max(best, -_minimax(opponent ^ flipped, own | flipped | bit))
+    return best
+
+
+def _random_position(rng, empties):
+    """
+    Play random moves from the starting position until a given number of empty squares is left.
+
+    Returns:
+        OthelloGame: The game, or None if it ended before.
+    """
+    game = OthelloGame(player_mode="ai")
+    while 64 - (game.black | game.white).bit_count() > empties:
+        if game.is_game_over():
+            return None
+        if game.must_pass():
+            game.pass_turn()
+        game.make_move(*rng.choice(game.get_valid_moves()))
+    return game
+
+
+def _positions(count, empties_range, seed):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = _random_position(rng, rng.choice(empties_range))
+        if game is not None:
+            positions.append(game.own_and_opponent())
+    return positions
+
+
+@pytest.mark.parametrize("own, opponent", _positions(150, range(1, 9), seed=0))
+def test_solve_matches_minimax(own, opponent):
+    assert solve(own, opponent) == _minimax(own, opponent)
+
+
+@pytest.mark.parametrize("own, opponent", _positions(40, range(1, 7), seed=1))
+def test_solve_bounds_the_score_outside_its_window(own, opponent):
+    exact = _minimax(own, opponent)
+    for alpha, beta in [(-64, exact - 1), (exact + 1, 64), (exact - 1, exact + 1)]:
+        if alpha >= beta:
+            continue
+        score = solve(own, opponent, alpha, beta)
+        if score <= alpha:
+            assert exact <= score
+        elif score >= beta:
+            assert exact >= score
+        else:
+            assert score == exact
+
+
+@pytest.mark.parametrize("own, opponent", _positions(20, range(4, 9), seed=2))
+def test_solve_game_plays_a_best_move(own, opponent):
+    game = OthelloGame(player_mode="ai")
+    game.set_position(own, opponent, 1)
+    score, move = solve_game(game)
+    assert score == _minimax(own, opponent)
+    if move is None:
+        assert not legal_moves(own, opponent)
+        return
+    game.make_move(*move)
+    after = -_minimax(*game.own_and_opponent())
+    assert after == score
+
+
+def test_full_board_is_scored_without_search():
+    own = FULL & 0x00000000FFFFFFFF
+    assert solve(own, FULL ^ own) == 0
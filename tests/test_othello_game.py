@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from bitboard import (  # noqa: E402
+    bit_to_square,
+    flips,
+    iter_bits,
+    legal_moves,
+    square_to_bit,
+)
+from othello_game import OthelloGame  # noqa: E402
+from zobrist import hash_position  # noqa: E402
+
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def _array_flips(board, player, row, col):
+    """
+    The squares a move flips, computed on an 8x8 list board as the original array implementation did.
+    """
+    if board[row][col] != 0:
+        return []
+    flipped = []
+    for dr, dc in DIRECTIONS:
+        r, c = row + dr, col + dc
+        run = []
+        while 0 <= r < 8 and 0 <= c < 8 and board[r][c] == -player:
+            run.append((r, c))
+            r += dr
+            c += dc
+        if run and 0 <= r < 8 and 0 <= c < 8 and board[r][c] == player:
+            flipped.extend(run)
+    return flipped
+
+
+def _random_positions(games=40, seed=0):
+    """
+    Yield the games of random playouts before every move, with the move about to be played.
+    """
+    rng = random.Random(seed)
+    for _ in range(games):
+        game = OthelloGame()
+        while not game.is_game_over():
+            if game.must_pass():
+                game.pass_turn()
+            move = rng.choice(game.get_valid_moves())
+            yield game, move
+            game.make_move(*move)
+
+
+def test_legal_moves_and_flips_match_the_array_logic():
+    for game, _ in _random_positions():
+        board = [row[:] for row in game.board]
+        own, opponent = game.own_and_opponent()
+        expected = {
+            (row, col): set(_array_flips(board, game.current_player, row, col))
+            for row in range(8)
+            for col in range(8)
+        }
+        expected = {move: squares for move, squares in expected.items() if squares}
+        moves = {bit_to_square(bit) for bit in iter_bits(legal_moves(own, opponent))}
+        assert moves == set(expected)
+        for move, squares in expected.items():
+            flipped = flips(own, opponent, square_to_bit(*move))
+            assert {bit_to_square(bit) for bit in iter_bits(flipped)} == squares
+
+
+def test_make_move_and_undo_move_restore_the_position_and_hash():
+    for game, move in _random_positions(games=20, seed=1):
+        before = (game.black, game.white, game.current_player, game.hash)
+        record = game.make_move(*move)
+        assert record is not None
+        assert game.hash == hash_position(game.black, game.white, game.current_player)
+        game.undo_move(record)
+        assert (game.black, game.white, game.current_player, game.hash) == before
+        assert game.hash == hash_position(game.black, game.white, game.current_player)
+
+
+def test_illegal_moves_change_nothing():
+    game = OthelloGame()
+    before = (game.black, game.white, game.current_player, game.hash)
+    for move in [(0, 0), (3, 3), (8, 0), (-1, 2)]:
+        assert game.make_move(*move) is None
+    assert game.pass_turn() is None
+    assert (game.black, game.white, game.current_player, game.hash) == before
+
+
+def test_to_bytes_round_trip():
+    for game, _ in _random_positions(games=5, seed=2):
+        copy = OthelloGame.from_bytes(game.to_bytes())
+        assert (copy.black, copy.white, copy.current_player, copy.hash) == (
+            game.black,
+            game.white,
+            game.current_player,
+            game.hash,
+        )
+
+
+@pytest.mark.parametrize("data", [b"", bytes(16), bytes(16) + b"\x02", b"\x01" * 17])
+def test_from_bytes_rejects_invalid_data(data):
+    with pytest.raises(ValueError):
+        OthelloGame.from_bytes(data)
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from othello_game import OthelloGame, game_from_transcript  # noqa: E402
+from perft import (  # noqa: E402
+    START_POSITION_COUNTS,
+    _perft_task,
+    _split,
+    divide,
+    perft,
+    perft_bitboards,
+    verify,
+)
+
+# A position with 16 empty squares whose tree holds passes within five plies
+MIDGAME = (
+    "e3d3c6f5f3f2e2g3g5d2e1f1c3b3b2c2g1d6a3b6c1f6"
+    "e6g6h7h6c4h4g7c5h3g8h5f7e7f8e8g2h2f4g4a1a2d1"
+)
+
+
+@pytest.mark.parametrize("depth", range(1, 7))
+def test_perft_matches_the_known_counts(depth):
+    game = OthelloGame()
+    assert perft(game, depth) == START_POSITION_COUNTS[depth]
+    own, opponent = game.own_and_opponent()
+    assert perft_bitboards(own, opponent, depth) == START_POSITION_COUNTS[depth]
+
+
+def test_perft_restores_the_game():
+    game = game_from_transcript(MIDGAME)
+    before = (game.black, game.white, game.current_player, game.hash)
+    perft(game, 4)
+    assert (game.black, game.white, game.current_player, game.hash) == before
+
+
+@pytest.mark.parametrize("transcript, depth", [("", 6), (MIDGAME, 5)])
+def test_split_subtrees_add_up_to_the_serial_count(transcript, depth):
+    game = game_from_transcript(transcript)
+    expected = perft(game, depth)
+    tasks = _split(game, depth, 64)
+    assert len(tasks) >= 64
+    assert sum(_perft_task(task[1:]) for task in tasks) == expected
+    assert perft_bitboards(*game.own_and_opponent(), depth) == expected
+
+
+def test_parallel_divide_matches_the_serial_divide():
+    game = game_from_transcript(MIDGAME)
+    assert divide(game, 4, workers=2) == divide(game, 4)
+    assert perft(game, 4, workers=2) == perft(game, 4)
+
+
+def test_verify():
+    assert verify(max_depth=5)
@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from game_records import GameRecord, read_records  # noqa: E402
+from replay_games import ILLEGAL, VALID, replay_records, run_replay  # noqa: E402
+
+# A finished game that ends with Black's 64-0 win after 9 moves
+WIPEOUT = "e3d3c2f2e2f3c5d2g2"
+
+
+def _write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+    return str(path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_replay_is_the_same_with_and_without_workers(tmp_path, workers):
+    path = _write_lines(
+        tmp_path / "games.jsonl",
+        [
+            json.dumps({"moves": WIPEOUT, "score": 64}),
+            json.dumps({"moves": WIPEOUT, "score": 10}),
+            "e3d3",
+        ],
+    )
+    summary = run_replay([path], workers=workers, batch_size=2)
+    assert (summary["valid"], summary["rescored"], summary["unfinished"]) == (1, 1, 1)
+    assert summary["black_wins"] == 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("score", ["500", "1.5", "true", '"10"'])
+def test_invalid_scores_are_rejected_with_their_line(tmp_path, workers, score):
+    path = _write_lines(
+        tmp_path / "games.jsonl",
+        [
+            json.dumps({"moves": WIPEOUT}),
+            '{"moves": "%s", "score": %s}' % (WIPEOUT, score),
+        ],
+    )
+    with pytest.raises(ValueError, match="line 2: Score must be an integer"):
+        run_replay([path], workers=workers)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_records_too_long_for_a_game_are_illegal(workers):
+    records = [
+        GameRecord.from_transcript(WIPEOUT),
+        GameRecord([(2, 3)] * 300),
+        GameRecord.from_transcript(WIPEOUT),
+    ]
+    results = [result for result, _, _ in replay_records(records, workers=workers)]
+    assert results == [VALID, ILLEGAL, VALID]
+
+
+def test_transcript_score_out_of_range_is_rejected(tmp_path):
+    path = _write_lines(tmp_path / "games.txt", [WIPEOUT + " -65"])
+    with pytest.raises(ValueError, match="line 1"):
+        list(read_records(path))
+
+
+def test_to_bytes_rejects_out_of_range_scores():
+    with pytest.raises(ValueError):
+        GameRecord.from_transcript(WIPEOUT, 200).to_bytes()
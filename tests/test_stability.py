@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from othello_game import OthelloGame  # noqa: E402
+from stability import edge_stable, stable_bitboards, stable_discs  # noqa: E402
+
+ROW_0 = 0xFF
+
+
+def test_stable_disks_are_never_flipped():
+    rng = random.Random(0)
+    for _ in range(150):
+        game = OthelloGame(player_mode="ai")
+        history = []
+        while not game.is_game_over():
+            if game.must_pass():
+                game.pass_turn()
+            history.append(
+                (game.black, game.white, *stable_bitboards(game.black, game.white))
+            )
+            game.make_move(*rng.choice(game.get_valid_moves()))
+            for black, white, black_stable, white_stable in history:
+                assert black & black_stable == black_stable
+                assert white & white_stable == white_stable
+                assert game.black & black_stable == black_stable
+                assert game.white & white_stable == white_stable
+
+
+def test_a_full_edge_is_stable():
+    first = 0b10110010
+    second = ROW_0 ^ first
+    assert edge_stable(first, second) & ROW_0 == ROW_0
+
+
+def test_a_run_anchored_on_a_corner_is_stable():
+    # a1-c1 own, d1 opponent, e1-h1 empty
+    assert edge_stable(0b00000111, 0b00001000) & ROW_0 == 0b00000111
+    # The same run away from the corner can still be flipped
+    assert edge_stable(0b00001110, 0b00010000) & ROW_0 == 0
+
+
+def test_only_the_corner_is_stable_behind_an_opponent_disk():
+    # a1 and c1 own, b1 opponent: d1 by the opponent flips c1, and then e1 flips b1-d1
+    stable = edge_stable(0b00000101, 0b00000010) & ROW_0
+    assert stable & 0b1 == 0b1
+    assert stable & 0b110 == 0
+
+
+def test_a_lone_corner_is_stable_on_every_edge():
+    for square in (0, 7, 56, 63):
+        assert edge_stable(1 << square, 0) == 1 << square
+
+
+def test_no_stable_disks_at_the_start():
+    game = OthelloGame()
+    assert stable_discs(game, 1) == 0
+    assert stable_discs(game, -1) == 0
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from train_patterns import record_samples  # noqa: E402
+
+# A finished game of 59 moves in which a player has to pass, left out of the transcript
+TRANSCRIPT = (
+    "d6e6f5g4f3c4c5e2g6f4g3g2b4c6d3f6h2d2c7b7g1c8f2b3g5a4a3b6c2h5"
+    "f7h3b5h6b8a2e3h1h7a6a5c1a7f1e1d7b2d1g7h8e7b1d8f8h4a8e8g8c3"
+)
+
+
+def test_transcript_game_records_make_implicit_passes():
+    moves = [TRANSCRIPT[index : index + 2] for index in range(0, len(TRANSCRIPT), 2)]
+    samples = record_samples({"moves": TRANSCRIPT})
+    assert len(samples) == 59
+    assert samples == record_samples({"moves": moves})
+
+
+def test_a_game_score_does_not_make_a_position_record():
+    # A game record as written by replay_games.py, with Black's final differential
+    samples = record_samples({"moves": TRANSCRIPT, "score": 64})
+    assert samples == record_samples({"moves": TRANSCRIPT})
+
+
+def test_position_records_are_labelled_for_the_player_to_move():
+    samples = record_samples({"moves": "e3f3", "position_score": -4})
+    assert len(samples) == 1
+    own, opponent, score = samples[0]
+    assert (own | opponent).bit_count() == 6
+    assert score == -4.0